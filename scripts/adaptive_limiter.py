@@ -0,0 +1,164 @@
+"""
+Adaptive Concurrency Limiter for ModelIt K12 Image Generation
+AIMD control of how many Nano Banana calls run at once: the limit grows by
+one per window of fast successes while latency stays near its recent
+baseline, halves on 429 / 5xx / timeouts, and is capped by the memory
+available locally (each in-flight call buffers a multi-MB base64 image).
+Used by generate_image_with_nano_banana and generate_mascot_image.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+DEFAULT_INITIAL = 2
+DEFAULT_MAXIMUM = 16
+LATENCY_TOLERANCE = 1.5     # latency up to 1.5x the baseline still counts as "flat"
+BASELINE_WINDOW = 50        # recent successful latencies the baseline is taken from
+BASELINE_PERCENTILE = 50    # baseline = median of the window (the minimum was one lucky call away)
+MEMORY_PER_CALL_MB = 64     # response JSON + base64 + decoded image, generously
+MIN_FREE_MB = 512           # never start a call that would leave less than this
+
+def available_memory_mb():
+    """MemAvailable from /proc/meminfo, else free physical pages, else None"""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def classify(status=None, error=None):
+    """Outcome of one upstream call: "ok", "throttled", "error" or "timeout" """
+    if error is not None:
+        return "timeout" if "timeout" in type(error).__name__.lower() else "error"
+    if status == 429:
+        return "throttled"
+    if status is not None and status >= 500:
+        return "error"
+    return "ok"
+
+class _Slot:
+    """Handle yielded by AdaptiveLimiter.slot(); set .status to the HTTP status"""
+    status = None
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a latency baseline and a memory cap"""
+
+    def __init__(self, initial=DEFAULT_INITIAL, minimum=1, maximum=DEFAULT_MAXIMUM,
+                 decrease=0.5, memory_per_call_mb=MEMORY_PER_CALL_MB, min_free_mb=MIN_FREE_MB):
+        self.limit = float(initial)
+        self.minimum, self.maximum, self.decrease = minimum, maximum, decrease
+        self.memory_per_call_mb, self.min_free_mb = memory_per_call_mb, min_free_mb
+        self.in_flight = 0
+        self.latencies = deque(maxlen=BASELINE_WINDOW)
+        self.history = [(0.0, int(self.limit), "start")]
+        self.stats = {"calls": 0, "ok": 0, "throttled": 0, "error": 0, "timeout": 0, "memory_waits": 0}
+        self._condition = threading.Condition()
+        self._started = time.monotonic()
+        self._last_decrease = self._started
+
+    # ------------------------------------------------------------------
+    def memory_cap(self):
+        """How many calls may be in flight given free memory (None = unknown)"""
+        available = available_memory_mb()
+        if available is None:
+            return None
+        return self.in_flight + max(0, int((available - self.min_free_mb) // self.memory_per_call_mb))
+
+    def effective_limit(self):
+        limit = max(self.minimum, int(self.limit))
+        cap = self.memory_cap()
+        # Always allow one call, or a low-memory machine would deadlock
+        return limit if cap is None else max(1, min(limit, cap))
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= self.effective_limit():
+                if self.in_flight < int(self.limit):
+                    self.stats["memory_waits"] += 1
+                self._condition.wait(timeout=1.0)  # re-check memory periodically
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(self, started, outcome, latency):
+        with self._condition:
+            self.in_flight -= 1
+            self.stats["calls"] += 1
+            self.stats[outcome] += 1
+            if outcome == "ok":
+                self._on_success(latency)
+            elif started >= self._last_decrease:
+                # Only calls issued after the last cut may cut again, so one burst
+                # of 429s halves the limit once rather than once per request
+                self._set_limit(max(self.minimum, self.limit * self.decrease), outcome)
+                self._last_decrease = time.monotonic()
+            self._condition.notify_all()
+
+    def baseline(self, latency=None):
+        """BASELINE_PERCENTILE of recent successful latencies (latency when there are none yet)"""
+        if not self.latencies:
+            return latency
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, len(ordered) * BASELINE_PERCENTILE // 100)]
+
+    def _on_success(self, latency):
+        baseline = self.baseline(latency)
+        self.latencies.append(latency)
+        if latency <= baseline * LATENCY_TOLERANCE and self.in_flight + 1 >= int(self.limit):
+            # Additive increase: +1 per limit's worth of fast successes at full utilisation
+            self._set_limit(min(self.maximum, self.limit + 1.0 / max(self.limit, 1.0)), "increase")
+
+    def _set_limit(self, limit, reason):
+        before = int(self.limit)
+        self.limit = limit
+        if int(limit) != before:
+            self.history.append((round(time.monotonic() - self._started, 3), int(limit), reason))
+
+    @contextmanager
+    def slot(self):
+        """Run one upstream call under the limit; the caller sets slot.status"""
+        started = self.acquire()
+        handle = _Slot()
+        try:
+            yield handle
+        except Exception as e:
+            self.release(started, classify(error=e), time.monotonic() - started)
+            raise
+        self.release(started, classify(handle.status), time.monotonic() - started)
+
+    # ------------------------------------------------------------------
+    def summary(self):
+        limits = [limit for _, limit, _ in self.history]
+        return {
+            "current_limit": int(self.limit),
+            "min_limit": min(limits),
+            "max_limit": max(limits),
+            "bounds": [self.minimum, self.maximum],
+            "stats": dict(self.stats),
+            "history": [{"t": t, "limit": limit, "reason": reason} for t, limit, reason in self.history]
+        }
+
+    def print_summary(self):
+        s = self.summary()
+        print(f"   🎚️  Concurrency: now {s['current_limit']} (range {s['min_limit']}-{s['max_limit']}, "
+              f"bounds {s['bounds'][0]}-{s['bounds'][1]})")
+        stats = s["stats"]
+        print(f"      {stats['ok']} ok, {stats['throttled']} throttled, {stats['error']} errors, "
+              f"{stats['timeout']} timeouts, {stats['memory_waits']} memory waits")
+        if len(s["history"]) > 1:
+            steps = " → ".join(f"{h['limit']}@{h['t']:.0f}s" for h in s["history"][-12:])
+            print(f"      History: {steps}")
+
+# One limiter per process, shared by every image generator
+IMAGE_LIMITER = AdaptiveLimiter(
+    initial=int(os.environ.get("MODELIT_CONCURRENCY_INITIAL", DEFAULT_INITIAL)),
+    maximum=int(os.environ.get("MODELIT_CONCURRENCY_MAX", DEFAULT_MAXIMUM))
+)
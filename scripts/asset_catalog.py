@@ -0,0 +1,256 @@
+"""
+Asset Catalog for ModelIt K12
+Loads the declarative catalog of generated assets (visual assets, icon topics,
+mascot poses) from JSONL, one entry per line, validates it against SCHEMA and
+keeps a compiled pickle keyed by the file's SHA-256 so large catalogs load in
+milliseconds. Entries carry a priority, tags and an optional ASSET_SIZES target.
+Catalog: /catalog/brand_assets.jsonl
+Cache: /assets/.cache/catalog/*.pickle
+Usage: python scripts/asset_catalog.py [--catalog=PATH] [--kind=visual] [--tags=biology]
+"""
+
+import os
+import sys
+import json
+import pickle
+import hashlib
+import argparse
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+CATALOG_PATH = ROOT / "catalog" / "brand_assets.jsonl"
+CACHE_DIR = ROOT / "assets" / ".cache" / "catalog"
+SCHEMA_VERSION = 1  # bump when SCHEMA or the compiled form changes
+
+# kind -> {field: (type, required)}; every kind also takes COMMON_FIELDS
+SCHEMA = {
+    "visual": {
+        "category": (str, True),
+        "filename": (str, True),
+        "prompt": (str, True),
+        "type": (str, True)
+    },
+    "icon_topic": {
+        "name": (str, True)
+    },
+    "mascot_pose": {
+        "name": (str, True)
+    }
+}
+COMMON_FIELDS = {
+    "kind": (str, True),
+    "priority": (int, False),   # higher first; generators in demo mode take the top entries
+    "tags": (list, False),
+    "size": (str, False)        # ASSET_SIZES key, e.g. "icon" or "social_media.twitter_header"
+}
+
+class CatalogError(ValueError):
+    """Raised with every schema violation in a catalog file"""
+
+_loaded = {}  # path -> ((mtime_ns, size), entries, references checked): skips even the hash on repeat loads
+
+# ============================================================================
+# VALIDATION
+# ============================================================================
+
+def _check_entry(entry, line_number):
+    """Schema errors for one parsed line"""
+    if not isinstance(entry, dict):
+        return [f"line {line_number}: expected an object"]
+    kind = entry.get("kind")
+    if kind not in SCHEMA:
+        return [f"line {line_number}: unknown kind {kind!r} (expected one of {', '.join(SCHEMA)})"]
+
+    fields = {**COMMON_FIELDS, **SCHEMA[kind]}
+    errors = []
+    for name, (expected, required) in fields.items():
+        if name not in entry:
+            if required:
+                errors.append(f"line {line_number}: {kind} is missing {name!r}")
+            continue
+        value = entry[name]
+        # bool is an int subclass; a priority of true is a mistake
+        if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            errors.append(f"line {line_number}: {name!r} must be {expected.__name__}, got {type(value).__name__}")
+        elif expected is str and not value.strip():
+            errors.append(f"line {line_number}: {name!r} is empty")
+    for name in entry:
+        if name not in fields:
+            errors.append(f"line {line_number}: unknown field {name!r} for {kind}")
+    tags = entry.get("tags", [])
+    if isinstance(tags, list) and not all(isinstance(tag, str) for tag in tags):
+        errors.append(f"line {line_number}: 'tags' must be a list of strings")
+    filename = entry.get("filename")
+    if kind == "visual" and isinstance(filename, str) and not filename.endswith(".png"):
+        errors.append(f"line {line_number}: filename {filename!r} must end in .png")
+    return errors
+
+def parse_catalog(text, source="catalog"):
+    """Parse and validate JSONL text; returns entries with defaults filled in
+
+    Blank lines and lines starting with # are skipped. All errors are
+    collected and raised together as one CatalogError.
+    """
+    entries, errors, seen = [], [], {}
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError as e:
+            errors.append(f"line {line_number}: invalid JSON ({e.msg})")
+            continue
+        entry_errors = _check_entry(entry, line_number)
+        if entry_errors:
+            errors.extend(entry_errors)
+            continue
+
+        # Output names must be unique within a kind
+        key = (entry["kind"], entry.get("filename") or entry.get("name"))
+        if key in seen:
+            errors.append(f"line {line_number}: duplicate {key[0]} {key[1]!r} (first on line {seen[key]})")
+            continue
+        seen[key] = line_number
+
+        entry.setdefault("priority", 0)
+        entry.setdefault("tags", [])
+        entries.append(entry)
+
+    if errors:
+        raise CatalogError(f"{source}: {len(errors)} error(s)\n  " + "\n  ".join(errors))
+    return entries
+
+def check_references(entries):
+    """Errors for types and sizes that brand_constants does not define"""
+    # Imported here: brand_constants itself loads the catalog at import time
+    from brand_constants import ASSET_SIZES, IMAGE_STYLES
+    errors = []
+    for entry in entries:
+        label = entry.get("filename") or entry.get("name")
+        if entry["kind"] == "visual" and entry["type"] not in IMAGE_STYLES:
+            errors.append(f"{label}: unknown image type {entry['type']!r}")
+        if "size" in entry:
+            node = ASSET_SIZES
+            for part in entry["size"].split("."):
+                node = node.get(part) if isinstance(node, dict) else None
+            if node is None:
+                errors.append(f"{label}: unknown ASSET_SIZES key {entry['size']!r}")
+    return errors
+
+def raise_reference_errors(entries, source="catalog"):
+    """CatalogError listing every check_references error, if there are any"""
+    errors = check_references(entries)
+    if errors:
+        raise CatalogError(f"{source}: {len(errors)} reference error(s)\n  " + "\n  ".join(errors))
+
+# ============================================================================
+# LOADING
+# ============================================================================
+
+def _cache_path(path, digest):
+    return CACHE_DIR / f"{Path(path).stem}-{digest[:16]}-v{SCHEMA_VERSION}.pickle"
+
+def load_catalog(path=CATALOG_PATH, check=True):
+    """Validated catalog entries, from the compiled cache when the file is unchanged
+
+    check: also resolve types and sizes against brand_constants (see
+    check_references), so a bad "size" fails here rather than after a paid
+    image call. brand_constants passes False: it loads the catalog before
+    defining them, and checks it once they exist.
+    """
+    path = Path(path)
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    loaded = _loaded.get(path)
+    if loaded and loaded[0] == version:
+        if loaded[2] or not check:
+            return loaded[1]
+        raise_reference_errors(loaded[1], path)
+        _loaded[path] = (version, loaded[1], True)
+        return loaded[1]
+
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    cache_path = _cache_path(path, digest)
+    try:
+        with open(cache_path, "rb") as f:
+            entries = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        entries = parse_catalog(data.decode("utf-8"), str(path))
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            # Only the current compilation of each catalog is kept
+            for stale in CACHE_DIR.glob(f"{path.stem}-*.pickle"):
+                stale.unlink()
+            temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, "wb") as f:
+                pickle.dump(entries, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            pass  # read-only checkout: still correct, just not cached
+
+    if check:
+        raise_reference_errors(entries, path)
+    _loaded[path] = (version, entries, check)
+    return entries
+
+def select(entries, kind, tags=None):
+    """Entries of one kind, highest priority first (catalog order within a priority)
+
+    tags: only entries carrying at least one of these tags
+    """
+    chosen = [entry for entry in entries if entry["kind"] == kind]
+    if tags:
+        wanted = set(tags)
+        chosen = [entry for entry in chosen if wanted & set(entry["tags"])]
+    return sorted(chosen, key=lambda entry: -entry["priority"])
+
+def names(entries, kind):
+    """Names of icon_topic / mascot_pose entries, highest priority first"""
+    return [entry["name"] for entry in select(entries, kind)]
+
+def visual_assets(entries=None, tags=None):
+    """{category: [asset dicts]} in the shape generate_visual_assets.py consumes"""
+    entries = load_catalog() if entries is None else entries
+    assets = {}
+    for entry in select(entries, "visual", tags):
+        asset = {key: value for key, value in entry.items() if key not in ("kind", "category")}
+        assets.setdefault(entry["category"], []).append(asset)
+    # Categories in catalog order, not priority order
+    order = list(dict.fromkeys(entry["category"] for entry in entries if entry["kind"] == "visual"))
+    return {category: assets[category] for category in order if category in assets}
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and summarize the ModelIt K12 asset catalog")
+    parser.add_argument("--catalog", default=str(CATALOG_PATH))
+    parser.add_argument("--kind", choices=list(SCHEMA), default=None, help="List entries of one kind")
+    parser.add_argument("--tags", default=None, help="Comma-separated tags to filter the listing by")
+    args = parser.parse_args(argv)
+
+    print(f"\n📚 Asset catalog: {args.catalog}")
+    started = time.perf_counter()
+    try:
+        entries = load_catalog(args.catalog)
+    except CatalogError as e:
+        print(f"  └─ ❌ {e}")
+        return 1
+    print(f"  ├─ Loaded {len(entries)} entries in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    for kind in SCHEMA:
+        print(f"  ├─ {kind}: {sum(1 for entry in entries if entry['kind'] == kind)}")
+    if args.kind:
+        tags = args.tags.split(",") if args.tags else None
+        for entry in select(entries, args.kind, tags):
+            print(f"   • [{entry['priority']:>3}] {entry.get('filename') or entry['name']}"
+                  f"  {', '.join(entry['tags'])}")
+    print("  └─ ✅ Catalog valid")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
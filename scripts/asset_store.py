@@ -0,0 +1,248 @@
+"""
+Content-Addressed Asset Store for ModelIt K12
+Every generated file is stored once under assets/.store/blobs/<ab>/<sha256>,
+and the human-readable paths (assets/visuals/..., assets/mascot/...) are
+hardlinks (or symlinks/copies where links are unavailable) into the store.
+Old versions stay in the store at no cost for identical content; an
+append-only ref log records which blob each path pointed to over time.
+
+Blobs are read-only, and so are the hardlinked views: writing to
+assets/visuals/x.png in place fails with a permission error rather than
+silently rewriting history. Change an asset by saving new bytes through
+save_asset() or by restoring an older version; to edit a file by hand,
+detach it into a writable copy with `edit` and record the result with `add`.
+
+Usage:
+    python scripts/asset_store.py history visuals/dna_double_helix.png
+    python scripts/asset_store.py restore visuals/dna_double_helix.png <sha256-prefix>
+    python scripts/asset_store.py edit visuals/dna_double_helix.png
+    python scripts/asset_store.py add visuals/dna_double_helix.png
+    python scripts/asset_store.py gc [--keep=N]
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+ASSETS_DIR = Path(__file__).parent.parent / "assets"
+STORE_DIR = ASSETS_DIR / ".store"
+BLOB_DIR = STORE_DIR / "blobs"
+REFS_PATH = STORE_DIR / "refs.jsonl"
+
+# Latest sha256 per path, kept in step with refs.jsonl by parsing only the
+# lines appended since the last read (so a batch of saves stays linear)
+_refs_index = {}
+_refs_state = {"file": None, "offset": 0}
+_refs_lock = threading.Lock()
+
+def blob_path(digest):
+    """Location of a blob, sharded by the first two hex digits"""
+    return BLOB_DIR / digest[:2] / digest
+
+def put_bytes(data):
+    """Store bytes and return their SHA-256; identical content is stored once"""
+    digest = hashlib.sha256(data).hexdigest()
+    path = blob_path(digest)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # Read-only, so writing through a hardlinked view cannot corrupt history
+        os.chmod(tmp_name, 0o444)
+        os.replace(tmp_name, path)
+    return digest
+
+def put_file(path):
+    """Store an existing file's content and return its SHA-256"""
+    with open(path, "rb") as f:
+        return put_bytes(f.read())
+
+def link_view(digest, rel_path):
+    """Point assets/<rel_path> at a blob: hardlink, else symlink, else copy"""
+    source = blob_path(digest)
+    target = ASSETS_DIR / rel_path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists() and os.path.samefile(source, target):
+        return target
+
+    # Build the new link beside the target, then swap it in atomically
+    tmp_target = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    if tmp_target.exists() or tmp_target.is_symlink():
+        tmp_target.unlink()
+    try:
+        os.link(source, tmp_target)
+    except OSError:
+        try:
+            os.symlink(os.path.relpath(source, target.parent), tmp_target)
+        except OSError:
+            shutil.copyfile(source, tmp_target)
+    os.replace(tmp_target, target)
+    return target
+
+def _append_ref(rel_path, digest):
+    REFS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    entry = {"path": str(rel_path).replace(os.sep, "/"), "sha256": digest, "time": time.time()}
+    with open(REFS_PATH, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+def detach_view(rel_path):
+    """Replace a view with a private writable copy, for editing in place"""
+    target = ASSETS_DIR / rel_path
+    tmp_target = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    shutil.copyfile(target, tmp_target)
+    os.chmod(tmp_target, 0o644)
+    os.replace(tmp_target, target)
+    return target
+
+def save_asset(data, asset_type, filename):
+    """Store bytes and expose them at assets/<asset_type>/<filename>"""
+    rel_path = Path(asset_type) / filename
+    digest = put_bytes(data)
+    current = _read_refs().get(str(rel_path).replace(os.sep, "/"))
+    path = link_view(digest, rel_path)
+    if current != digest:
+        _append_ref(rel_path, digest)
+    return path
+
+def iter_refs():
+    """Yield ref log entries, oldest first"""
+    if not REFS_PATH.exists():
+        return
+    with open(REFS_PATH, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def _read_refs():
+    """Bring the in-memory ref index up to date and return it (do not mutate)"""
+    with _refs_lock:
+        try:
+            stat = REFS_PATH.stat()
+        except FileNotFoundError:
+            _refs_index.clear()
+            _refs_state.update(file=None, offset=0)
+            return _refs_index
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != _refs_state["file"] or stat.st_size < _refs_state["offset"]:
+            # gc rewrote the log (new inode) or it was truncated: start over
+            _refs_index.clear()
+            _refs_state.update(file=file_id, offset=0)
+        offset = _refs_state["offset"]
+        if stat.st_size > offset:
+            with open(REFS_PATH, "rb") as f:
+                f.seek(offset)
+                tail = f.read()
+            # A line still being appended by another process is left for next time
+            end = tail.rfind(b"\n") + 1
+            for line in tail[:end].splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    _refs_index[entry["path"]] = entry["sha256"]
+            _refs_state["offset"] = offset + end
+        return _refs_index
+
+def current_refs():
+    """{relative path: sha256 of the latest version}"""
+    return dict(_read_refs())
+
+def history(rel_path):
+    """All recorded versions of a path, oldest first"""
+    rel_path = str(rel_path).replace(os.sep, "/")
+    return [entry for entry in iter_refs() if entry["path"] == rel_path]
+
+def restore(rel_path, digest_prefix):
+    """Point a path back at an earlier version"""
+    matches = {entry["sha256"] for entry in history(rel_path) if entry["sha256"].startswith(digest_prefix)}
+    if len(matches) != 1:
+        raise ValueError(f"{len(matches)} versions of {rel_path} match '{digest_prefix}'")
+    digest = matches.pop()
+    link_view(digest, rel_path)
+    _append_ref(rel_path, digest)
+    return digest
+
+def gc(keep=None, dry_run=False):
+    """Delete blobs no ref points to; keep=N (at least 1) also drops all but the last N versions per path
+
+    Returns (blobs removed, bytes freed).
+    """
+    versions = {}
+    for entry in iter_refs():
+        versions.setdefault(entry["path"], []).append(entry)
+
+    if keep is not None:
+        keep = max(1, keep)  # the latest version is what the assets/ views link to
+        kept_entries = []
+        for entries in versions.values():
+            # Walk newest first and keep the last N distinct versions
+            seen = []
+            for entry in reversed(entries):
+                if entry["sha256"] not in seen:
+                    seen.append(entry["sha256"])
+                if len(seen) > keep:
+                    break
+                kept_entries.append(entry)
+        kept_entries.sort(key=lambda entry: entry["time"])
+        if not dry_run:
+            tmp_path = REFS_PATH.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for entry in kept_entries:
+                    f.write(json.dumps(entry) + "\n")
+            os.replace(tmp_path, REFS_PATH)
+        referenced = {entry["sha256"] for entry in kept_entries}
+    else:
+        referenced = {entry["sha256"] for entries in versions.values() for entry in entries}
+
+    removed = freed = 0
+    if not BLOB_DIR.exists():
+        return removed, freed
+    for shard in BLOB_DIR.iterdir():
+        for blob in shard.iterdir():
+            if blob.name in referenced or blob.name.endswith(".tmp") or blob.name.startswith("tmp"):
+                continue
+            removed += 1
+            freed += blob.stat().st_size
+            if not dry_run:
+                os.chmod(blob, 0o644)
+                blob.unlink()
+    return removed, freed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Content-addressed storage for ModelIt K12 assets")
+    parser.add_argument("command", choices=["history", "restore", "gc", "add", "edit"])
+    parser.add_argument("args", nargs="*")
+    parser.add_argument("--keep", type=int, default=None, help="gc: versions to keep per path")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.command == "history":
+        for entry in history(args.args[0]):
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["time"]))
+            print(f"  {stamp}  {entry['sha256'][:12]}")
+    elif args.command == "restore":
+        digest = restore(args.args[0], args.args[1])
+        print(f"✅ {args.args[0]} → {digest[:12]}")
+    elif args.command == "edit":
+        for rel_path in args.args:
+            detach_view(rel_path)
+            print(f"  ├─ ✏️  {rel_path} is now a writable copy; run 'add {rel_path}' when done")
+    elif args.command == "add":
+        # Move existing files (e.g. generated before the store existed) into the store
+        for rel_path in args.args:
+            with open(ASSETS_DIR / rel_path, "rb") as f:
+                data = f.read()
+            save_asset(data, str(Path(rel_path).parent), Path(rel_path).name)
+            print(f"  ├─ 📦 {rel_path}")
+    elif args.command == "gc":
+        removed, freed = gc(args.keep, args.dry_run)
+        verb = "Would remove" if args.dry_run else "Removed"
+        print(f"🗑️  {verb} {removed} unreferenced blobs ({freed / 1024 / 1024:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,15 @@ ModelIt K12 Brand Constants
 Complete brand identity specification for automated asset generation
 """
 
+import sys
+from pathlib import Path
 from pptx.dml.color import RGBColor
 
+# Mascot poses, icon topics and visual assets live in catalog/brand_assets.jsonl
+sys.path.append(str(Path(__file__).parent))
+from asset_catalog import load_catalog, raise_reference_errors, names as catalog_names
+_catalog = load_catalog(check=False)  # types and sizes are checked once defined, below
+
 # ============================================================================
 # BRAND COLORS
 # ============================================================================
@@ -115,18 +122,7 @@ MASCOT_INFO = {
         BRAND_COLORS["accent_teal"]["hex"],
         BRAND_COLORS["accent_gold"]["hex"]
     ],
-    "poses": [
-        "thinking (hand on chin)",
-        "celebrating (arms raised)",
-        "teaching (pointing at board)",
-        "experimenting (holding test tube)",
-        "reading (with book)",
-        "surprised (wide eyes)",
-        "confused (question mark)",
-        "excited (jumping)",
-        "working (at computer)",
-        "presenting (with pointer)"
-    ]
+    "poses": catalog_names(_catalog, "mascot_pose")  # highest priority first
 }
 
 # ============================================================================
@@ -229,20 +225,7 @@ PPT_LAYOUT = {
 # ICON LIBRARY TOPICS
 # ============================================================================
 
-ICON_TOPICS = [
-    "NGSS Standards",
-    "Cell Biology",
-    "Systems Thinking",
-    "Boolean Modeling",
-    "Chemical Reactions",
-    "Energy Transfer",
-    "Phase Changes",
-    "Conservation Laws",
-    "Atomic Structure",
-    "Feedback Loops",
-    "Scientific Method",
-    "Lab Equipment"
-]
+ICON_TOPICS = catalog_names(_catalog, "icon_topic")
 
 # ============================================================================
 # STYLE GUIDE SECTIONS
@@ -260,3 +243,7 @@ STYLE_GUIDE_SECTIONS = [
     "Do's and Don'ts",
     "Brand Voice and Tone"
 ]
+
+# Catalog types and sizes must name IMAGE_STYLES / ASSET_SIZES entries: fail
+# at import, before any generator sends a request
+raise_reference_errors(_catalog, "catalog")
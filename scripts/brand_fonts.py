@@ -0,0 +1,143 @@
+"""
+Brand Font Lookup and Glyph Cache for ModelIt K12
+Resolves the FONTS families to TrueType files on this machine (falling back
+to the primary fallback, then DejaVu/Liberation, then Pillow's built-in
+font) and caches rasterized glyphs per (font, size) so batches of images
+reuse glyph bitmaps instead of re-rendering the same text.
+"""
+
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import FONTS
+
+FONT_DIRS = [
+    Path.home() / ".fonts",
+    Path.home() / ".local" / "share" / "fonts",
+    Path("/usr/share/fonts"),
+    Path("/usr/local/share/fonts"),
+    Path("/Library/Fonts"),
+    Path("/System/Library/Fonts"),
+    Path(os.environ.get("WINDIR", "C:/Windows")) / "Fonts",
+]
+
+# Family name -> candidate file names (Windows/macOS names first, metric-compatible stand-ins after)
+FONT_FILES = {
+    "Segoe UI": ["segoeui.ttf", "Segoe UI.ttf"],
+    "Segoe UI Semibold": ["seguisb.ttf", "Segoe UI Semibold.ttf"],
+    "Arial": ["arial.ttf", "Arial.ttf", "LiberationSans-Regular.ttf"],
+    "Consolas": ["consola.ttf", "Consolas.ttf", "DejaVuSansMono.ttf"],
+}
+GENERIC_FALLBACKS = ["DejaVuSans.ttf", "LiberationSans-Regular.ttf", "FreeSans.ttf"]
+BOLD_FALLBACKS = ["arialbd.ttf", "Arial Bold.ttf", "LiberationSans-Bold.ttf", "DejaVuSans-Bold.ttf"]
+
+@lru_cache(maxsize=1)
+def _font_index():
+    """{lower-case file name: path} for every TrueType/OpenType font found"""
+    index = {}
+    for font_dir in FONT_DIRS:
+        if not font_dir.is_dir():
+            continue
+        for root, _, files in os.walk(font_dir):
+            for name in files:
+                if name.lower().endswith((".ttf", ".otf", ".ttc")):
+                    index.setdefault(name.lower(), os.path.join(root, name))
+    return index
+
+@lru_cache(maxsize=None)
+def find_font_file(family):
+    """Path of the best available file for a font family, or None"""
+    is_bold = any(word in family.lower() for word in ("semibold", "bold"))
+    candidates = list(FONT_FILES.get(family, [f"{family}.ttf"]))
+    candidates += FONT_FILES[FONTS["primary_fallback"]]
+    candidates += (BOLD_FALLBACKS if is_bold else []) + GENERIC_FALLBACKS
+
+    index = _font_index()
+    for name in candidates:
+        if name.lower() in index:
+            return index[name.lower()]
+    return None
+
+@lru_cache(maxsize=None)
+def load_font(family, size):
+    """FreeTypeFont for a family at a pixel size (Pillow's default font if nothing is installed)"""
+    path = find_font_file(family)
+    if path:
+        return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size)
+
+class GlyphCache:
+    """Rasterized glyph masks and advances, cached per (family, size, character)"""
+
+    def __init__(self):
+        self._glyphs = {}
+        self._kerning = {}
+        self.stats = {"hits": 0, "misses": 0}
+
+    def glyph(self, family, size, char):
+        """(mask uint8 array, x offset, y offset from the line top, advance width)"""
+        key = (family, size, char)
+        cached = self._glyphs.get(key)
+        if cached is not None:
+            self.stats["hits"] += 1
+            return cached
+
+        self.stats["misses"] += 1
+        font = load_font(family, size)
+        left, top, right, bottom = font.getbbox(char, anchor="la")
+        if right > left and bottom > top:
+            image = Image.new("L", (right - left, bottom - top), 0)
+            ImageDraw.Draw(image).text((-left, -top), char, font=font, fill=255, anchor="la")
+            mask = np.asarray(image)
+        else:
+            mask = np.zeros((0, 0), dtype=np.uint8)
+        cached = (mask, left, top, font.getlength(char))
+        self._glyphs[key] = cached
+        return cached
+
+    def kerning(self, family, size, pair):
+        """Kerning adjustment for a character pair (0 when the font has none)"""
+        key = (family, size, pair)
+        if key not in self._kerning:
+            font = load_font(family, size)
+            self._kerning[key] = font.getlength(pair) - font.getlength(pair[0]) - font.getlength(pair[1])
+        return self._kerning[key]
+
+    def measure(self, family, size, text):
+        """Advance width of a single line of text"""
+        width = 0.0
+        for i, char in enumerate(text):
+            if i:
+                width += self.kerning(family, size, text[i - 1:i + 1])
+            width += self.glyph(family, size, char)[3]
+        return width
+
+    def line_height(self, family, size):
+        ascent, descent = load_font(family, size).getmetrics()
+        return ascent + descent
+
+    def render(self, family, size, text):
+        """Coverage mask (uint8 array) for a single line of text"""
+        width = int(np.ceil(self.measure(family, size, text))) + size
+        mask = np.zeros((self.line_height(family, size) + size // 4, width), dtype=np.uint8)
+        pen = extent = 0.0
+        for i, char in enumerate(text):
+            if i:
+                pen += self.kerning(family, size, text[i - 1:i + 1])
+            glyph, left, top, advance = self.glyph(family, size, char)
+            if glyph.size:
+                x, y = int(round(pen)) + left, top
+                x0, y0 = max(x, 0), max(y, 0)
+                x1, y1 = min(x + glyph.shape[1], width), min(y + glyph.shape[0], mask.shape[0])
+                region = mask[y0:y1, x0:x1]
+                np.maximum(region, glyph[y0 - y:y1 - y, x0 - x:x1 - x], out=region)
+                extent = max(extent, x1)
+            pen += advance
+        return mask[:, :max(int(np.ceil(max(pen, extent))), 1)]
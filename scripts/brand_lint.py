@@ -0,0 +1,163 @@
+"""
+Brand Lint for ModelIt K12 PowerPoint Decks
+Audits existing PPTX files for off-brand colors, typefaces and font sizes
+Reads zip parts directly with incremental XML parsing (no python-pptx object model)
+Output: JSON report (default: brand_lint_report.json)
+"""
+
+import os
+import sys
+import json
+import zipfile
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from xml.etree.ElementTree import iterparse, ParseError
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import BRAND_COLORS, COLORS_PPT, FONTS, FONT_SIZES
+from pptx_zip import NS_A, iter_parts, tag
+
+# Allowed values, normalised the way they appear in DrawingML
+ALLOWED_COLORS = (
+    {info["hex"].lstrip("#").upper() for info in BRAND_COLORS.values()}
+    | {str(color).upper() for color in COLORS_PPT.values()}
+)
+ALLOWED_TYPEFACES = set(FONTS.values())
+ALLOWED_SIZES = {size * 100 for size in FONT_SIZES.values()}  # sz is in 1/100 pt
+
+TAG_SRGB = tag(NS_A, "srgbClr")
+TAG_LATIN = tag(NS_A, "latin")
+SIZED_TAGS = {tag(NS_A, name) for name in ("rPr", "defRPr", "endParaRPr")}
+
+def lint_part(stream):
+    """Scan one XML part and return a Counter of (rule, value) violations"""
+    findings = Counter()
+
+    for event, elem in iterparse(stream, events=("start", "end")):
+        if event == "end":
+            # Drop finished subtrees so memory stays flat on large parts
+            elem.clear()
+            continue
+
+        if elem.tag == TAG_SRGB:
+            value = (elem.get("val") or "").upper()
+            if value not in ALLOWED_COLORS:
+                findings[("color", value)] += 1
+        elif elem.tag == TAG_LATIN:
+            typeface = elem.get("typeface") or ""
+            # "+mj-lt" / "+mn-lt" refer to the theme fonts, checked via the theme part
+            if typeface and not typeface.startswith("+") and typeface not in ALLOWED_TYPEFACES:
+                findings[("typeface", typeface)] += 1
+        elif elem.tag in SIZED_TAGS:
+            size = elem.get("sz")
+            if size is not None and int(size) not in ALLOWED_SIZES:
+                findings[("font_size", int(size) / 100)] += 1
+
+    return findings
+
+def lint_deck(path, kinds=("slide",)):
+    """Lint a single PPTX file and return its report entry"""
+    result = {"file": str(path), "findings": [], "error": None}
+
+    try:
+        with zipfile.ZipFile(path) as zf:
+            for info, kind in iter_parts(zf, kinds):
+                with zf.open(info) as stream:
+                    findings = lint_part(stream)
+                for (rule, value), count in sorted(findings.items(), key=str):
+                    result["findings"].append({
+                        "part": info.filename,
+                        "kind": kind,
+                        "rule": rule,
+                        "value": value,
+                        "count": count
+                    })
+    except (zipfile.BadZipFile, ParseError, OSError, ValueError) as e:
+        result["error"] = str(e)
+
+    return result
+
+def find_decks(paths):
+    """Expand files and directories into a sorted list of .pptx paths"""
+    decks = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            decks.extend(p for p in path.rglob("*.pptx") if not p.name.startswith("~$"))
+        elif path.suffix.lower() == ".pptx":
+            decks.append(path)
+    return sorted(set(decks))
+
+def lint_decks(paths, kinds=("slide",), workers=None):
+    """Lint every deck under paths across a process pool"""
+    decks = find_decks(paths)
+    if not decks:
+        return []
+
+    if workers == 1 or len(decks) == 1:
+        return [lint_deck(deck, kinds) for deck in decks]
+
+    workers = workers or os.cpu_count() or 1
+    # Large chunks keep inter-process overhead small when auditing thousands of decks
+    chunksize = max(1, len(decks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lint_deck, decks, [kinds] * len(decks), chunksize=chunksize))
+
+def write_report(results, report_path):
+    """Write the machine-readable lint report"""
+    report = {
+        "allowed": {
+            "colors": sorted(ALLOWED_COLORS),
+            "typefaces": sorted(ALLOWED_TYPEFACES),
+            "font_sizes": sorted(FONT_SIZES.values())
+        },
+        "files_checked": len(results),
+        "files_with_findings": sum(1 for r in results if r["findings"]),
+        "files_with_errors": sum(1 for r in results if r["error"]),
+        "results": results
+    }
+
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    return report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check PPTX decks against the ModelIt K12 brand")
+    parser.add_argument("paths", nargs="*", default=[str(Path(__file__).parent.parent / "assets")],
+                        help="PPTX files or directories to scan (default: assets/)")
+    parser.add_argument("--all-parts", action="store_true",
+                        help="Also check slide layouts, masters and themes")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--report", default="brand_lint_report.json", help="Report output path")
+    args = parser.parse_args(argv)
+
+    kinds = ("slide", "layout", "master", "theme") if args.all_parts else ("slide",)
+
+    print("\n🔍 Linting PowerPoint decks against ModelIt K12 brand...")
+    results = lint_decks(args.paths, kinds, args.workers)
+    report = write_report(results, args.report)
+
+    for result in results:
+        if result["error"]:
+            print(f"  ├─ ❌ {result['file']}: {result['error']}")
+        elif result["findings"]:
+            total = sum(finding["count"] for finding in result["findings"])
+            print(f"  ├─ ⚠️ {result['file']}: {total} off-brand values")
+
+    print(f"  └─ 📄 Report: {args.report}")
+    print(f"\n📊 Brand Lint Complete!")
+    print(f"   • {report['files_checked']} decks checked")
+    print(f"   • {report['files_with_findings']} with findings")
+    if report["files_with_errors"]:
+        print(f"   • {report['files_with_errors']} could not be read")
+
+    return 1 if report["files_with_findings"] or report["files_with_errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+Brand Package Archive for ModelIt K12
+Builds the brand distribution zip (the "Store assets in Google Drive" hand-off)
+in one streaming pass: PNG/WebP/JPEG/PPTX entries are stored as-is (they are
+already compressed), everything else is deflated in parallel worker threads,
+and a manifest of SHA-256 hashes lets the next run copy unchanged entries
+straight from the previous archive instead of reading and recompressing them.
+Output: /dist/modelit_brand_package.zip
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import hashlib
+import zipfile
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import BRAND_INFO
+from pptx_zip import copy_member_raw, write_raw_member
+from reproducible_build import ZIP_EXTERNAL_ATTR, ZIP_CREATE_SYSTEM, build_datetime, reproducible_requested
+
+ROOT = Path(__file__).parent.parent
+DEFAULT_SOURCES = [ROOT / "assets"]
+DEFAULT_OUTPUT = ROOT / "dist" / "modelit_brand_package.zip"
+ARCHIVE_ROOT = "modelit-brand"
+MANIFEST_NAME = f"{ARCHIVE_ROOT}/MANIFEST.json"
+
+# Already-compressed formats: deflating them again costs CPU and saves ~nothing
+STORED_SUFFIXES = {".png", ".apng", ".webp", ".jpg", ".jpeg", ".gif", ".pptx", ".zip"}
+COMPRESS_LEVEL = 6
+LOOKAHEAD = 4  # prepared entries in flight per worker; bounds memory while keeping workers busy
+
+# ============================================================================
+# SCANNING
+# ============================================================================
+
+def iter_sources(sources):
+    """(archive name, path) for every file, sorted; dot-directories (.cache, .store) are skipped"""
+    entries = {}
+    for source in map(Path, sources):
+        if source.is_file():
+            files = [(source.name, source)]
+        else:
+            files = []
+            for dirpath, dirnames, filenames in os.walk(source):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                for filename in filenames:
+                    if not filename.startswith("."):
+                        path = Path(dirpath) / filename
+                        files.append((path.relative_to(source).as_posix(), path))
+        for rel_name, path in files:
+            name = f"{ARCHIVE_ROOT}/{rel_name}"
+            if name in entries and entries[name] != path:
+                raise ValueError(f"Two sources map to {name}: {entries[name]} and {path}")
+            entries[name] = path
+    return sorted(entries.items())
+
+def read_manifest(archive_path):
+    """(files, build settings) from an existing package, or ({}, None)
+
+    files is {name: {"sha256", "size"[, "mtime_ns"]}}.
+    """
+    try:
+        with zipfile.ZipFile(archive_path) as zf:
+            manifest = json.loads(zf.read(MANIFEST_NAME))
+        return manifest["files"], manifest.get("build")
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        return {}, None
+
+# ============================================================================
+# ENTRY PREPARATION (worker threads)
+# ============================================================================
+
+def _deflate(data, level):
+    """Raw deflate stream, as zip stores it; zlib releases the GIL while compressing"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+def prepare_entry(name, path, previous, level, reproducible=False):
+    """Read, hash and compress one file; returns a dict for write_entry
+
+    An entry whose size and mtime (or, failing that, SHA-256) match the
+    previous manifest comes back as "reuse" without being compressed.
+    Reproducible builds leave mtime out of the manifest, since it differs
+    between checkouts, and so always compare by SHA-256.
+    """
+    stat = path.stat()
+    record = {"size": stat.st_size} if reproducible else {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if previous and previous["size"] == stat.st_size and previous.get("mtime_ns", -1) == record.get("mtime_ns"):
+        return {"name": name, "action": "reuse", "record": {**record, "sha256": previous["sha256"]}}
+
+    data = path.read_bytes()
+    record["sha256"] = hashlib.sha256(data).hexdigest()
+    if previous and previous["sha256"] == record["sha256"]:
+        return {"name": name, "action": "reuse", "record": record}
+
+    crc = zlib.crc32(data)
+    if path.suffix.lower() in STORED_SUFFIXES:
+        return {"name": name, "action": "store", "record": record, "raw": data,
+                "crc": crc, "compress_type": zipfile.ZIP_STORED, "mtime": stat.st_mtime}
+    raw = _deflate(data, level)
+    if len(raw) >= len(data):
+        raw, compress_type = data, zipfile.ZIP_STORED
+    else:
+        compress_type = zipfile.ZIP_DEFLATED
+    return {"name": name, "action": "deflate" if compress_type == zipfile.ZIP_DEFLATED else "store",
+            "record": record, "raw": raw, "crc": crc, "compress_type": compress_type, "mtime": stat.st_mtime}
+
+# ============================================================================
+# ARCHIVE WRITING (main thread, in name order)
+# ============================================================================
+
+def _zip_info(name, date_time, entry):
+    info = zipfile.ZipInfo(name, date_time=date_time)
+    info.create_system = ZIP_CREATE_SYSTEM
+    info.external_attr = ZIP_EXTERNAL_ATTR
+    info.compress_type = entry["compress_type"]
+    info.CRC = entry["crc"]
+    info.compress_size = len(entry["raw"])
+    info.file_size = entry["record"]["size"]
+    return info
+
+def build_package(sources=None, output_path=DEFAULT_OUTPUT, full=False, level=COMPRESS_LEVEL,
+                  workers=None, reproducible=None):
+    """Write the brand package; unchanged entries are copied raw from the previous archive
+
+    full: ignore the previous archive and compress everything
+    Returns (output path, counts by action).
+    """
+    sources = DEFAULT_SOURCES if sources is None else sources
+    output_path = Path(output_path)
+    reproducible = reproducible_requested() if reproducible is None else reproducible
+    fixed_time = build_datetime().timetuple()[:6] if reproducible else None
+    workers = workers or os.cpu_count() or 1
+
+    entries = iter_sources(sources)
+    paths = dict(entries)
+    previous, previous_build = ({}, None) if full else read_manifest(output_path)
+    removed = len(set(previous) - set(paths))
+    # Reused members keep their old timestamps and compression, so only reuse
+    # from an archive built with the same settings
+    build = {"level": level, "date_time": list(fixed_time) if fixed_time else None}
+    if previous_build != build:
+        previous = {}
+    old_zip = zipfile.ZipFile(output_path) if previous else None
+    old_fp = open(output_path, "rb") if previous else None
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_path.with_suffix(f".{os.getpid()}.tmp")
+    counts = {"store": 0, "deflate": 0, "reuse": 0, "removed": removed}
+    manifest = {}
+
+    def write_entry(zf, entry):
+        name = entry["name"]
+        if entry["action"] == "reuse":
+            try:
+                copy_member_raw(old_fp, zf, old_zip.getinfo(name))
+            except KeyError:
+                # Manifest lists it but the member is gone: rebuild this one entry
+                entry = prepare_entry(name, paths[name], None, level, reproducible)
+        if entry["action"] != "reuse":
+            date_time = fixed_time or time.localtime(entry["mtime"])[:6]
+            write_raw_member(zf, _zip_info(name, max(date_time, (1980, 1, 1, 0, 0, 0)), entry), entry["raw"])
+        counts[entry["action"]] += 1
+        manifest[name] = entry["record"]
+
+    try:
+        with zipfile.ZipFile(temp_path, "w", allowZip64=True) as zf, ThreadPoolExecutor(workers) as pool:
+            # Bounded lookahead: workers compress ahead while entries are written in order
+            pending = deque()
+            for name, path in entries:
+                pending.append(pool.submit(prepare_entry, name, path, previous.get(name), level, reproducible))
+                if len(pending) >= workers * LOOKAHEAD:
+                    write_entry(zf, pending.popleft().result())
+            while pending:
+                write_entry(zf, pending.popleft().result())
+
+            zf.writestr(
+                zipfile.ZipInfo(MANIFEST_NAME, date_time=fixed_time or time.localtime()[:6]),
+                json.dumps({"brand": BRAND_INFO["name"], "build": build, "files": manifest}, indent=1, sort_keys=True),
+                compress_type=zipfile.ZIP_DEFLATED
+            )
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    finally:
+        if old_zip is not None:
+            old_zip.close()
+            old_fp.close()
+
+    os.replace(temp_path, output_path)
+    return output_path, counts
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the ModelIt K12 brand distribution archive")
+    parser.add_argument("sources", nargs="*", help="Files or directories (default: assets/)")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+    parser.add_argument("--full", action="store_true", help="Recompress everything, ignoring the previous archive")
+    parser.add_argument("--level", type=int, default=COMPRESS_LEVEL, help="Deflate level for compressible files")
+    parser.add_argument("--workers", type=int, default=None, help="Compression threads (default: CPU count)")
+    parser.add_argument("--reproducible", action="store_true", help="Fixed entry timestamps (SOURCE_DATE_EPOCH)")
+    args = parser.parse_args(argv)
+
+    print("\n📦 Building ModelIt K12 brand package...")
+    started = time.perf_counter()
+    output_path, counts = build_package(
+        args.sources or None, args.output, args.full, args.level, args.workers, args.reproducible or None
+    )
+    size = output_path.stat().st_size
+    print(f"  ├─ Stored: {counts['store']}  Deflated: {counts['deflate']}  "
+          f"Unchanged (copied raw): {counts['reuse']}  Removed: {counts['removed']}")
+    print(f"  └─ ✅ {output_path} ({size / 1024 / 1024:.1f} MB, {time.perf_counter() - started:.2f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Deck Media Pipeline for ModelIt K12 PowerPoint Generators
+Places generated visuals and mascot images on slides at their display size
+Each image is downscaled to placed size x target DPI before embedding, and
+renditions are cached by content hash so a batch of decks resizes once
+Cache: /assets/.cache/renditions/*.png
+"""
+
+import io
+import sys
+import math
+import hashlib
+from pathlib import Path
+
+from PIL import Image
+from pptx.util import Inches
+
+sys.path.append(str(Path(__file__).parent))
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "assets" / ".cache" / "renditions"
+DEFAULT_DPI = 150  # Sharp on projectors and laptop screens; use 300 for print
+
+def file_sha256(path):
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def fit_within(image_size, box_width, box_height):
+    """Largest (width, height) in inches with the image aspect ratio inside the box"""
+    image_width, image_height = image_size
+    scale = min(box_width / image_width, box_height / image_height)
+    return image_width * scale, image_height * scale
+
+class MediaCache:
+    """Pre-sized, content-addressed image renditions shared across decks
+
+    Identical source bytes share one rendition no matter which path they come
+    from, and python-pptx stores identical blobs once per deck, so repeated
+    images cost nothing after the first placement.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, dpi=DEFAULT_DPI):
+        self.cache_dir = Path(cache_dir)
+        self.dpi = dpi
+        self._source_hashes = {}  # (path, mtime, size) -> sha256
+        self._source_sizes = {}   # sha256 -> pixel size
+        self._renditions = {}     # rendition key -> bytes
+        self.stats = {"placed": 0, "resized": 0, "cache_hits": 0}
+
+    def source_hash(self, path):
+        """Content hash of a source image, memoized by path/mtime/size"""
+        stat = Path(path).stat()
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        if key not in self._source_hashes:
+            self._source_hashes[key] = file_sha256(path)
+        return self._source_hashes[key]
+
+    def source_size(self, path):
+        """Pixel size of a source image (header read only)"""
+        digest = self.source_hash(path)
+        if digest not in self._source_sizes:
+            with Image.open(path) as image:
+                self._source_sizes[digest] = image.size
+        return self._source_sizes[digest]
+
+    def rendition(self, path, width_in, height_in):
+        """PNG bytes of the image sized for width_in x height_in at self.dpi"""
+        digest = self.source_hash(path)
+        target = (max(1, math.ceil(width_in * self.dpi)), max(1, math.ceil(height_in * self.dpi)))
+        key = f"{digest[:32]}_{target[0]}x{target[1]}"
+
+        if key in self._renditions:
+            self.stats["cache_hits"] += 1
+            return self._renditions[key]
+
+        cache_path = self.cache_dir / f"{key}.png"
+        if cache_path.exists():
+            self.stats["cache_hits"] += 1
+            data = cache_path.read_bytes()
+        else:
+            data = self._render(path, target)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(cache_path)
+            self.stats["resized"] += 1
+
+        self._renditions[key] = data
+        return data
+
+    def _render(self, path, target):
+        with Image.open(path) as image:
+            image.load()
+            if image.mode not in ("RGB", "RGBA"):
+                has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+                image = image.convert("RGBA" if has_alpha else "RGB")
+            # Never upscale: a small source is embedded as-is
+            if image.width > target[0] or image.height > target[1]:
+                image = image.resize(target, Image.LANCZOS, reducing_gap=3.0)
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue()
+
+    def add_picture(self, slide, path, left, top, width, height):
+        """Place an image inside a box (inches), preserving aspect ratio and centred"""
+        placed_width, placed_height = fit_within(self.source_size(path), width, height)
+        data = self.rendition(path, placed_width, placed_height)
+
+        picture = slide.shapes.add_picture(
+            io.BytesIO(data),
+            Inches(left + (width - placed_width) / 2),
+            Inches(top + (height - placed_height) / 2),
+            Inches(placed_width),
+            Inches(placed_height)
+        )
+        self.stats["placed"] += 1
+        return picture
@@ -11,6 +11,7 @@ import subprocess
 
 # Import individual generators
 sys.path.append(str(Path(__file__).parent))
+from profiling import child_env, profile_requested, profiled_main, stage
 
 def run_script(script_name, description):
     """Run a generator script and capture output"""
@@ -21,12 +22,15 @@ def run_script(script_name, description):
     script_path = Path(__file__).parent / script_name
 
     try:
-        result = subprocess.run(
-            [sys.executable, str(script_path)],
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
-        )
+        # Profiled runs hand the profile directory down so the summary covers every script
+        with stage(script_name.replace(".py", "")):
+            result = subprocess.run(
+                [sys.executable, str(script_path)],
+                capture_output=True,
+                text=True,
+                timeout=300,  # 5 minute timeout
+                env=child_env() if profile_requested() else None
+            )
 
         print(result.stdout)
         if result.stderr:
@@ -156,4 +160,5 @@ if __name__ == "__main__":
     if len(sys.argv) > 1 and "--mode=full" in sys.argv:
         mode = "full"
 
-    generate_all_brand_assets(mode)
+    with profiled_main("all_brand_assets"):
+        generate_all_brand_assets(mode)
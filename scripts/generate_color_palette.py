@@ -16,6 +16,8 @@ from datetime import datetime
 # Import brand constants
 sys.path.append(str(Path(__file__).parent))
 from brand_constants import BRAND_COLORS, COLORS_PPT, PPT_LAYOUT, BRAND_INFO
+from reproducible_build import build_datetime, reproducible_requested, save_reproducible
+from profiling import profiled_main, stage
 
 def hex_to_rgb(hex_color):
     """Convert hex color to RGB tuple"""
@@ -104,7 +106,7 @@ def add_color_swatch(slide, color_info, x_position, y_position, width=2.5, heigh
     usage_para.font.color.rgb = COLORS_PPT["secondary_navy"]
     usage_para.alignment = PP_ALIGN.CENTER
 
-def create_title_slide(prs):
+def create_title_slide(prs, generated_on=None):
     """Create title slide"""
     slide = prs.slides.add_slide(prs.slide_layouts[6])  # Blank layout
 
@@ -167,7 +169,8 @@ def create_title_slide(prs):
     )
     date_frame = date_box.text_frame
     date_para = date_frame.paragraphs[0]
-    date_para.text = f"Generated: {datetime.now().strftime('%B %d, %Y')}"
+    generated_on = generated_on or datetime.now()
+    date_para.text = f"Generated: {generated_on.strftime('%B %d, %Y')}"
     date_para.font.size = Pt(12)
     date_para.font.color.rgb = COLORS_PPT["secondary_navy"]
     date_para.alignment = PP_ALIGN.CENTER
@@ -333,10 +336,16 @@ def create_usage_examples_slide(prs):
     ex4_body.font.size = Pt(16)
     ex4_body.font.color.rgb = COLORS_PPT["secondary_navy"]
 
-def generate_color_palette():
-    """Main function to generate color palette PowerPoint"""
+def generate_color_palette(reproducible=False):
+    """Main function to generate color palette PowerPoint
+
+    Args:
+        reproducible: Fix dates, zip metadata and docProps so identical
+            inputs always produce byte-identical output
+    """
 
     print("🎨 Generating ModelIt K12 Color Palette...")
+    generated_on = build_datetime() if reproducible else None
 
     # Create presentation with widescreen layout
     prs = Presentation()
@@ -344,22 +353,28 @@ def generate_color_palette():
     prs.slide_height = Inches(PPT_LAYOUT["slide_height"])
 
     # Add slides
-    print("  ├─ Creating title slide...")
-    create_title_slide(prs)
+    with stage("build_slides"):
+        print("  ├─ Creating title slide...")
+        create_title_slide(prs, generated_on)
 
-    print("  ├─ Creating primary colors slide...")
-    create_primary_colors_slide(prs)
+        print("  ├─ Creating primary colors slide...")
+        create_primary_colors_slide(prs)
 
-    print("  ├─ Creating accent colors slide...")
-    create_accent_colors_slide(prs)
+        print("  ├─ Creating accent colors slide...")
+        create_accent_colors_slide(prs)
 
-    print("  ├─ Creating usage examples slide...")
-    create_usage_examples_slide(prs)
+        print("  ├─ Creating usage examples slide...")
+        create_usage_examples_slide(prs)
 
     # Save presentation
     output_path = Path(__file__).parent.parent / "assets" / "colors" / "modelit_color_palette.pptx"
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    prs.save(str(output_path))
+    with stage("save"):
+        if reproducible:
+            digest = save_reproducible(prs, output_path, generated_on)
+            print(f"  ├─ 🔒 Reproducible build: sha256 {digest}")
+        else:
+            prs.save(str(output_path))
 
     print(f"  └─ ✅ Saved to: {output_path}")
     print(f"\n📊 Color Palette Complete!")
@@ -371,4 +386,5 @@ def generate_color_palette():
     return output_path
 
 if __name__ == "__main__":
-    generate_color_palette()
+    with profiled_main("color_palette"):
+        generate_color_palette(reproducible=reproducible_requested())
@@ -13,14 +13,25 @@ from pathlib import Path
 # Import brand constants
 sys.path.append(str(Path(__file__).parent))
 from brand_constants import MASCOT_INFO, NANO_BANANA
+from asset_store import save_asset
+from profiling import profiled_main, stage
+from adaptive_limiter import IMAGE_LIMITER
+from hedged_requests import IMAGE_HEDGER
+from image_check import (
+    MAX_ATTEMPTS, STATS as VALIDATION_STATS, is_valid_image, note_retry, validate_image,
+    print_summary as print_validation_summary
+)
 
 # Get API key from environment
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 if not OPENROUTER_API_KEY:
     raise ValueError("❌ OPENROUTER_API_KEY not found in environment!")
 
-def generate_mascot_image(pose_description: str, filename: str):
-    """Generate mascot image with Nano Banana"""
+def generate_mascot_image(pose_description: str, filename: str, session=None):
+    """Generate mascot image with Nano Banana
+
+    Pass a requests.Session to reuse connections across calls.
+    """
 
     # Build detailed prompt
     prompt = f"""Character design for educational mascot named "{MASCOT_INFO['name']}":
@@ -40,25 +51,30 @@ The character should look friendly, approachable, and scientifically accurate wh
 
     print(f"  ├─ Generating mascot: {pose_description}...")
 
-    try:
-        response = requests.post(
-            NANO_BANANA["endpoint"],
-            headers={
-                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": NANO_BANANA["model"],
-                "messages": [{"role": "user", "content": prompt}],
-                "modalities": NANO_BANANA["modalities"],
-                "max_tokens": NANO_BANANA["max_tokens"],
-                "temperature": 0.8  # Slightly higher for creative variation
-            },
-            timeout=120
-        )
+    def request(session):
+        """One upstream call; returns the image bytes or None"""
+        # Adaptive concurrency: grows while latency is flat, backs off on 429/5xx/timeouts
+        with stage("http_request"), IMAGE_LIMITER.slot() as slot:
+            response = (session or requests).post(
+                NANO_BANANA["endpoint"],
+                headers={
+                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": NANO_BANANA["model"],
+                    "messages": [{"role": "user", "content": prompt}],
+                    "modalities": NANO_BANANA["modalities"],
+                    "max_tokens": NANO_BANANA["max_tokens"],
+                    "temperature": 0.8  # Slightly higher for creative variation
+                },
+                timeout=120
+            )
+            slot.status = response.status_code
 
         if response.status_code == 200:
-            data = response.json()
+            with stage("json_parse"):
+                data = response.json()
 
             if 'choices' in data and len(data['choices']) > 0:
                 choice = data['choices'][0]
@@ -68,19 +84,37 @@ The character should look friendly, approachable, and scientifically accurate wh
                     image_url = image_data['image_url']['url']
 
                     if image_url.startswith('data:image'):
-                        base64_data = image_url.split(',')[1]
-                        image_bytes = base64.b64decode(base64_data)
-
-                        # Save image
-                        output_dir = Path(__file__).parent.parent / "assets" / "mascot"
-                        output_dir.mkdir(parents=True, exist_ok=True)
+                        with stage("base64_decode"):
+                            base64_data = image_url.split(',')[1]
+                            return base64.b64decode(base64_data)
+        return None
 
-                        output_path = output_dir / filename
-                        with open(output_path, 'wb') as f:
-                            f.write(image_bytes)
-
-                        print(f"  └─ ✅ Saved: {filename}")
-                        return True
+    try:
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            if IMAGE_HEDGER.enabled:
+                # A straggler gets a duplicate request and the first valid image wins
+                with stage("http_request"):
+                    image_bytes = IMAGE_HEDGER.run(request, session, valid=is_valid_image)
+            else:
+                image_bytes = request(session)
+            if image_bytes is None:
+                break
+
+            # Truncated / corrupt payloads are retried before anything is saved
+            with stage("validate"):
+                if validate_image(image_bytes, label=filename):
+                    break
+            image_bytes = None
+            if attempt < MAX_ATTEMPTS:
+                note_retry(attempt + 1)
+
+        if image_bytes:
+            # Save image (content-addressed; older versions are kept)
+            with stage("save"):
+                save_asset(image_bytes, "mascot", filename)
+
+            print(f"  └─ ✅ Saved: {filename}")
+            return True
 
         print(f"  └─ ❌ Failed to generate {filename}")
         return False
@@ -101,6 +135,8 @@ def generate_all_mascots(poses=None):
 
     success_count = 0
     total_cost = 0.0
+    hedge_spent = IMAGE_HEDGER.spent
+    retries = VALIDATION_STATS["retries"]
 
     for pose in poses:
         filename = f"micro_mayhem_{pose.replace(' ', '_').replace('(', '').replace(')', '')}.png"
@@ -110,14 +146,26 @@ def generate_all_mascots(poses=None):
             success_count += 1
             total_cost += NANO_BANANA["cost_per_image"]
 
+    # Duplicate (hedge) requests and retries of invalid images are billed too
+    total_cost += IMAGE_HEDGER.spent - hedge_spent
+    total_cost += (VALIDATION_STATS["retries"] - retries) * NANO_BANANA["cost_per_image"]
+
     print(f"\n📊 Mascot Generation Complete!")
     print(f"   ✅ Generated: {success_count}/{len(poses)} poses")
     print(f"   💰 Total cost: ${total_cost:.2f}")
     print(f"   📁 Location: /assets/mascot/")
+    if IMAGE_LIMITER.stats["calls"]:
+        IMAGE_LIMITER.print_summary()
+    if IMAGE_HEDGER.enabled:
+        IMAGE_HEDGER.print_summary()
+    print_validation_summary()
 
     return success_count
 
 if __name__ == "__main__":
-    # Generate 5 key poses (can be expanded later)
+    # Generate the 5 highest-priority poses from the catalog (can be expanded later)
     key_poses = MASCOT_INFO["poses"][:5]
-    generate_all_mascots(key_poses)
+    if "--hedge" in sys.argv[1:]:
+        IMAGE_HEDGER.enabled = True
+    with profiled_main("mascot"):
+        generate_all_mascots(key_poses)
@@ -6,6 +6,8 @@ Output: /assets/templates/*.potx
 
 import os
 import sys
+import json
+from itertools import zip_longest
 from pathlib import Path
 from pptx import Presentation
 from pptx.util import Inches, Pt
@@ -15,6 +17,46 @@ from pptx.dml.color import RGBColor
 # Import brand constants
 sys.path.append(str(Path(__file__).parent))
 from brand_constants import COLORS_PPT, PPT_LAYOUT, FONTS, FONT_SIZES, BRAND_INFO
+from deck_media import MediaCache
+from reproducible_build import reproducible_requested, save_reproducible
+from text_layout import fit, layout, paginate, metrics_for
+from profiling import profiled_main, stage
+
+# Default image slots (inches: left, top, width, height) for --mascot / --visual
+IMAGE_SLOTS = {
+    "mascot": ("Title Slide", (8.0, 4.9, 1.6, 1.5)),
+    "visual": ("Content Slide", (6.0, 2.0, 3.25, 3.75))
+}
+
+# Text areas (inches: left, top, width, height) measured by the auto-fit engine
+TITLE_BOX = (0.75, 0.5, 8.5, 0.8)
+CONTENT_BOX = (0.75, 1.8, 8.5, 4.5)
+CONTENT_BESIDE_VISUAL_BOX = (0.75, 1.8, 5.0, 4.5)  # leaves IMAGE_SLOTS["visual"] clear
+LEFT_COLUMN_BOX = (0.75, 1.8, 4.0, 4.5)
+RIGHT_COLUMN_BOX = (5.25, 1.8, 4.0, 4.5)
+
+SAMPLE_BULLETS = [
+    "Key point 1: Replace with your content",
+    "Key point 2: Systems thinking approach",
+    "Key point 3: NGSS alignment",
+    "Key point 4: Cell Collective integration"
+]
+
+def fit_title(title, width_in=TITLE_BOX[2], height_in=TITLE_BOX[3]):
+    """Title size: heading_1, shrinking to heading_3 for long titles (the title frame must wrap)"""
+    size, fits = fit([title], width_in, height_in, "heading_1", "heading_3", metrics_for(FONTS["headings"], bold=True))
+    if not fits:
+        print(f"  │  ⚠️  Title overflows its box even at {size}pt: {title!r}")
+    return size
+
+def fill_paragraphs(text_frame, paragraphs, size):
+    """Write paragraphs into a text frame at one font size"""
+    for i, text in enumerate(paragraphs):
+        para = text_frame.paragraphs[0] if i == 0 else text_frame.add_paragraph()
+        para.text = text
+        para.level = 0
+        para.font.size = Pt(size)
+        para.font.color.rgb = COLORS_PPT["secondary_navy"]
 
 def create_title_template(prs):
     """Create title slide template"""
@@ -82,8 +124,19 @@ def create_title_template(prs):
     brand_para.font.color.rgb = COLORS_PPT["accent_teal"]
     brand_para.alignment = PP_ALIGN.CENTER
 
-def create_content_template(prs):
-    """Create standard content slide template"""
+    return slide
+
+def create_content_template(prs, title="[Slide Title]", bullets=None, size=None, box=CONTENT_BOX):
+    """Create standard content slide template
+
+    Bullets shrink down the FONT_SIZES hierarchy to fit the content area
+    (use add_content_slides for content that may need continuation slides).
+    box: text area in inches; CONTENT_BESIDE_VISUAL_BOX when a visual is placed
+    """
+    if bullets is None:
+        bullets = SAMPLE_BULLETS
+    if size is None:
+        size, _ = fit(bullets, box[2], box[3])
     slide = prs.slides.add_slide(prs.slide_layouts[6])
 
     # Background
@@ -105,47 +158,20 @@ def create_content_template(prs):
     accent_bar.line.width = Pt(0)
 
     # Slide title
-    title_box = slide.shapes.add_textbox(
-        Inches(0.75),
-        Inches(0.5),
-        Inches(8.5),
-        Inches(0.8)
-    )
+    title_box = slide.shapes.add_textbox(*(Inches(v) for v in TITLE_BOX))
     title_frame = title_box.text_frame
+    title_frame.word_wrap = True
     title_para = title_frame.paragraphs[0]
-    title_para.text = "[Slide Title]"
-    title_para.font.size = Pt(FONT_SIZES["heading_1"])
+    title_para.text = title
+    title_para.font.size = Pt(fit_title(title))
     title_para.font.bold = True
     title_para.font.color.rgb = COLORS_PPT["primary_dark_blue"]
 
     # Content area (bullet points)
-    content_box = slide.shapes.add_textbox(
-        Inches(0.75),
-        Inches(1.8),
-        Inches(8.5),
-        Inches(4.5)
-    )
+    content_box = slide.shapes.add_textbox(*(Inches(v) for v in box))
     content_frame = content_box.text_frame
     content_frame.word_wrap = True
-
-    # Add sample bullets
-    bullets = [
-        "Key point 1: Replace with your content",
-        "Key point 2: Systems thinking approach",
-        "Key point 3: NGSS alignment",
-        "Key point 4: Cell Collective integration"
-    ]
-
-    for i, bullet_text in enumerate(bullets):
-        if i == 0:
-            para = content_frame.paragraphs[0]
-        else:
-            para = content_frame.add_paragraph()
-
-        para.text = bullet_text
-        para.level = 0
-        para.font.size = Pt(FONT_SIZES["body"])
-        para.font.color.rgb = COLORS_PPT["secondary_navy"]
+    fill_paragraphs(content_frame, bullets, size)
 
     # Footer with page number
     footer_box = slide.shapes.add_textbox(
@@ -161,6 +187,8 @@ def create_content_template(prs):
     footer_para.font.color.rgb = COLORS_PPT["secondary_navy"]
     footer_para.alignment = PP_ALIGN.RIGHT
 
+    return slide
+
 def create_section_header_template(prs):
     """Create section divider slide template"""
     slide = prs.slides.add_slide(prs.slide_layouts[6])
@@ -203,8 +231,18 @@ def create_section_header_template(prs):
     section_para.font.color.rgb = RGBColor(255, 255, 255)
     section_para.alignment = PP_ALIGN.CENTER
 
-def create_two_column_template(prs):
-    """Create two-column layout template"""
+    return slide
+
+def create_two_column_template(prs, title="[Two-Column Layout]", left=None, right=None, size=None):
+    """Create two-column layout template
+
+    Both columns share the largest hierarchy size at which each one fits.
+    """
+    left = left or ["[Left Column Content]"]
+    right = right or ["[Right Column Content]"]
+    if size is None:
+        size = min(fit(left, LEFT_COLUMN_BOX[2], LEFT_COLUMN_BOX[3])[0],
+                   fit(right, RIGHT_COLUMN_BOX[2], RIGHT_COLUMN_BOX[3])[0])
     slide = prs.slides.add_slide(prs.slide_layouts[6])
 
     # Background
@@ -233,39 +271,24 @@ def create_two_column_template(prs):
         Inches(0.7)
     )
     title_frame = title_box.text_frame
+    title_frame.word_wrap = True
     title_para = title_frame.paragraphs[0]
-    title_para.text = "[Two-Column Layout]"
-    title_para.font.size = Pt(FONT_SIZES["heading_1"])
+    title_para.text = title
+    title_para.font.size = Pt(fit_title(title, 8.5, 0.7))
     title_para.font.bold = True
     title_para.font.color.rgb = COLORS_PPT["primary_dark_blue"]
 
     # Left column
-    left_box = slide.shapes.add_textbox(
-        Inches(0.75),
-        Inches(1.8),
-        Inches(4.0),
-        Inches(4.5)
-    )
+    left_box = slide.shapes.add_textbox(*(Inches(v) for v in LEFT_COLUMN_BOX))
     left_frame = left_box.text_frame
     left_frame.word_wrap = True
-    left_para = left_frame.paragraphs[0]
-    left_para.text = "[Left Column Content]"
-    left_para.font.size = Pt(FONT_SIZES["body"])
-    left_para.font.color.rgb = COLORS_PPT["secondary_navy"]
+    fill_paragraphs(left_frame, left, size)
 
     # Right column
-    right_box = slide.shapes.add_textbox(
-        Inches(5.25),
-        Inches(1.8),
-        Inches(4.0),
-        Inches(4.5)
-    )
+    right_box = slide.shapes.add_textbox(*(Inches(v) for v in RIGHT_COLUMN_BOX))
     right_frame = right_box.text_frame
     right_frame.word_wrap = True
-    right_para = right_frame.paragraphs[0]
-    right_para.text = "[Right Column Content]"
-    right_para.font.size = Pt(FONT_SIZES["body"])
-    right_para.font.color.rgb = COLORS_PPT["secondary_navy"]
+    fill_paragraphs(right_frame, right, size)
 
     # Vertical divider line
     divider = slide.shapes.add_shape(
@@ -279,8 +302,60 @@ def create_two_column_template(prs):
     divider.fill.fore_color.rgb = COLORS_PPT["background_light"]
     divider.line.width = Pt(0)
 
-def generate_ppt_templates():
-    """Generate all PowerPoint templates"""
+    return slide
+
+# ============================================================================
+# DATA-DRIVEN SLIDES (AUTO-FIT + CONTINUATION)
+# ============================================================================
+
+def continued(title, page):
+    return title if page == 0 else f"{title} (cont.)"
+
+def add_content_slides(prs, title, bullets):
+    """Content slides for any amount of bullets; overflow continues on extra slides"""
+    size, pages = layout(bullets, CONTENT_BOX[2], CONTENT_BOX[3])
+    return [create_content_template(prs, continued(title, i), page, size) for i, page in enumerate(pages)]
+
+def add_two_column_slides(prs, title, left, right):
+    """Two-column slides; each column paginates independently at a shared size"""
+    left_size, left_pages = layout(left, LEFT_COLUMN_BOX[2], LEFT_COLUMN_BOX[3])
+    right_size, right_pages = layout(right, RIGHT_COLUMN_BOX[2], RIGHT_COLUMN_BOX[3])
+    size = min(left_size, right_size)
+    if len(left_pages) > 1 or len(right_pages) > 1:
+        # Re-split both at the shared size so neither column is larger than its pages allow
+        left_pages = paginate(left, LEFT_COLUMN_BOX[2], LEFT_COLUMN_BOX[3], size)
+        right_pages = paginate(right, RIGHT_COLUMN_BOX[2], RIGHT_COLUMN_BOX[3], size)
+    return [
+        create_two_column_template(prs, continued(title, i), l or [""], r or [""], size)
+        for i, (l, r) in enumerate(zip_longest(left_pages, right_pages, fillvalue=[]))
+    ]
+
+def add_data_slides(prs, content):
+    """Append slides from specs like {"layout": "content", "title", "bullets"}
+    or {"layout": "two_column", "title", "left", "right"}; returns slide count"""
+    count = 0
+    for spec in content:
+        if spec.get("layout", "content") == "two_column":
+            slides = add_two_column_slides(prs, spec["title"], spec.get("left", []), spec.get("right", []))
+        else:
+            slides = add_content_slides(prs, spec["title"], spec.get("bullets", []))
+        print(f"  ├─ {spec['title']}: {len(slides)} slide(s)")
+        count += len(slides)
+    return count
+
+def generate_ppt_templates(reproducible=False, images=None, media=None, output_path=None, content=None):
+    """Generate all PowerPoint templates
+
+    Args:
+        reproducible: Fix zip metadata and docProps so identical inputs
+            always produce byte-identical output
+        images: Optional {template name: [(path, (left, top, width, height)), ...]}
+            of generated visuals / mascot images to place (inches)
+        media: MediaCache to share renditions across a batch of decks
+        output_path: Override the default output file
+        content: Optional list of data-driven slide specs (see add_data_slides),
+            auto-fitted and continued onto extra slides when they overflow
+    """
 
     print("\n📊 Generating ModelIt K12 PowerPoint Templates...")
 
@@ -297,22 +372,72 @@ def generate_ppt_templates():
         ("Two-Column Layout", create_two_column_template)
     ]
 
-    for template_name, template_func in templates:
-        print(f"  ├─ Creating {template_name} template...")
-        template_func(prs)
+    images = images or {}
+    if images and media is None:
+        media = MediaCache()
+
+    with stage("build_slides"):
+        for template_name, template_func in templates:
+            print(f"  ├─ Creating {template_name} template...")
+            if template_name == "Content Slide" and images.get(template_name):
+                # The full-width text area would run under the visual slot
+                slide = template_func(prs, box=CONTENT_BESIDE_VISUAL_BOX)
+            else:
+                slide = template_func(prs)
+
+            for image_path, (left, top, width, height) in images.get(template_name, []):
+                with stage("place_images"):
+                    media.add_picture(slide, image_path, left, top, width, height)
+                print(f"  │  └─ Placed {Path(image_path).name}")
+
+        data_slides = add_data_slides(prs, content) if content else 0
 
     # Save as template
-    output_path = Path(__file__).parent.parent / "assets" / "templates" / "modelit_presentation_templates.pptx"
+    if output_path is None:
+        output_path = Path(__file__).parent.parent / "assets" / "templates" / "modelit_presentation_templates.pptx"
+    output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    prs.save(str(output_path))
+    with stage("save"):
+        if reproducible:
+            digest = save_reproducible(prs, output_path)
+            print(f"  ├─ 🔒 Reproducible build: sha256 {digest}")
+        else:
+            prs.save(str(output_path))
 
     print(f"  └─ ✅ Saved to: {output_path}")
     print(f"\n📊 PowerPoint Templates Complete!")
     print(f"   • {len(templates)} template slides")
     print(f"   • Branded colors and fonts")
     print(f"   • Ready for conference/webinar use")
+    if data_slides:
+        print(f"   • {data_slides} auto-fitted content slides")
+    if images:
+        print(f"   • {media.stats['placed']} images placed ({media.stats['resized']} resized, "
+              f"{media.stats['cache_hits']} from cache)")
 
     return output_path
 
+def parse_image_args(argv):
+    """Collect --mascot=PATH / --visual=PATH arguments into template image slots"""
+    images = {}
+    for arg in argv:
+        for slot, (template_name, box) in IMAGE_SLOTS.items():
+            if arg.startswith(f"--{slot}="):
+                images.setdefault(template_name, []).append((arg.split("=", 1)[1], box))
+    return images
+
+def load_content(argv):
+    """Slide specs from --content=PATH (a JSON list), or None"""
+    for arg in argv:
+        if arg.startswith("--content="):
+            with open(arg.split("=", 1)[1], encoding="utf-8") as f:
+                return json.load(f)
+    return None
+
 if __name__ == "__main__":
-    generate_ppt_templates()
+    with profiled_main("ppt_templates"):
+        generate_ppt_templates(
+            reproducible=reproducible_requested(),
+            images=parse_image_args(sys.argv[1:]),
+            content=load_content(sys.argv[1:])
+        )
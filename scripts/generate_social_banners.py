@@ -0,0 +1,184 @@
+"""
+Social Media and Banner Compositor for ModelIt K12
+Composites BRAND_INFO name/tagline in the brand FONTS over a brand gradient
+(a procedural pattern, or a generated visual under a dark-blue scrim) for every ASSET_SIZES
+social_media size plus the web banner, in one pass. Glyphs are rasterized
+once per (font, size) and reused across sizes and variants.
+Output: /assets/social/<variant>_<size>.png
+"""
+
+import io
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import BRAND_COLORS, BRAND_INFO, FONTS, ASSET_SIZES
+from brand_fonts import GlyphCache
+from asset_store import save_asset
+from procedural_backgrounds import PATTERNS, background_array
+
+def banner_sizes():
+    """{size name: (width, height)} for every social size and the web banner"""
+    sizes = dict(ASSET_SIZES["social_media"])
+    sizes["web_banner"] = (ASSET_SIZES["banner"]["width"], ASSET_SIZES["banner"]["height"])
+    return sizes
+
+def rgb(name):
+    return np.array(BRAND_COLORS[name]["rgb"], dtype=np.float32)
+
+# ============================================================================
+# BACKGROUNDS
+# ============================================================================
+
+def gradient_background(width, height, start="primary_dark_blue", end="primary_light_blue"):
+    """Diagonal brand gradient as a float32 (height, width, 3) array"""
+    x = np.linspace(0.0, 1.0, width, dtype=np.float32)[None, :]
+    y = np.linspace(0.0, 1.0, height, dtype=np.float32)[:, None]
+    t = (0.7 * x + 0.3 * y)[..., None]
+    return rgb(start) * (1.0 - t) + rgb(end) * t
+
+def visual_background(visual, width, height, scrim=0.65):
+    """Cover-crop a generated visual to the size and darken it for legible text"""
+    scale = max(width / visual.width, height / visual.height)
+    resized = visual.resize((max(width, round(visual.width * scale)), max(height, round(visual.height * scale))),
+                            Image.LANCZOS)
+    left, top = (resized.width - width) // 2, (resized.height - height) // 2
+    pixels = np.asarray(resized.crop((left, top, left + width, top + height)).convert("RGB"), dtype=np.float32)
+    return pixels * (1.0 - scrim) + rgb("primary_dark_blue") * scrim
+
+def blend(canvas, mask, color, x, y, opacity=1.0):
+    """Composite a coverage mask in a solid colour onto the canvas at (x, y)"""
+    h, w = canvas.shape[:2]
+    x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + mask.shape[1], w), min(y + mask.shape[0], h)
+    if x1 <= x0 or y1 <= y0:
+        return
+    alpha = mask[y0 - y:y1 - y, x0 - x:x1 - x, None].astype(np.float32) * (opacity / 255.0)
+    region = canvas[y0:y1, x0:x1]
+    region *= 1.0 - alpha
+    region += alpha * color
+
+def paste_rgba(canvas, image, x, y):
+    pixels = np.asarray(image.convert("RGBA"), dtype=np.float32)
+    mask = pixels[..., 3]
+    h, w = canvas.shape[:2]
+    x0, y0, x1, y1 = max(x, 0), max(y, 0), min(x + image.width, w), min(y + image.height, h)
+    alpha = mask[y0 - y:y1 - y, x0 - x:x1 - x, None] / 255.0
+    region = canvas[y0:y1, x0:x1]
+    region *= 1.0 - alpha
+    region += alpha * pixels[y0 - y:y1 - y, x0 - x:x1 - x, :3]
+
+# ============================================================================
+# TEXT LAYOUT
+# ============================================================================
+
+def fit_size(glyphs, family, text, max_width, max_size, min_size=10):
+    """Largest pixel size <= max_size at which text fits max_width"""
+    size = max_size
+    while size > min_size:
+        width = glyphs.measure(family, size, text)
+        if width <= max_width:
+            break
+        size = max(min_size, min(size - 1, int(size * max_width / width)))
+    return size
+
+def compose(width, height, glyphs, name=None, tagline=None, background=None, mascot=None):
+    """Render one banner over a background array (default: brand gradient); returns a PIL RGB image"""
+    name = name or BRAND_INFO["name"]
+    tagline = tagline if tagline is not None else BRAND_INFO["tagline"]
+    canvas = background.copy() if background is not None else gradient_background(width, height)
+
+    margin = round(min(width, height) * 0.08)
+    text_right = width - margin
+    if mascot is not None:
+        mascot_height = round(height * 0.8)
+        scaled = mascot.resize((max(1, round(mascot.width * mascot_height / mascot.height)), mascot_height),
+                               Image.LANCZOS)
+        mascot_x = width - margin - scaled.width
+        paste_rgba(canvas, scaled, mascot_x, height - scaled.height - round(height * 0.05))
+        text_right = mascot_x - margin // 2
+    text_width = max(text_right - margin, width // 3)
+
+    name_size = fit_size(glyphs, FONTS["headings"], name, text_width, round(height * 0.26))
+    tagline_size = fit_size(glyphs, FONTS["body"], tagline, text_width, max(10, round(name_size * 0.42))) if tagline else 0
+
+    name_mask = glyphs.render(FONTS["headings"], name_size, name)
+    rule_height = max(3, round(name_size * 0.08))
+    gap = round(name_size * 0.25)
+    tagline_mask = glyphs.render(FONTS["body"], tagline_size, tagline) if tagline else None
+    block_height = name_mask.shape[0] + gap + rule_height + (gap + tagline_mask.shape[0] if tagline else 0)
+
+    y = (height - block_height) // 2
+    blend(canvas, name_mask, np.float32(255.0), margin, y)
+    y += name_mask.shape[0] + gap
+    rule_width = min(text_width, round(name_size * 2.5))
+    canvas[y:y + rule_height, margin:margin + rule_width] = rgb("accent_gold")
+    if tagline:
+        y += rule_height + gap
+        blend(canvas, tagline_mask, rgb("background_light"), margin, y)
+
+    return Image.fromarray(np.clip(np.rint(canvas), 0, 255).astype(np.uint8), mode="RGB")
+
+def load_variants(path=None):
+    """Text variants to render: the brand default, or JSON lines of {"slug", "name", "tagline"}"""
+    if not path:
+        return [{"slug": "modelit", "name": BRAND_INFO["name"], "tagline": BRAND_INFO["tagline"]}]
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def generate_social_banners(variants=None, visual=None, mascot=None, sizes=None, pattern=None, seed=0):
+    """Render every variant at every size; returns ([paths], glyph cache stats)
+
+    pattern: a procedural_backgrounds pattern to use instead of the gradient
+    """
+    glyphs = GlyphCache()
+    visual_image = Image.open(visual).convert("RGB") if visual else None
+    mascot_image = Image.open(mascot).convert("RGBA") if mascot else None
+    sizes = sizes or banner_sizes()
+
+    # Backgrounds depend only on the size, so they are shared by every variant
+    def background(width, height):
+        if visual_image:
+            return visual_background(visual_image, width, height)
+        if pattern:
+            return background_array(pattern, width, height, seed)
+        return gradient_background(width, height)
+
+    backgrounds = {size_name: background(width, height) for size_name, (width, height) in sizes.items()}
+
+    paths = []
+    for variant in variants or load_variants():
+        for size_name, (width, height) in sizes.items():
+            image = compose(width, height, glyphs, variant.get("name"), variant.get("tagline"),
+                            backgrounds[size_name], mascot_image)
+            buffer = io.BytesIO()
+            # Default zlib level: optimize=True costs ~10x on smooth gradients for a few % size
+            image.save(buffer, format="PNG")
+            paths.append(save_asset(buffer.getvalue(), "social", f"{variant['slug']}_{size_name}.png"))
+    return paths, glyphs.stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Composite ModelIt K12 social headers and banners")
+    parser.add_argument("--variants", default=None, help="JSON lines of {slug, name, tagline}")
+    parser.add_argument("--visual", default=None, help="Generated visual to use as the background")
+    parser.add_argument("--mascot", default=None, help="RGBA mascot pose to place on the right")
+    parser.add_argument("--pattern", choices=PATTERNS, default=None, help="Procedural background instead of the gradient")
+    parser.add_argument("--seed", type=int, default=0, help="Pattern seed")
+    args = parser.parse_args(argv)
+
+    variants = load_variants(args.variants)
+    print(f"\n🖼️  Compositing {len(variants)} variant(s) × {len(banner_sizes())} sizes...")
+    paths, stats = generate_social_banners(variants, args.visual, args.mascot, pattern=args.pattern, seed=args.seed)
+    for path in paths[:len(banner_sizes())]:
+        print(f"  ├─ {Path(path).name}")
+    if len(paths) > len(banner_sizes()):
+        print(f"  ├─ ... and {len(paths) - len(banner_sizes())} more")
+    print(f"  └─ ✅ {len(paths)} images | glyph cache: {stats['hits']} hits, {stats['misses']} rasterized")
+
+if __name__ == "__main__":
+    main()
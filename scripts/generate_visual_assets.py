@@ -9,6 +9,8 @@ import os
 import sys
 import requests
 import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -17,14 +19,28 @@ sys.path.append(str(Path(__file__).parent))
 from brand_constants import (
     BRAND_COLORS, IMAGE_STYLES, NANO_BANANA, BRAND_INFO
 )
+from asset_store import save_asset
+from profiling import profiled_main, stage, strip_profile_args
+from adaptive_limiter import IMAGE_LIMITER
+from hedged_requests import IMAGE_HEDGER
+from asset_catalog import visual_assets
+from palette_snap import snap_png_bytes
+from image_check import (
+    MAX_ATTEMPTS, STATS as VALIDATION_STATS, is_valid_image, note_retry, validate_image,
+    print_summary as print_validation_summary
+)
 
 # Get API key from environment
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 if not OPENROUTER_API_KEY:
     raise ValueError("❌ OPENROUTER_API_KEY not found in environment!")
 
-def generate_image_with_nano_banana(prompt: str, image_type: str = "molecular_structure"):
-    """Generate image using Nano Banana (Gemini 2.5 Flash Image)"""
+def generate_image_with_nano_banana(prompt: str, image_type: str = "molecular_structure", session=None, target=None):
+    """Generate image using Nano Banana (Gemini 2.5 Flash Image)
+
+    Pass a requests.Session to reuse connections across calls, and an
+    ASSET_SIZES key as target to report images of another size.
+    """
 
     # Get style specifications
     style_spec = IMAGE_STYLES.get(image_type, IMAGE_STYLES["molecular_structure"])
@@ -43,25 +59,30 @@ High quality, professional, educational illustration suitable for middle school
 
     print(f"  ├─ Generating: {prompt[:60]}...")
 
-    try:
-        response = requests.post(
-            NANO_BANANA["endpoint"],
-            headers={
-                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": NANO_BANANA["model"],
-                "messages": [{"role": "user", "content": enhanced_prompt}],
-                "modalities": NANO_BANANA["modalities"],  # CRITICAL!
-                "max_tokens": NANO_BANANA["max_tokens"],
-                "temperature": NANO_BANANA["temperature"]
-            },
-            timeout=120
-        )
+    def request(session):
+        """One upstream call; returns the image bytes or None"""
+        # Adaptive concurrency: grows while latency is flat, backs off on 429/5xx/timeouts
+        with stage("http_request"), IMAGE_LIMITER.slot() as slot:
+            response = (session or requests).post(
+                NANO_BANANA["endpoint"],
+                headers={
+                    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": NANO_BANANA["model"],
+                    "messages": [{"role": "user", "content": enhanced_prompt}],
+                    "modalities": NANO_BANANA["modalities"],  # CRITICAL!
+                    "max_tokens": NANO_BANANA["max_tokens"],
+                    "temperature": NANO_BANANA["temperature"]
+                },
+                timeout=120
+            )
+            slot.status = response.status_code
 
         if response.status_code == 200:
-            data = response.json()
+            with stage("json_parse"):
+                data = response.json()
 
             # Extract image from response
             if 'choices' in data and len(data['choices']) > 0:
@@ -75,8 +96,9 @@ High quality, professional, educational illustration suitable for middle school
                     # Decode base64 image
                     if image_url.startswith('data:image'):
                         # Format: data:image/png;base64,<data>
-                        base64_data = image_url.split(',')[1]
-                        image_bytes = base64.b64decode(base64_data)
+                        with stage("base64_decode"):
+                            base64_data = image_url.split(',')[1]
+                            image_bytes = base64.b64decode(base64_data)
                         return image_bytes
                     else:
                         print(f"  │  ⚠️ Unexpected image URL format")
@@ -92,18 +114,41 @@ High quality, professional, educational illustration suitable for middle school
             print(f"  │  Response: {response.text[:200]}")
             return None
 
+    try:
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            if IMAGE_HEDGER.enabled:
+                # A straggler gets a duplicate request and the first valid image wins;
+                # both run on worker threads, so the wait is staged here
+                with stage("http_request"):
+                    image_bytes = IMAGE_HEDGER.run(request, session, valid=is_valid_image)
+            else:
+                image_bytes = request(session)
+            if image_bytes is None:
+                return None
+
+            # Truncated / corrupt payloads are retried; a size mismatch is only reported
+            with stage("validate"):
+                info = validate_image(image_bytes, target, prompt[:40])
+            if info:
+                return image_bytes
+            if attempt < MAX_ATTEMPTS:
+                note_retry(attempt + 1)
+        return None
+
     except Exception as e:
         print(f"  │  ❌ Error: {str(e)}")
         return None
 
-def save_image(image_bytes: bytes, filename: str, asset_type: str = "visuals"):
-    """Save image to assets directory"""
-    output_dir = Path(__file__).parent.parent / "assets" / asset_type
-    output_dir.mkdir(parents=True, exist_ok=True)
+def save_image(image_bytes: bytes, filename: str, asset_type: str = "visuals", palette=None):
+    """Save image to assets directory (content-addressed; older versions are kept)
 
-    output_path = output_dir / filename
-    with open(output_path, 'wb') as f:
-        f.write(image_bytes)
+    palette: snap near-brand colours to this palette first (see palette_snap.py)
+    """
+    if palette:
+        with stage("palette_snap"):
+            image_bytes = snap_png_bytes(image_bytes, palette)
+    with stage("save"):
+        output_path = save_asset(image_bytes, asset_type, filename)
 
     print(f"  └─ ✅ Saved: {filename}")
     return output_path
@@ -112,157 +157,90 @@ def save_image(image_bytes: bytes, filename: str, asset_type: str = "visuals"):
 # ASSET DEFINITIONS
 # ============================================================================
 
-VISUAL_ASSETS = {
-    "molecular_structures": [
-        {
-            "prompt": "3D molecular structure of a water molecule (H2O) showing electron clouds and bonds, transparent spheres for atoms, scientific illustration",
-            "filename": "water_molecule_3d.png",
-            "type": "molecular_structure"
-        },
-        {
-            "prompt": "DNA double helix structure with labeled base pairs, scientific diagram style, clean educational illustration",
-            "filename": "dna_double_helix.png",
-            "type": "molecular_structure"
-        },
-        {
-            "prompt": "ATP molecule (adenosine triphosphate) with phosphate groups highlighted, energy transfer visualization",
-            "filename": "atp_molecule_energy.png",
-            "type": "molecular_structure"
-        },
-        {
-            "prompt": "Protein structure showing primary, secondary, tertiary, and quaternary levels, educational diagram",
-            "filename": "protein_structure_levels.png",
-            "type": "molecular_structure"
-        },
-        {
-            "prompt": "Chemical reaction diagram showing reactants and products with energy levels, activation energy graph",
-            "filename": "chemical_reaction_energy.png",
-            "type": "molecular_structure"
-        }
-    ],
-    "network_diagrams": [
-        {
-            "prompt": "Systems thinking diagram showing interconnected nodes and feedback loops, clean technical infographic style",
-            "filename": "systems_thinking_network.png",
-            "type": "network_diagram"
-        },
-        {
-            "prompt": "Biological pathway network with nodes and connections, gene regulatory network visualization",
-            "filename": "biological_pathway_network.png",
-            "type": "network_diagram"
-        },
-        {
-            "prompt": "Ecosystem food web diagram showing energy flow between organisms, circular network layout",
-            "filename": "ecosystem_food_web.png",
-            "type": "network_diagram"
-        },
-        {
-            "prompt": "Neural network diagram with input, hidden, and output layers, AI/ML visualization style",
-            "filename": "neural_network_layers.png",
-            "type": "network_diagram"
-        },
-        {
-            "prompt": "Boolean logic network showing AND, OR, NOT gates connected in a circuit, computational modeling",
-            "filename": "boolean_logic_network.png",
-            "type": "network_diagram"
-        }
-    ],
-    "cell_imagery": [
-        {
-            "prompt": "Detailed animal cell cross-section showing all organelles (nucleus, mitochondria, ER, Golgi), labeled educational illustration",
-            "filename": "animal_cell_detailed.png",
-            "type": "cell_imagery"
-        },
-        {
-            "prompt": "Plant cell showing chloroplasts, cell wall, and large central vacuole, vibrant green and blue tones",
-            "filename": "plant_cell_detailed.png",
-            "type": "cell_imagery"
-        },
-        {
-            "prompt": "Mitochondria organelle showing inner and outer membranes with cristae, energy production visualization",
-            "filename": "mitochondria_powerhouse.png",
-            "type": "cell_imagery"
-        },
-        {
-            "prompt": "Cell membrane structure showing phospholipid bilayer with embedded proteins, molecular detail",
-            "filename": "cell_membrane_structure.png",
-            "type": "cell_imagery"
-        },
-        {
-            "prompt": "Cell division (mitosis) showing all phases: prophase, metaphase, anaphase, telophase, educational sequence",
-            "filename": "cell_division_mitosis.png",
-            "type": "cell_imagery"
-        }
-    ],
-    "educational_graphics": [
-        {
-            "prompt": "NGSS science standards icon with gear and beaker symbol, flat design, professional badge style",
-            "filename": "ngss_standards_icon.png",
-            "type": "educational_graphic"
-        },
-        {
-            "prompt": "Scientific method flowchart with steps: question, hypothesis, experiment, analysis, conclusion, circular diagram",
-            "filename": "scientific_method_flowchart.png",
-            "type": "educational_graphic"
-        },
-        {
-            "prompt": "Data visualization showing multiple types: bar chart, line graph, pie chart, scatter plot, colorful infographic",
-            "filename": "data_visualization_types.png",
-            "type": "educational_graphic"
-        },
-        {
-            "prompt": "Lab safety equipment illustrations: goggles, gloves, lab coat, fire extinguisher, first aid kit, icon set",
-            "filename": "lab_safety_equipment.png",
-            "type": "educational_graphic"
-        },
-        {
-            "prompt": "States of matter transformation diagram: solid to liquid to gas, particle model visualization",
-            "filename": "states_of_matter_diagram.png",
-            "type": "educational_graphic"
-        }
-    ]
-}
-
-def generate_all_visual_assets(categories=None, max_per_category=None):
-    """Generate all visual assets"""
+# Defined in catalog/brand_assets.jsonl: {category: [{"prompt", "filename", "type",
+# "priority", "tags", optional "size"}]}, highest priority first within each category
+VISUAL_ASSETS = visual_assets()
+
+def generate_all_visual_assets(categories=None, max_per_category=None, concurrent=False, tags=None, snap=False):
+    """Generate all visual assets
+
+    concurrent: run requests in parallel under the adaptive limiter
+        (IMAGE_LIMITER) instead of one at a time
+    tags: only catalog entries carrying one of these tags
+    snap: recolour each image onto its IMAGE_STYLES palette before saving
+    """
 
     print("\n🎨 Generating ModelIt K12 Visual Assets with Nano Banana...")
     print(f"   Model: {NANO_BANANA['model']}")
     print(f"   Cost per image: ${NANO_BANANA['cost_per_image']}")
 
+    catalog = visual_assets(tags=tags) if tags else VISUAL_ASSETS
     if categories is None:
-        categories = VISUAL_ASSETS.keys()
+        categories = catalog.keys()
 
     total_generated = 0
     total_failed = 0
     total_cost = 0.0
+    hedge_spent = IMAGE_HEDGER.spent
+    retries = VALIDATION_STATS["retries"]
+    pending = []
 
     for category in categories:
-        if category not in VISUAL_ASSETS:
+        if category not in catalog:
             print(f"\n⚠️ Unknown category: {category}")
             continue
 
-        assets = VISUAL_ASSETS[category]
+        assets = catalog[category]
         if max_per_category:
             assets = assets[:max_per_category]
 
         print(f"\n📁 Category: {category.replace('_', ' ').title()}")
         print(f"   Generating {len(assets)} images...")
 
+        if concurrent:
+            pending.extend(assets)
+            continue
+
         for asset in assets:
             image_bytes = generate_image_with_nano_banana(
                 asset["prompt"],
-                asset["type"]
+                asset["type"],
+                target=asset.get("size")
             )
 
             if image_bytes:
-                save_image(image_bytes, asset["filename"], "visuals")
+                save_image(image_bytes, asset["filename"], "visuals", asset["type"] if snap else None)
                 total_generated += 1
                 total_cost += NANO_BANANA["cost_per_image"]
             else:
                 print(f"  └─ ❌ Failed: {asset['filename']}")
                 total_failed += 1
 
+    if pending:
+        local = threading.local()
+
+        def generate(asset):
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+            image_bytes = generate_image_with_nano_banana(asset["prompt"], asset["type"], session=local.session,
+                                                         target=asset.get("size"))
+            if image_bytes:
+                save_image(image_bytes, asset["filename"], "visuals", asset["type"] if snap else None)
+            else:
+                print(f"  └─ ❌ Failed: {asset['filename']}")
+            return bool(image_bytes)
+
+        # The pool only bounds threads; IMAGE_LIMITER decides how many calls are in flight
+        with ThreadPoolExecutor(max_workers=IMAGE_LIMITER.maximum) as pool:
+            for success in pool.map(generate, pending):
+                total_generated += success
+                total_failed += not success
+                total_cost += NANO_BANANA["cost_per_image"] if success else 0.0
+
+    # Duplicate (hedge) requests and retries of invalid images are billed too
+    total_cost += IMAGE_HEDGER.spent - hedge_spent
+    total_cost += (VALIDATION_STATS["retries"] - retries) * NANO_BANANA["cost_per_image"]
+
     # Summary
     print(f"\n" + "="*60)
     print(f"📊 Visual Assets Generation Complete!")
@@ -271,6 +249,11 @@ def generate_all_visual_assets(categories=None, max_per_category=None):
         print(f"   ❌ Failed: {total_failed} images")
     print(f"   💰 Total cost: ${total_cost:.2f}")
     print(f"   📁 Location: /assets/visuals/")
+    if IMAGE_LIMITER.stats["calls"]:
+        IMAGE_LIMITER.print_summary()
+    if IMAGE_HEDGER.enabled:
+        IMAGE_HEDGER.print_summary()
+    print_validation_summary()
     print("="*60)
 
     return total_generated, total_failed, total_cost
@@ -279,12 +262,20 @@ if __name__ == "__main__":
     import sys
 
     # Parse command line arguments
-    if len(sys.argv) > 1:
-        categories = sys.argv[1].split(',')
-        max_per = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    args = strip_profile_args(sys.argv[1:])
+    concurrent = "--concurrent" in args
+    snap = "--snap" in args
+    if "--hedge" in args:
+        IMAGE_HEDGER.enabled = True
+    tags = next((arg.split("=", 1)[1].split(",") for arg in args if arg.startswith("--tags=")), None)
+    args = [arg for arg in args if arg not in ("--concurrent", "--hedge", "--snap") and not arg.startswith("--tags=")]
+    if args:
+        categories = args[0].split(',')
+        max_per = int(args[1]) if len(args) > 1 else None
     else:
-        # Default: Generate 2 from each category (demo mode)
-        categories = list(VISUAL_ASSETS.keys())
+        # Default: Generate the top 2 by priority from each category (demo mode)
+        categories = None
         max_per = 2
 
-    generate_all_visual_assets(categories, max_per)
+    with profiled_main("visual_assets"):
+        generate_all_visual_assets(categories, max_per, concurrent, tags, snap)
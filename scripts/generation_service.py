@@ -0,0 +1,267 @@
+"""
+Local Generation Service for ModelIt K12
+Long-running HTTP (TCP or Unix socket) service that keeps python-pptx, the
+generators and pooled HTTP sessions warm, so tools stop paying interpreter
+startup on every call. Identical in-flight image requests are coalesced so
+one upstream Nano Banana call serves every caller.
+
+Endpoints (JSON in, JSON out):
+    GET  /health                 - worker and coalescing stats
+    POST /decks/<deck>           - rebuild a deck: {"reproducible": true}
+    POST /images                 - {"prompt", "image_type", "filename"?}
+    POST /mascot                 - {"pose", "filename"?}
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import threading
+import socketserver
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import NANO_BANANA
+from generate_color_palette import generate_color_palette
+from generate_ppt_templates import generate_ppt_templates
+from prompt_matrix import slugify
+from deck_media import file_sha256
+from adaptive_limiter import IMAGE_LIMITER
+from hedged_requests import IMAGE_HEDGER
+
+DECK_BUILDERS = {
+    "color_palette": generate_color_palette,
+    "templates": generate_ppt_templates
+}
+
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 8
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution"""
+
+    def __init__(self):
+        self.lock = threading.Lock()  # also guards GenerationService.stats
+        self._calls = {}
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    def do(self, key, fn):
+        """Run fn once per key at a time; returns (result, was_coalesced)"""
+        with self.lock:
+            self.stats["calls"] += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.stats["coalesced"] += 1
+
+        if leader:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    del self._calls[key]
+
+        return future.result(), not leader
+
+class GenerationService:
+    """Warm generators, pooled sessions and request coalescing"""
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        # Upstream concurrency adapts between 1 and workers (see adaptive_limiter.py)
+        IMAGE_LIMITER.maximum = workers
+        self.limiter = IMAGE_LIMITER
+        self.workers = workers
+        self.flight = SingleFlight()
+        self.deck_lock = threading.Lock()  # decks share output files
+        self._local = threading.local()
+        self.stats = {"images": 0, "mascots": 0, "decks": 0, "failures": 0}
+
+        # The image generators refuse to import without an API key; decks still work
+        try:
+            import generate_visual_assets
+            import generate_mascot
+            self.visuals, self.mascot = generate_visual_assets, generate_mascot
+        except ValueError as e:
+            print(f"⚠️ Image endpoints disabled: {e}")
+            self.visuals = self.mascot = None
+
+    def _count(self, name):
+        # Handlers run on ThreadingMixIn threads
+        with self.flight.lock:
+            self.stats[name] += 1
+
+    @property
+    def session(self):
+        """One keep-alive requests.Session per worker thread"""
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def build_deck(self, deck, reproducible=False):
+        if deck not in DECK_BUILDERS:
+            raise KeyError(f"Unknown deck: {deck}")
+        with self.deck_lock:
+            output_path = DECK_BUILDERS[deck](reproducible=reproducible)
+        self._count("decks")
+        return {"deck": deck, "path": str(output_path), "sha256": file_sha256(output_path)}
+
+    def generate_image(self, prompt, image_type="molecular_structure", filename=None):
+        if self.visuals is None:
+            raise RuntimeError("OPENROUTER_API_KEY is not set")
+        key = hashlib.sha1(f"image\n{image_type}\n{prompt}".encode("utf-8")).hexdigest()
+        filename = filename or f"{slugify(prompt)}_{key[:8]}.png"
+
+        def call():
+            image_bytes = self.visuals.generate_image_with_nano_banana(
+                prompt, image_type, session=self.session
+            )
+            if not image_bytes:
+                self._count("failures")
+                raise RuntimeError("Image generation failed")
+            self._count("images")
+            return str(self.visuals.save_image(image_bytes, filename, "visuals"))
+
+        path, coalesced = self.flight.do((key, filename), call)
+        return {"path": path, "coalesced": coalesced}
+
+    def generate_mascot(self, pose, filename=None):
+        if self.mascot is None:
+            raise RuntimeError("OPENROUTER_API_KEY is not set")
+        key = hashlib.sha1(f"mascot\n{pose}".encode("utf-8")).hexdigest()
+        filename = filename or f"micro_mayhem_{slugify(pose)}_{key[:8]}.png"
+
+        def call():
+            success = self.mascot.generate_mascot_image(pose, filename, session=self.session)
+            if not success:
+                self._count("failures")
+                raise RuntimeError("Mascot generation failed")
+            self._count("mascots")
+            return str(Path(__file__).parent.parent / "assets" / "mascot" / filename)
+
+        path, coalesced = self.flight.do((key, filename), call)
+        return {"path": path, "coalesced": coalesced}
+
+    def health(self):
+        with self.flight.lock:
+            stats, flight_stats = dict(self.stats), dict(self.flight.stats)
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "images_enabled": self.visuals is not None,
+            "cost_per_image": NANO_BANANA["cost_per_image"],
+            "stats": stats,
+            "single_flight": flight_stats,
+            "concurrency": self.limiter.summary(),
+            "hedging": IMAGE_HEDGER.summary()
+        }
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """JSON request handler; self.server.service is the GenerationService"""
+
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send(404, {"error": f"No such endpoint: {self.path}"})
+            return
+        try:
+            self._send(200, self.server.service.health())
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def do_POST(self):
+        service = self.server.service
+        try:
+            body = self._read_json()
+            if not isinstance(body, dict):
+                self._send(400, {"error": "Request body must be a JSON object"})
+                return
+            if self.path.startswith("/decks/"):
+                result = service.build_deck(self.path.split("/", 2)[2], bool(body.get("reproducible")))
+            elif self.path == "/images":
+                result = service.generate_image(
+                    body["prompt"], body.get("image_type", "molecular_structure"), body.get("filename")
+                )
+            elif self.path == "/mascot":
+                result = service.generate_mascot(body["pose"], body.get("filename"))
+            else:
+                self._send(404, {"error": f"No such endpoint: {self.path}"})
+                return
+            self._send(200, result)
+        except (KeyError, ValueError) as e:
+            self._send(400, {"error": str(e)})
+        except RuntimeError as e:
+            self._send(503, {"error": str(e)})
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        # Unix-socket clients have no address tuple
+        print(f"  ├─ {self.command} {self.path} → {args[1] if len(args) > 1 else ''}")
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def make_server(service, host="127.0.0.1", port=DEFAULT_PORT, socket_path=None):
+    """Create a TCP or Unix-socket server bound to the service"""
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = ThreadingUnixHTTPServer(socket_path, ServiceHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), ServiceHandler)
+        server.daemon_threads = True
+    server.service = service
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the local ModelIt K12 generation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", default=None, help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Upper bound for the adaptive upstream concurrency")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Send a duplicate request when a call straggles (see hedged_requests.py)")
+    args = parser.parse_args(argv)
+    if args.hedge:
+        IMAGE_HEDGER.enabled = True
+
+    service = GenerationService(args.workers)
+    server = make_server(service, args.host, args.port, args.socket)
+
+    where = args.socket or f"http://{args.host}:{args.port}"
+    print(f"\n🛰️  ModelIt K12 generation service listening on {where}")
+    print(f"   Workers: {args.workers} | Decks: {', '.join(DECK_BUILDERS)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Service stopped")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
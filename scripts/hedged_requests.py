@@ -0,0 +1,175 @@
+"""
+Hedged Requests for ModelIt K12 Image Generation
+Cuts tail latency on Nano Banana calls: when a request runs past a learned
+percentile of recent latencies, a duplicate is sent and the first valid image
+wins. Every hedge is charged at NANO_BANANA["cost_per_image"] and hedging stops
+at a maximum hedge rate or when the hedge budget is spent.
+Opt-in: --hedge on the generators, or MODELIT_HEDGE=1.
+"""
+
+import os
+import sys
+import time
+import queue
+import threading
+from collections import deque
+from pathlib import Path
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import NANO_BANANA
+from adaptive_limiter import IMAGE_LIMITER
+
+DEFAULT_PERCENTILE = 0.95   # hedge once a call is slower than 95% of recent calls
+DEFAULT_MAX_RATE = 0.10     # at most one hedge per ten requests
+DEFAULT_BUDGET = 0.50       # dollars of duplicate calls per process
+LATENCY_WINDOW = 100        # recent successful latencies the threshold is learned from
+MIN_SAMPLES = 10            # below this, hedge after DEFAULT_DELAY instead
+DEFAULT_DELAY = 60.0        # seconds; half the 120 s request timeout
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty sequence"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+class Hedger:
+    """Runs a request, and a duplicate if the first one straggles"""
+
+    def __init__(self, enabled=False, percentile=DEFAULT_PERCENTILE, max_rate=DEFAULT_MAX_RATE,
+                 budget=DEFAULT_BUDGET, cost_per_request=NANO_BANANA["cost_per_image"], capacity=None):
+        self.enabled = enabled
+        self.percentile, self.max_rate, self.budget = percentile, max_rate, budget
+        self.cost_per_request = cost_per_request
+        self.capacity = capacity  # callable: False when a duplicate would only queue
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.stats = {"requests": 0, "hedged": 0, "hedge_won": 0, "skipped_rate": 0,
+                      "skipped_budget": 0, "skipped_capacity": 0}
+        self.spent = 0.0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def threshold(self):
+        """Seconds a request may run before it is hedged"""
+        with self._lock:
+            if len(self.latencies) < MIN_SAMPLES:
+                return DEFAULT_DELAY
+            return percentile(self.latencies, self.percentile)
+
+    def _allow_hedge(self):
+        """Check rate, budget and capacity; charges the hedge when allowed"""
+        with self._lock:
+            if self.stats["hedged"] + 1 > self.max_rate * self.stats["requests"]:
+                self.stats["skipped_rate"] += 1
+                return False
+            if self.budget is not None and self.spent + self.cost_per_request > self.budget + 1e-9:
+                self.stats["skipped_budget"] += 1
+                return False
+            if self.capacity is not None and not self.capacity():
+                self.stats["skipped_capacity"] += 1
+                return False
+            self.stats["hedged"] += 1
+            self.spent += self.cost_per_request
+            return True
+
+    def _record(self, latency):
+        with self._lock:
+            self.latencies.append(latency)
+
+    def _launch(self, request, session, results, name, valid):
+        def run():
+            started = time.monotonic()
+            try:
+                result = request(session)
+            except Exception as e:
+                print(f"  │  ❌ Error ({name}): {str(e)}")
+                result = None
+            if valid(result):
+                # Late losers are still real samples of the latency distribution
+                self._record(time.monotonic() - started)
+            results.put((name, result))
+        # Daemon: a losing straggler must not hold up interpreter exit
+        threading.Thread(target=run, name=f"hedge-{name}", daemon=True).start()
+
+    def run(self, request, session=None, valid=None):
+        """Call request(session); returns the first result that passes valid()
+
+        valid defaults to "not None". When no result is valid, the primary's (or
+        else the hedge's) non-None result is returned so the caller can tell an
+        invalid payload from a failed call. The primary gets the caller's
+        session; a hedge uses a fresh connection, since requests.Session is not
+        safe to share between threads.
+        """
+        valid = valid or (lambda result: result is not None)
+        if not self.enabled:
+            return request(session)
+
+        with self._lock:
+            self.stats["requests"] += 1
+        results = queue.Queue()
+        threshold = self.threshold()
+        self._launch(request, session, results, "primary", valid)
+        try:
+            name, result = results.get(timeout=threshold)
+            return result  # finished (or failed) before the threshold: no hedge
+        except queue.Empty:
+            pass
+
+        if not self._allow_hedge():
+            return results.get()[1]
+
+        print(f"  │  🪁 Hedging after {threshold:.1f}s")
+        self._launch(request, None, results, "hedge", valid)
+        fallback = None
+        for _ in range(2):
+            name, result = results.get()
+            if valid(result):
+                if name == "hedge":
+                    with self._lock:
+                        self.stats["hedge_won"] += 1
+                return result
+            if fallback is None:
+                fallback = result
+        return fallback
+
+    # ------------------------------------------------------------------
+    def summary(self):
+        with self._lock:
+            known = len(self.latencies) >= MIN_SAMPLES
+            return {
+                "enabled": self.enabled,
+                "threshold": round(percentile(self.latencies, self.percentile), 2) if known else DEFAULT_DELAY,
+                "percentile": self.percentile,
+                "max_rate": self.max_rate,
+                "budget": self.budget,
+                "spent": round(self.spent, 4),
+                "stats": dict(self.stats)
+            }
+
+    def print_summary(self):
+        s = self.summary()
+        stats = s["stats"]
+        print(f"   🪁 Hedging: {stats['hedged']}/{stats['requests']} requests hedged "
+              f"(p{s['percentile'] * 100:.0f} threshold {s['threshold']:.1f}s), "
+              f"{stats['hedge_won']} hedges won, ${s['spent']:.2f} extra")
+        skipped = stats["skipped_rate"] + stats["skipped_budget"] + stats["skipped_capacity"]
+        if skipped:
+            print(f"      Not hedged: {stats['skipped_rate']} over rate, {stats['skipped_budget']} over budget, "
+                  f"{stats['skipped_capacity']} at the concurrency limit")
+
+def _has_capacity():
+    """A hedge is only worth sending when it will not wait behind other calls"""
+    return IMAGE_LIMITER.in_flight < IMAGE_LIMITER.effective_limit()
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+# One hedger per process, shared by every image generator
+IMAGE_HEDGER = Hedger(
+    enabled=os.environ.get("MODELIT_HEDGE", "") not in ("", "0"),
+    percentile=_env_float("MODELIT_HEDGE_PERCENTILE", DEFAULT_PERCENTILE),
+    max_rate=_env_float("MODELIT_HEDGE_MAX_RATE", DEFAULT_MAX_RATE),
+    budget=_env_float("MODELIT_HEDGE_BUDGET", DEFAULT_BUDGET),
+    capacity=_has_capacity
+)
@@ -0,0 +1,231 @@
+"""
+Image Response Validation for ModelIt K12 Image Generation
+Fast structural check of generated images before they are saved: magic bytes,
+PNG chunk walk with CRCs (JPEG marker walk, WebP RIFF chunk walk), and
+width/height read from the header - no pixel decode. Used by the Nano Banana generators to retry corrupt
+or truncated payloads and to report size mismatches against ASSET_SIZES.
+"""
+
+import sys
+import zlib
+import struct
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import ASSET_SIZES
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SOI = b"\xff\xd8"
+# Start-of-frame markers carry the dimensions (C4 DHT, C8 JPG and CC DAC do not)
+JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+JPEG_STANDALONE = {0x01} | set(range(0xD0, 0xD8))  # TEM, RST0-7: no length field
+WEBP_IMAGE_CHUNKS = {b"VP8 ", b"VP8L", b"VP8X"}
+
+MAX_ATTEMPTS = 3  # one call plus two retries of an invalid payload
+
+ImageInfo = namedtuple("ImageInfo", ["format", "width", "height"])
+
+class InvalidImage(ValueError):
+    """Raised when image bytes are truncated, corrupt or not PNG/JPEG/WebP"""
+
+# Run-wide counters, printed in the generator summaries
+STATS = {"checked": 0, "invalid": 0, "retries": 0, "mismatches": []}
+_stats_lock = threading.Lock()
+
+# ============================================================================
+# FORMAT WALKERS
+# ============================================================================
+
+def inspect_png(data):
+    """Walk every chunk and verify its CRC; returns ImageInfo"""
+    if len(data) < 8 + 25 or data[:8] != PNG_SIGNATURE:
+        raise InvalidImage("not a PNG (bad signature)")
+    pos, end = 8, len(data)
+    view = memoryview(data)  # CRC over slices without copying them
+    width = height = None
+    seen_idat = False
+    while True:
+        if pos + 8 > end:
+            raise InvalidImage(f"truncated at byte {pos} (no IEND)")
+        length, = struct.unpack_from(">I", data, pos)
+        chunk_type = data[pos + 4:pos + 8]
+        if pos + 12 + length > end:
+            raise InvalidImage(f"truncated in {chunk_type.decode('latin-1')} chunk at byte {pos}")
+        crc, = struct.unpack_from(">I", data, pos + 8 + length)
+        # The CRC covers type + data; zlib.crc32 runs in C, so this is cheap even for MBs of IDAT
+        if zlib.crc32(view[pos + 4:pos + 8 + length]) != crc:
+            raise InvalidImage(f"CRC mismatch in {chunk_type.decode('latin-1')} chunk at byte {pos}")
+
+        if width is None:
+            if chunk_type != b"IHDR" or length != 13:
+                raise InvalidImage("first chunk is not IHDR")
+            width, height = struct.unpack_from(">II", data, pos + 8)
+            if width == 0 or height == 0:
+                raise InvalidImage("zero width or height")
+        elif chunk_type == b"IDAT":
+            seen_idat = True
+        elif chunk_type == b"IEND":
+            if not seen_idat:
+                raise InvalidImage("no IDAT chunk")
+            return ImageInfo("PNG", width, height)
+        pos += 12 + length
+
+def inspect_jpeg(data):
+    """Walk the marker segments up to EOI; returns ImageInfo"""
+    if len(data) < 4 or data[:2] != JPEG_SOI:
+        raise InvalidImage("not a JPEG (bad SOI)")
+    pos, end = 2, len(data)
+    width = height = None
+    while True:
+        if pos + 2 > end:
+            raise InvalidImage(f"truncated at byte {pos} (no EOI)")
+        if data[pos] != 0xFF:
+            raise InvalidImage(f"expected a marker at byte {pos}")
+        marker = data[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker == 0xD9:
+            if width is None:
+                raise InvalidImage("no SOF segment")
+            return ImageInfo("JPEG", width, height)
+        if marker in JPEG_STANDALONE:
+            pos += 2
+            continue
+        if pos + 4 > end:
+            raise InvalidImage(f"truncated at byte {pos}")
+        length, = struct.unpack_from(">H", data, pos + 2)
+        if length < 2 or pos + 2 + length > end:
+            raise InvalidImage(f"truncated segment FF{marker:02X} at byte {pos}")
+        if marker in JPEG_SOF:
+            if length < 7:
+                raise InvalidImage("short SOF segment")
+            height, width = struct.unpack_from(">HH", data, pos + 5)
+            if width == 0 or height == 0:
+                raise InvalidImage("zero width or height")
+        pos += 2 + length
+
+        if marker == 0xDA:
+            # Entropy-coded scan: skip to the next marker that is not stuffing (FF00) or RSTn
+            while True:
+                pos = data.find(b"\xff", pos)
+                if pos < 0 or pos + 1 >= end:
+                    raise InvalidImage("truncated scan data (no EOI)")
+                following = data[pos + 1]
+                if following == 0x00 or 0xD0 <= following <= 0xD7 or following == 0xFF:
+                    pos += 1 if following == 0xFF else 2
+                    continue
+                break
+
+def inspect_webp(data):
+    """Walk the RIFF chunks to the declared end; dimensions from VP8X, VP8L or VP8; returns ImageInfo"""
+    if len(data) < 20 or data[:4] != b"RIFF" or data[8:12] != b"WEBP":
+        raise InvalidImage("not a WebP (bad RIFF header)")
+    riff_end = 8 + struct.unpack_from("<I", data, 4)[0]
+    if riff_end > len(data):
+        raise InvalidImage(f"truncated: RIFF declares {riff_end} bytes, got {len(data)}")
+    pos, size = 12, None
+    while pos < riff_end:
+        if pos + 8 > riff_end:
+            raise InvalidImage(f"truncated chunk header at byte {pos}")
+        chunk_type = data[pos:pos + 4]
+        length, = struct.unpack_from("<I", data, pos + 4)
+        body = pos + 8
+        if body + length > riff_end:
+            raise InvalidImage(f"truncated in {chunk_type.decode('latin-1')} chunk at byte {pos}")
+        if size is None and chunk_type in WEBP_IMAGE_CHUNKS:
+            if chunk_type == b"VP8X" and length >= 10:
+                size = (int.from_bytes(data[body + 4:body + 7], "little") + 1,
+                        int.from_bytes(data[body + 7:body + 10], "little") + 1)
+            elif chunk_type == b"VP8L" and length >= 5 and data[body] == 0x2F:
+                bits = int.from_bytes(data[body + 1:body + 5], "little")
+                size = ((bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+            elif chunk_type == b"VP8 " and length >= 10 and data[body + 3:body + 6] == b"\x9d\x01\x2a":
+                width, height = struct.unpack_from("<HH", data, body + 6)
+                size = (width & 0x3FFF, height & 0x3FFF)
+            else:
+                raise InvalidImage(f"malformed {chunk_type.decode('latin-1')} chunk")
+        pos = body + length + (length & 1)  # chunks are padded to even sizes
+    if size is None or 0 in size:
+        raise InvalidImage("no image chunk")
+    return ImageInfo("WebP", *size)
+
+def inspect_image(data):
+    """Format, width and height of PNG, JPEG or WebP bytes; raises InvalidImage
+
+    WebP is accepted like JPEG: PIL reads it wherever the saved file is used.
+    """
+    if not data:
+        raise InvalidImage("empty payload")
+    if data[:8] == PNG_SIGNATURE:
+        return inspect_png(data)
+    if data[:2] == JPEG_SOI:
+        return inspect_jpeg(data)
+    if data[:4] == b"RIFF":
+        return inspect_webp(data)
+    raise InvalidImage(f"unknown format (starts with {bytes(data[:8]).hex()})")
+
+# ============================================================================
+# TARGET SIZES
+# ============================================================================
+
+def target_dimensions(target):
+    """(width, height) for an ASSET_SIZES key such as "icon" or "social_media.twitter_header"
+
+    Raises KeyError naming the key; catalogs are checked up front by load_catalog.
+    """
+    entry = ASSET_SIZES
+    for part in target.split("."):
+        if not isinstance(entry, dict) or part not in entry:
+            raise KeyError(f"unknown ASSET_SIZES key {target!r}")
+        entry = entry[part]
+    if isinstance(entry, dict):
+        return entry["width"], entry["height"]
+    return tuple(entry)
+
+def is_valid_image(data):
+    """True when data is a structurally sound PNG, JPEG or WebP (no side effects)"""
+    try:
+        inspect_image(data)
+        return True
+    except InvalidImage:
+        return False
+
+def validate_image(data, target=None, label=""):
+    """Structural check plus size report; returns ImageInfo or None when invalid
+
+    A size mismatch against the ASSET_SIZES target is reported, not rejected:
+    the model picks its own output size.
+    """
+    try:
+        info = inspect_image(data)
+    except InvalidImage as e:
+        with _stats_lock:
+            STATS["checked"] += 1
+            STATS["invalid"] += 1
+        print(f"  │  ⚠️ Invalid image: {e}")
+        return None
+    with _stats_lock:
+        STATS["checked"] += 1
+    if target:
+        expected = target_dimensions(target)
+        if (info.width, info.height) != expected:
+            with _stats_lock:
+                STATS["mismatches"].append((label, (info.width, info.height), expected, target))
+            print(f"  │  📐 {info.width}×{info.height}, expected {expected[0]}×{expected[1]} ({target})")
+    return info
+
+def note_retry(attempt):
+    with _stats_lock:
+        STATS["retries"] += 1
+    print(f"  │  🔁 Retrying ({attempt}/{MAX_ATTEMPTS})")
+
+def print_summary():
+    if STATS["invalid"] or STATS["mismatches"]:
+        print(f"   🔎 Validation: {STATS['checked']} checked, {STATS['invalid']} invalid, "
+              f"{STATS['retries']} retried")
+        for label, (width, height), (expected_width, expected_height), target in STATS["mismatches"]:
+            print(f"      📐 {label}: {width}×{height}, expected {expected_width}×{expected_height} ({target})")
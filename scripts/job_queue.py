@@ -0,0 +1,465 @@
+"""
+Distributed Generation Queue for ModelIt K12
+Lets several processes or hosts share one visual-asset generation queue
+Jobs are claimed with leases and kept alive by heartbeats; a dead worker's
+lease expires and its job is re-queued. Results are merged into one
+assets/ tree and a single manifest.
+
+Backends:
+    SQLiteQueue - local/shared-filesystem default (one .db file)
+    RedisQueue  - same interface on Redis (requires the redis package)
+
+Usage:
+    python scripts/job_queue.py enqueue [categories] [max_per_category]
+    python scripts/job_queue.py work [--nodes=N]
+    python scripts/job_queue.py status
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import argparse
+import threading
+import multiprocessing
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import NANO_BANANA
+
+ASSETS_DIR = Path(__file__).parent.parent / "assets"
+DEFAULT_QUEUE_PATH = ASSETS_DIR / ".queue" / "jobs.db"
+MANIFEST_PATH = ASSETS_DIR / "manifest.json"
+
+LEASE_SECONDS = 300       # generation calls can take up to 120 s
+HEARTBEAT_SECONDS = 30
+MAX_ATTEMPTS = 3
+
+def worker_id():
+    """Unique id for this worker process"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+class QueueBackend(ABC):
+    """Interface shared by all queue backends
+
+    A job is a dict with "id", "payload" (JSON-serializable), "attempts".
+    """
+
+    @abstractmethod
+    def enqueue(self, job_id, payload):
+        """Add a job; returns False if the id is already queued"""
+
+    @abstractmethod
+    def claim(self, worker, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        """Atomically lease the next pending (or expired) job, or return None
+
+        An expired lease that already used max_attempts marks its job failed
+        instead of handing it out again, so a payload that kills or hangs its
+        worker is not retried forever.
+        """
+
+    @abstractmethod
+    def heartbeat(self, job_id, worker, lease_seconds=LEASE_SECONDS):
+        """Extend a lease; returns False if the worker no longer owns the job"""
+
+    @abstractmethod
+    def complete(self, job_id, worker, result):
+        """Store a job's result and mark it done"""
+
+    @abstractmethod
+    def fail(self, job_id, worker, error, max_attempts=MAX_ATTEMPTS):
+        """Release a job for retry, or mark it failed after max_attempts"""
+
+    @abstractmethod
+    def results(self):
+        """Yield (job_id, payload, result) for every completed job"""
+
+    @abstractmethod
+    def counts(self):
+        """{status: count}"""
+
+class SQLiteQueue(QueueBackend):
+    """Queue in one SQLite file; BEGIN IMMEDIATE serializes claims across processes"""
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until)")
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def _transaction(self, fn):
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            result = fn(db)
+            db.execute("COMMIT")
+            return result
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def enqueue(self, job_id, payload):
+        def insert(db):
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO jobs (id, payload) VALUES (?, ?)",
+                (job_id, json.dumps(payload))
+            )
+            return cursor.rowcount == 1
+        return self._transaction(insert)
+
+    def claim(self, worker, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        def claim_next(db):
+            now = time.time()
+            db.execute(
+                "UPDATE jobs SET status = 'failed', error = 'lease expired on the last attempt', "
+                "worker = NULL, lease_until = NULL "
+                "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, max_attempts)
+            )
+            row = db.execute(
+                "SELECT id, payload, attempts FROM jobs "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_until < ? AND attempts < ?) "
+                "ORDER BY status DESC, rowid LIMIT 1",
+                (now, max_attempts)
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE jobs SET status = 'leased', worker = ?, lease_until = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (worker, now + lease_seconds, row[0])
+            )
+            return {"id": row[0], "payload": json.loads(row[1]), "attempts": row[2] + 1}
+        return self._transaction(claim_next)
+
+    def heartbeat(self, job_id, worker, lease_seconds=LEASE_SECONDS):
+        def extend(db):
+            cursor = db.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + lease_seconds, job_id, worker)
+            )
+            return cursor.rowcount == 1
+        return self._transaction(extend)
+
+    def complete(self, job_id, worker, result):
+        def finish(db):
+            db.execute(
+                "UPDATE jobs SET status = 'done', result = ?, lease_until = NULL "
+                "WHERE id = ? AND worker = ?",
+                (json.dumps(result), job_id, worker)
+            )
+        self._transaction(finish)
+
+    def fail(self, job_id, worker, error, max_attempts=MAX_ATTEMPTS):
+        def release(db):
+            db.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "error = ?, worker = NULL, lease_until = NULL WHERE id = ? AND worker = ?",
+                (max_attempts, str(error), job_id, worker)
+            )
+        self._transaction(release)
+
+    def results(self):
+        db = self._connect()
+        try:
+            for job_id, payload, result in db.execute(
+                "SELECT id, payload, result FROM jobs WHERE status = 'done' ORDER BY id"
+            ):
+                yield job_id, json.loads(payload), json.loads(result)
+        finally:
+            db.close()
+
+    def counts(self):
+        db = self._connect()
+        try:
+            return dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        finally:
+            db.close()
+
+# Lease bookkeeping runs server-side so a worker dying between steps cannot
+# lose a job (popped from pending but never recorded in leases)
+_REQUEUE_EXPIRED_LUA = """
+local pending, leases, prefix = KEYS[1], KEYS[2], ARGV[1]
+local now, max_attempts = tonumber(ARGV[2]), tonumber(ARGV[3])
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', leases, 0, now)) do
+    redis.call('ZREM', leases, id)
+    local key = prefix .. ':job:' .. id
+    if tonumber(redis.call('HGET', key, 'attempts') or '0') >= max_attempts then
+        redis.call('HSET', key, 'status', 'failed', 'worker', '', 'error', 'lease expired on the last attempt')
+    else
+        redis.call('HSET', key, 'status', 'pending', 'worker', '')
+        redis.call('RPUSH', pending, id)
+    end
+end
+"""
+
+_CLAIM_LUA = """
+local pending, leases, prefix = KEYS[1], KEYS[2], ARGV[1]
+local id = redis.call('LPOP', pending)
+if not id then
+    return false
+end
+local key = prefix .. ':job:' .. id
+redis.call('ZADD', leases, ARGV[2], id)
+redis.call('HSET', key, 'status', 'leased', 'worker', ARGV[3])
+local attempts = redis.call('HINCRBY', key, 'attempts', 1)
+return {id, redis.call('HGET', key, 'payload'), attempts}
+"""
+
+class RedisQueue(QueueBackend):
+    """Same queue on Redis, for workers on several hosts without a shared filesystem
+
+    Keys: <prefix>:pending (list), <prefix>:leases (zset id -> lease_until),
+    <prefix>:job:<id> (hash: payload, worker, attempts, status, result, error)
+    """
+
+    def __init__(self, url="redis://localhost:6379/0", prefix="modelit:jobs"):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("RedisQueue requires the redis package: pip install redis")
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self._requeue_script = self.redis.register_script(_REQUEUE_EXPIRED_LUA)
+        self._claim_script = self.redis.register_script(_CLAIM_LUA)
+
+    def _key(self, *parts):
+        return ":".join((self.prefix,) + parts)
+
+    def enqueue(self, job_id, payload):
+        if not self.redis.hsetnx(self._key("job", job_id), "payload", json.dumps(payload)):
+            return False
+        self.redis.hset(self._key("job", job_id), mapping={"status": "pending", "attempts": 0})
+        self.redis.rpush(self._key("pending"), job_id)
+        return True
+
+    def _requeue_expired(self, max_attempts):
+        self._requeue_script(keys=[self._key("pending"), self._key("leases")],
+                             args=[self.prefix, time.time(), max_attempts])
+
+    def claim(self, worker, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        self._requeue_expired(max_attempts)
+        claimed = self._claim_script(keys=[self._key("pending"), self._key("leases")],
+                                     args=[self.prefix, time.time() + lease_seconds, worker])
+        if not claimed:
+            return None
+        job_id, payload, attempts = claimed
+        return {"id": job_id, "payload": json.loads(payload), "attempts": int(attempts)}
+
+    def heartbeat(self, job_id, worker, lease_seconds=LEASE_SECONDS):
+        if self.redis.hget(self._key("job", job_id), "worker") != worker:
+            return False
+        return self.redis.zadd(self._key("leases"), {job_id: time.time() + lease_seconds}, xx=True, ch=True) == 1
+
+    def complete(self, job_id, worker, result):
+        key = self._key("job", job_id)
+        if self.redis.hget(key, "worker") == worker:
+            self.redis.zrem(self._key("leases"), job_id)
+            self.redis.hset(key, mapping={"status": "done", "result": json.dumps(result)})
+            self.redis.sadd(self._key("done"), job_id)
+
+    def fail(self, job_id, worker, error, max_attempts=MAX_ATTEMPTS):
+        key = self._key("job", job_id)
+        if self.redis.hget(key, "worker") != worker:
+            return
+        self.redis.zrem(self._key("leases"), job_id)
+        if int(self.redis.hget(key, "attempts") or 0) >= max_attempts:
+            self.redis.hset(key, mapping={"status": "failed", "error": str(error)})
+        else:
+            self.redis.hset(key, mapping={"status": "pending", "error": str(error), "worker": ""})
+            self.redis.rpush(self._key("pending"), job_id)
+
+    def results(self):
+        for job_id in sorted(self.redis.smembers(self._key("done"))):
+            job = self.redis.hgetall(self._key("job", job_id))
+            yield job_id, json.loads(job["payload"]), json.loads(job["result"])
+
+    def counts(self):
+        counts = {}
+        for key in self.redis.scan_iter(self._key("job", "*")):
+            status = self.redis.hget(key, "status")
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+def open_queue(url=None):
+    """Open a backend from a URL: redis://... or a SQLite file path"""
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisQueue(url)
+    return SQLiteQueue(url or DEFAULT_QUEUE_PATH)
+
+# ============================================================================
+# JOBS
+# ============================================================================
+
+def enqueue_visual_assets(queue, categories=None, max_per_category=None):
+    """Put VISUAL_ASSETS entries on the queue (idempotent by filename)"""
+    from generate_visual_assets import VISUAL_ASSETS
+
+    added = 0
+    for category in categories or VISUAL_ASSETS.keys():
+        assets = VISUAL_ASSETS.get(category, [])
+        if max_per_category:
+            assets = assets[:max_per_category]
+        for asset in assets:
+            payload = dict(asset, category=category, asset_type="visuals")
+            added += queue.enqueue(f"visuals/{asset['filename']}", payload)
+    return added
+
+def run_job(payload, session=None):
+    """Generate and save one asset; returns the manifest entry"""
+    from generate_visual_assets import generate_image_with_nano_banana, save_image
+    from deck_media import file_sha256
+
+    image_bytes = generate_image_with_nano_banana(payload["prompt"], payload["type"], session=session)
+    if not image_bytes:
+        raise RuntimeError(f"Generation failed for {payload['filename']}")
+    path = save_image(image_bytes, payload["filename"], payload["asset_type"])
+    return {
+        "path": str(Path(payload["asset_type"]) / payload["filename"]),
+        "sha256": file_sha256(path),
+        "bytes": len(image_bytes),
+        "prompt": payload["prompt"],
+        "type": payload["type"],
+        "worker": None
+    }
+
+def _heartbeat_loop(queue, job_id, worker, stop, lease_seconds):
+    interval = min(HEARTBEAT_SECONDS, lease_seconds / 3)
+    while not stop.wait(interval):
+        if not queue.heartbeat(job_id, worker, lease_seconds):
+            # Lease lost (e.g. we stalled past expiry); another worker owns the job now
+            return
+
+def work(queue_url=None, idle_exit=True, poll_seconds=2.0, run=run_job, lease_seconds=LEASE_SECONDS):
+    """Claim and run jobs until the queue drains (or forever if idle_exit=False)
+
+    With idle_exit, a worker keeps polling while other workers hold leases, so
+    jobs orphaned by a dead worker are picked up once their lease expires.
+    """
+    import requests
+
+    queue = open_queue(queue_url)
+    worker = worker_id()
+    session = requests.Session()
+    done = failed = 0
+
+    print(f"  ├─ 🛠️ Worker {worker} started")
+    while True:
+        job = queue.claim(worker, lease_seconds)
+        if job is None:
+            if idle_exit and not queue.counts().get("leased"):
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        stop = threading.Event()
+        beat = threading.Thread(
+            target=_heartbeat_loop, args=(queue, job["id"], worker, stop, lease_seconds), daemon=True
+        )
+        beat.start()
+        try:
+            result = run(job["payload"], session=session)
+            result["worker"] = worker
+            queue.complete(job["id"], worker, result)
+            done += 1
+        except Exception as e:
+            queue.fail(job["id"], worker, e)
+            failed += 1
+            print(f"  │  ❌ {job['id']} (attempt {job['attempts']}): {e}")
+        finally:
+            stop.set()
+            beat.join()
+
+    print(f"  └─ Worker {worker} finished: {done} done, {failed} failed")
+    return done, failed
+
+def merge_manifest(queue, manifest_path=MANIFEST_PATH):
+    """Merge every completed job into the shared assets manifest"""
+    manifest_path = Path(manifest_path)
+    manifest = {}
+    if manifest_path.exists():
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    entries = manifest.setdefault("assets", {})
+    for _, _, result in queue.results():
+        entries[result["path"]] = result
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+    return len(entries)
+
+def run_local_nodes(nodes, queue_url=None, run=run_job, lease_seconds=LEASE_SECONDS, poll_seconds=2.0,
+                    idle_exit=True):
+    """Stand in for several hosts with local worker processes
+
+    run must be a module-level function so it can be sent to spawned workers.
+    """
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(target=work, args=(queue_url, idle_exit, poll_seconds, run, lease_seconds))
+        for _ in range(nodes)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared generation queue for ModelIt K12 assets")
+    parser.add_argument("command", choices=["enqueue", "work", "status", "merge"])
+    parser.add_argument("args", nargs="*", help="enqueue: [categories] [max_per_category]")
+    parser.add_argument("--queue", default=os.getenv("MODELIT_QUEUE"),
+                        help="SQLite path or redis:// URL (default: assets/.queue/jobs.db)")
+    parser.add_argument("--nodes", type=int, default=1, help="Local worker processes for 'work'")
+    parser.add_argument("--forever", action="store_true", help="Keep polling when the queue is empty")
+    args = parser.parse_args(argv)
+
+    queue = open_queue(args.queue)
+
+    if args.command == "enqueue":
+        categories = args.args[0].split(",") if args.args else None
+        max_per = int(args.args[1]) if len(args.args) > 1 else None
+        added = enqueue_visual_assets(queue, categories, max_per)
+        print(f"📥 Queued {added} new jobs (~${added * NANO_BANANA['cost_per_image']:.2f})")
+    elif args.command == "work":
+        print(f"\n🌐 Starting {args.nodes} worker(s)...")
+        if args.nodes > 1:
+            run_local_nodes(args.nodes, args.queue, idle_exit=not args.forever)
+        else:
+            work(args.queue, idle_exit=not args.forever)
+        print(f"📄 Manifest: {merge_manifest(queue)} assets in {MANIFEST_PATH}")
+    elif args.command == "merge":
+        print(f"📄 Manifest: {merge_manifest(queue)} assets in {MANIFEST_PATH}")
+
+    print(f"📊 Queue: {queue.counts()}")
+
+if __name__ == "__main__":
+    main()
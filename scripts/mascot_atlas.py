@@ -0,0 +1,244 @@
+"""
+Mascot Sprite Atlas and Animation Exporter for ModelIt K12
+Turns the separate Micro Mayhem pose PNGs into one sprite sheet + JSON frame
+map and an animated APNG/WebP across poses. Poses are trimmed to their
+content, aligned on a common anchor (bottom centre) and share one palette.
+Output: /assets/mascot/atlas/micro_mayhem_atlas.{png,json}, micro_mayhem.{apng,webp}
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import BRAND_COLORS, MASCOT_INFO
+
+MASCOT_DIR = Path(__file__).parent.parent / "assets" / "mascot"
+OUTPUT_DIR = MASCOT_DIR / "atlas"
+
+BACKGROUND_RGB = [BRAND_COLORS["background_light"]["rgb"], (255, 255, 255)]
+BACKGROUND_TOLERANCE = 24   # RGB distance still counted as background when trimming
+ATLAS_PADDING = 2           # pixels between packed frames (avoids bleeding when scaled)
+PALETTE_SIZE = 256
+
+def load_pose(path, frame_height=None):
+    """Load a pose as an RGBA array, optionally scaled to frame_height"""
+    with Image.open(path) as image:
+        image = image.convert("RGBA")
+        if frame_height and image.height > frame_height:
+            width = round(image.width * frame_height / image.height)
+            image = image.resize((width, frame_height), Image.LANCZOS)
+        return np.asarray(image)
+
+def content_mask(pixels):
+    """Foreground mask: alpha when the image has any, else not near the light background"""
+    alpha = pixels[..., 3]
+    if (alpha < 255).any():
+        return alpha > 0
+    rgb = pixels[..., :3].astype(np.int32)
+    is_background = np.zeros(alpha.shape, dtype=bool)
+    for color in BACKGROUND_RGB:
+        distance = np.sqrt(((rgb - np.array(color)) ** 2).sum(axis=-1))
+        is_background |= distance <= BACKGROUND_TOLERANCE
+    return ~is_background
+
+def trim(pixels):
+    """Crop to the content bounding box; returns (cropped, (x, y) offset)"""
+    mask = content_mask(pixels)
+    rows, cols = np.flatnonzero(mask.any(axis=1)), np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0:
+        return pixels[:1, :1], (0, 0)
+    top, bottom, left, right = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    return pixels[top:bottom, left:right], (int(left), int(top))
+
+def align_frames(trimmed):
+    """Place every trimmed pose on one canvas with a shared bottom-centre anchor
+
+    Returns (canvas (width, height), [(x, y) of each frame on the canvas]).
+    """
+    half_widths = [(frame.shape[1] + 1) // 2 for frame in trimmed]
+    canvas_width = 2 * max(half_widths)
+    canvas_height = max(frame.shape[0] for frame in trimmed)
+    offsets = [
+        (canvas_width // 2 - frame.shape[1] // 2, canvas_height - frame.shape[0])
+        for frame in trimmed
+    ]
+    return (canvas_width, canvas_height), offsets
+
+def pack_shelves(sizes, max_width):
+    """Shelf-pack (width, height) rectangles, tallest first; returns positions and sheet size"""
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+    positions = [None] * len(sizes)
+    x = y = shelf_height = sheet_width = 0
+    for i in order:
+        width, height = sizes[i]
+        if x and x + width > max_width:
+            x, y = 0, y + shelf_height + ATLAS_PADDING
+            shelf_height = 0
+        positions[i] = (x, y)
+        x += width + ATLAS_PADDING
+        shelf_height = max(shelf_height, height)
+        sheet_width = max(sheet_width, x - ATLAS_PADDING)
+    return positions, (sheet_width, y + shelf_height)
+
+# ============================================================================
+# SHARED PALETTE QUANTIZATION
+# ============================================================================
+
+def _nearest(pixels, palette, chunk=1 << 16):
+    """Index of the nearest palette entry for every pixel (squared RGBA distance)"""
+    palette = palette.astype(np.float32)
+    palette_norm = (palette ** 2).sum(axis=1)
+    indices = np.empty(len(pixels), dtype=np.uint8)
+    for start in range(0, len(pixels), chunk):
+        block = pixels[start:start + chunk].astype(np.float32)
+        # |x - c|^2 = |x|^2 - 2 x.c + |c|^2; |x|^2 is constant per row
+        distance = palette_norm[None, :] - 2.0 * block @ palette.T
+        indices[start:start + chunk] = distance.argmin(axis=1)
+    return indices
+
+def build_palette(frames, size=PALETTE_SIZE, sample=200_000, iterations=10, seed=0):
+    """K-means palette shared by all frames; entry 0 is fully transparent"""
+    pixels = np.concatenate([frame.reshape(-1, 4) for frame in frames])
+    visible = pixels[pixels[:, 3] > 0]
+    if len(visible) == 0:
+        return np.zeros((size, 4), dtype=np.uint8)
+
+    rng = np.random.default_rng(seed)
+    if len(visible) > sample:
+        visible = visible[rng.choice(len(visible), sample, replace=False)]
+    unique = np.unique(visible, axis=0)
+    k = min(size - 1, len(unique))
+    centers = unique[rng.choice(len(unique), k, replace=False)].astype(np.float32)
+
+    points = visible.astype(np.float32)
+    for _ in range(iterations):
+        labels = _nearest(points, centers)
+        counts = np.bincount(labels, minlength=k).astype(np.float32)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, points)
+        filled = counts > 0
+        centers[filled] = sums[filled] / counts[filled, None]
+
+    palette = np.zeros((size, 4), dtype=np.uint8)
+    palette[1:k + 1] = np.clip(np.rint(centers), 0, 255).astype(np.uint8)
+    return palette
+
+def quantize(frame, palette):
+    """Map an RGBA frame to a palette-mode image using the shared palette"""
+    flat = frame.reshape(-1, 4)
+    indices = np.zeros(len(flat), dtype=np.uint8)
+    visible = flat[:, 3] > 0
+    indices[visible] = _nearest(flat[visible], palette[1:]) + 1
+
+    image = Image.fromarray(indices.reshape(frame.shape[:2]), mode="P")
+    image.putpalette(palette[:, :3].tobytes())
+    image.info["transparency"] = palette[:, 3].tobytes()
+    return image
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def pose_name(path):
+    return path.stem.replace("micro_mayhem_", "")
+
+def export_atlas(paths, output_dir=OUTPUT_DIR, frame_height=512, max_width=4096,
+                 duration_ms=600, name="micro_mayhem"):
+    """Build the sprite sheet, frame map and animations; returns the output paths"""
+    paths = [Path(p) for p in paths]
+    if not paths:
+        raise ValueError("No mascot images to pack")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    trimmed, trim_offsets = zip(*(trim(load_pose(p, frame_height)) for p in paths))
+    canvas, anchor_offsets = align_frames(trimmed)
+    sizes = [(frame.shape[1], frame.shape[0]) for frame in trimmed]
+    positions, sheet_size = pack_shelves(sizes, max(max_width, max(w for w, _ in sizes)))
+
+    palette = build_palette(trimmed)
+
+    # Sprite sheet: trimmed frames packed tightly, indexed with the shared palette
+    sheet = np.zeros((sheet_size[1], sheet_size[0], 4), dtype=np.uint8)
+    for frame, (x, y) in zip(trimmed, positions):
+        sheet[y:y + frame.shape[0], x:x + frame.shape[1]] = frame
+    atlas_path = output_dir / f"{name}_atlas.png"
+    sheet_image = quantize(sheet, palette)
+    sheet_image.save(atlas_path, optimize=True, transparency=sheet_image.info["transparency"])
+
+    # Frame map in the common TexturePacker "hash" layout
+    frames = {}
+    for path, frame, (x, y), (ax, ay), trim_offset in zip(paths, trimmed, positions, anchor_offsets, trim_offsets):
+        frames[pose_name(path)] = {
+            "frame": {"x": x, "y": y, "w": frame.shape[1], "h": frame.shape[0]},
+            "rotated": False,
+            "trimmed": True,
+            "spriteSourceSize": {"x": ax, "y": ay, "w": frame.shape[1], "h": frame.shape[0]},
+            "sourceSize": {"w": canvas[0], "h": canvas[1]},
+            "pivot": {"x": 0.5, "y": 1.0},
+            "source": {"file": path.name, "trim_x": trim_offset[0], "trim_y": trim_offset[1]}
+        }
+    frame_map = {
+        "frames": frames,
+        "meta": {
+            "app": "ModelIt K12 mascot_atlas.py",
+            "image": atlas_path.name,
+            "size": {"w": sheet_size[0], "h": sheet_size[1]},
+            "format": "RGBA8888 (indexed)",
+            "scale": "1",
+            "character": MASCOT_INFO["name"]
+        }
+    }
+    json_path = output_dir / f"{name}_atlas.json"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(frame_map, f, indent=2)
+
+    # Animation: aligned full-canvas frames sharing one palette
+    animation = []
+    for frame, (ax, ay) in zip(trimmed, anchor_offsets):
+        full = np.zeros((canvas[1], canvas[0], 4), dtype=np.uint8)
+        full[ay:ay + frame.shape[0], ax:ax + frame.shape[1]] = frame
+        animation.append(quantize(full, palette))
+
+    apng_path = output_dir / f"{name}.apng"
+    animation[0].save(
+        apng_path, format="PNG", save_all=True, append_images=animation[1:],
+        duration=duration_ms, loop=0, disposal=0, blend=0,
+        transparency=animation[0].info["transparency"]
+    )
+
+    webp_path = output_dir / f"{name}.webp"
+    rgba_frames = [frame.convert("RGBA") for frame in animation]
+    rgba_frames[0].save(
+        webp_path, format="WEBP", save_all=True, append_images=rgba_frames[1:],
+        duration=duration_ms, loop=0, lossless=True, method=6
+    )
+
+    return {"atlas": atlas_path, "frames": json_path, "apng": apng_path, "webp": webp_path}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack mascot poses into a sprite atlas and animation")
+    parser.add_argument("paths", nargs="*", help="Pose PNGs (default: assets/mascot/micro_mayhem_*.png)")
+    parser.add_argument("--frame-height", type=int, default=512, help="Scale poses down to this height")
+    parser.add_argument("--duration", type=int, default=600, help="Milliseconds per animation frame")
+    parser.add_argument("--output-dir", default=str(OUTPUT_DIR))
+    args = parser.parse_args(argv)
+
+    paths = args.paths or sorted(MASCOT_DIR.glob("micro_mayhem_*.png"))
+
+    print(f"\n🎞️  Packing {len(paths)} Micro Mayhem poses...")
+    outputs = export_atlas(paths, args.output_dir, args.frame_height, duration_ms=args.duration)
+
+    source_bytes = sum(Path(p).stat().st_size for p in paths)
+    for kind, path in outputs.items():
+        print(f"  ├─ {kind}: {path.name} ({path.stat().st_size / 1024:.0f} KB)")
+    print(f"  └─ ✅ Source poses: {source_bytes / 1024:.0f} KB")
+
+if __name__ == "__main__":
+    main()
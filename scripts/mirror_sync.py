@@ -0,0 +1,327 @@
+"""
+Incremental Mirror Sync for ModelIt K12 Assets
+Publishes assets/ to a storage target (shared drive, bucket, ...) by comparing
+content hashes with the target's manifest: only new or changed files are
+transferred, in parallel, partial uploads resume where they stopped, and
+files deleted locally can be deleted on the target (--delete).
+
+Backends:
+    LocalDirectoryBackend - a directory or file:// URL (mounted shared drive;
+                            also the reference backend for offline testing)
+
+Usage:
+    python scripts/mirror_sync.py /mnt/shared/modelit-brand [--delete] [--dry-run] [--workers=4]
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+ASSETS_DIR = Path(__file__).parent.parent / "assets"
+HASH_CACHE_DIR = ASSETS_DIR / ".cache" / "sync"
+CHUNK_SIZE = 1024 * 1024
+DEFAULT_WORKERS = 4
+CHECKPOINT_SECONDS = 5.0  # remote manifest is rewritten at most this often during a run
+
+# ============================================================================
+# LOCAL MANIFEST
+# ============================================================================
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def local_manifest(root=ASSETS_DIR, cache_path=None):
+    """{relative path: {"sha256", "size"}} for every file under root
+
+    Dot-directories (.cache, .store, .queue) are skipped. Hashes are reused
+    from the previous run while a file's size and mtime are unchanged.
+    """
+    root = Path(root)
+    if cache_path is None:
+        # One hash cache per source directory
+        key = hashlib.sha256(str(root.resolve()).encode("utf-8")).hexdigest()[:12]
+        cache_path = HASH_CACHE_DIR / f"hashes-{key}.json"
+    try:
+        cache = json.loads(Path(cache_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cache = {}
+
+    manifest, fresh_cache = {}, {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            if filename.startswith("."):
+                continue
+            path = Path(dirpath) / filename
+            rel_path = path.relative_to(root).as_posix()
+            stat = path.stat()
+            cached = cache.get(rel_path)
+            if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+                digest = cached["sha256"]
+            else:
+                digest = _file_sha256(path)
+            fresh_cache[rel_path] = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            manifest[rel_path] = {"sha256": digest, "size": stat.st_size}
+
+    try:
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(cache_path).write_text(json.dumps(fresh_cache), encoding="utf-8")
+    except OSError:
+        pass  # read-only checkout: next run rehashes
+    return manifest
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+class SyncBackend:
+    """Interface shared by all storage targets
+
+    Paths are relative, "/"-separated. Uploads are resumable: bytes go to a
+    partial object keyed by the content hash, which commit() verifies and
+    moves into place.
+    """
+
+    def read_manifest(self):
+        """{path: {"sha256", "size"}} last written by write_manifest, or {}"""
+        raise NotImplementedError
+
+    def write_manifest(self, manifest):
+        raise NotImplementedError
+
+    def partial_size(self, sha256):
+        """Bytes already uploaded for this content (0 when nothing is pending)"""
+        raise NotImplementedError
+
+    def append_partial(self, sha256, offset, data):
+        """Write data at offset of the partial object"""
+        raise NotImplementedError
+
+    def commit(self, sha256, path):
+        """Verify the partial object's hash and publish it at path"""
+        raise NotImplementedError
+
+    def delete(self, path):
+        raise NotImplementedError
+
+    def clear_partials(self, keep=()):
+        """Remove partial objects except those for the given hashes"""
+        raise NotImplementedError
+
+class LocalDirectoryBackend(SyncBackend):
+    """Target is a directory (a mounted shared drive, or a temp dir in tests)"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.meta_dir = self.root / ".modelit-sync"
+        self.partial_dir = self.meta_dir / "partial"
+        self.manifest_path = self.meta_dir / "manifest.json"
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _target(self, path):
+        target = (self.root / path).resolve()
+        if self.root.resolve() not in target.parents:
+            raise ValueError(f"Path escapes the sync target: {path}")
+        return target
+
+    def _partial(self, sha256):
+        return self.partial_dir / f"{sha256}.part"
+
+    def read_manifest(self):
+        try:
+            return json.loads(self.manifest_path.read_text(encoding="utf-8"))["files"]
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def write_manifest(self, manifest):
+        with self._lock:
+            temp_path = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+            temp_path.write_text(json.dumps({"files": manifest, "time": time.time()}, indent=1, sort_keys=True),
+                                 encoding="utf-8")
+            os.replace(temp_path, self.manifest_path)
+
+    def partial_size(self, sha256):
+        try:
+            return self._partial(sha256).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def append_partial(self, sha256, offset, data):
+        mode = "r+b" if offset else "wb"
+        with open(self._partial(sha256), mode) as f:
+            f.seek(offset)
+            f.write(data)
+            f.truncate()
+
+    def commit(self, sha256, path):
+        partial = self._partial(sha256)
+        if _file_sha256(partial) != sha256:
+            partial.unlink()
+            raise IOError(f"Hash mismatch after upload of {path}; partial discarded")
+        target = self._target(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(partial, target)
+
+    def delete(self, path):
+        target = self._target(path)
+        target.unlink(missing_ok=True)
+        # Prune directories the delete left empty
+        for parent in target.parents:
+            if parent == self.root.resolve() or any(parent.iterdir()):
+                break
+            parent.rmdir()
+
+    def clear_partials(self, keep=()):
+        for partial in self.partial_dir.glob("*.part"):
+            if partial.stem not in keep:
+                partial.unlink(missing_ok=True)
+
+def open_backend(url):
+    """Open a backend from a URL: file:///path or a plain directory path"""
+    if url.startswith("file://"):
+        return LocalDirectoryBackend(url[len("file://"):])
+    if "://" in url:
+        raise ValueError(f"No sync backend for {url.split('://')[0]}:// (subclass SyncBackend to add one)")
+    return LocalDirectoryBackend(url)
+
+# ============================================================================
+# SYNC
+# ============================================================================
+
+def plan_sync(local, remote, delete=False):
+    """(paths to upload, paths to delete) from two manifests"""
+    uploads = [path for path, entry in local.items() if remote.get(path, {}).get("sha256") != entry["sha256"]]
+    deletes = sorted(set(remote) - set(local)) if delete else []
+    return uploads, deletes
+
+def upload_file(backend, source, sha256, path, chunk_size=CHUNK_SIZE):
+    """Send one file, resuming a partial upload of the same content; returns bytes sent"""
+    size = source.stat().st_size
+    offset = backend.partial_size(sha256)
+    if offset > size:
+        offset = 0  # stale partial of another length; start over
+    sent = 0
+    with open(source, "rb") as f:
+        f.seek(offset)
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            backend.append_partial(sha256, offset, chunk)
+            offset += len(chunk)
+            sent += len(chunk)
+    if size == 0:
+        backend.append_partial(sha256, 0, b"")
+    backend.commit(sha256, path)
+    return sent
+
+def sync(target, root=ASSETS_DIR, delete=False, dry_run=False, workers=DEFAULT_WORKERS):
+    """Mirror root to target; returns {"uploaded", "deleted", "unchanged", "failed", "bytes"}"""
+    backend = open_backend(target) if isinstance(target, str) else target
+    root = Path(root)
+    local = local_manifest(root)
+    remote = backend.read_manifest()
+    uploads, deletes = plan_sync(local, remote, delete)
+    stats = {"uploaded": 0, "deleted": 0, "unchanged": len(local) - len(uploads),
+             "failed": 0, "bytes": 0, "resumed": 0}
+
+    if dry_run:
+        for path in uploads:
+            print(f"  ├─ ⬆️  {path}")
+        for path in deletes:
+            print(f"  ├─ 🗑️  {path}")
+        stats["uploaded"], stats["deleted"] = len(uploads), len(deletes)
+        return stats
+
+    # The remote manifest only ever lists files that are really there
+    published = dict(remote)
+    lock = threading.Lock()
+    last_checkpoint = [time.monotonic()]
+
+    def checkpoint(force=False):
+        with lock:
+            if force or time.monotonic() - last_checkpoint[0] >= CHECKPOINT_SECONDS:
+                backend.write_manifest(dict(published))
+                last_checkpoint[0] = time.monotonic()
+
+    # Files with identical content share a partial object, so they go through one worker
+    by_content = {}
+    for path in uploads:
+        by_content.setdefault(local[path]["sha256"], []).append(path)
+
+    def transfer(sha256, paths):
+        results = []
+        for path in paths:
+            try:
+                resumed = backend.partial_size(sha256) > 0
+                sent = upload_file(backend, root / path, sha256, path)
+            except Exception as e:
+                results.append((path, e))
+                continue
+            with lock:
+                published[path] = local[path]
+                stats["bytes"] += sent
+                stats["resumed"] += resumed
+            results.append((path, None))
+            checkpoint()
+        return results
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = [pool.submit(transfer, sha256, paths) for sha256, paths in by_content.items()]
+            for future in as_completed(futures):
+                for path, error in future.result():
+                    if error is None:
+                        stats["uploaded"] += 1
+                        print(f"  ├─ ⬆️  {path}")
+                    else:
+                        stats["failed"] += 1
+                        print(f"  ├─ ❌ {path}: {error}")
+
+        for path in deletes:
+            backend.delete(path)
+            published.pop(path, None)
+            stats["deleted"] += 1
+            print(f"  ├─ 🗑️  {path}")
+    finally:
+        checkpoint(force=True)
+
+    # Partials of content that is still pending (failed uploads) are kept for the next run
+    pending = {local[path]["sha256"] for path in uploads if published.get(path) != local[path]}
+    backend.clear_partials(keep=pending)
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally mirror ModelIt K12 assets to a storage target")
+    parser.add_argument("target", help="Directory or file:// URL of the mirror")
+    parser.add_argument("--source", default=str(ASSETS_DIR))
+    parser.add_argument("--delete", action="store_true", help="Delete target files that no longer exist locally")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Parallel transfers")
+    args = parser.parse_args(argv)
+
+    print(f"\n🔄 Syncing {args.source} → {args.target}")
+    started = time.perf_counter()
+    stats = sync(args.target, args.source, args.delete, args.dry_run, args.workers)
+    verb = "Would upload" if args.dry_run else "Uploaded"
+    print(f"  ├─ {verb} {stats['uploaded']} ({stats['bytes'] / 1024 / 1024:.1f} MB, {stats['resumed']} resumed), "
+          f"deleted {stats['deleted']}, unchanged {stats['unchanged']}")
+    if stats["failed"]:
+        print(f"  └─ ❌ {stats['failed']} failed (re-run to resume)")
+        return 1
+    print(f"  └─ ✅ Done in {time.perf_counter() - started:.2f}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
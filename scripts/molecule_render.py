@@ -0,0 +1,417 @@
+"""
+Ball-and-Stick Molecule Renderer for ModelIt K12
+Draws molecular_structure visuals from real coordinates (XYZ or SDF/MOL
+V2000) instead of asking the image model for them, so structures are
+chemically right and free. Atoms are shaded spheres, bonds shaded sticks
+(double/triple bonds as parallel sticks). Every sphere and stick pixel is a
+fragment keyed depth|primitive, a vectorized z-buffer (np.maximum.at) keeps
+the nearest, and only the winning pixels are shaded. Thousands of atoms
+render at TPT cover size in under a second.
+Colours: IMAGE_STYLES["molecular_structure"] (O blue, N teal, H light) + brand navy for C
+Inputs: /catalog/molecules/*.xyz, *.sdf, *.mol
+Output: /assets/visuals/<input name>.png
+"""
+
+import io
+import sys
+import time
+import argparse
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import BRAND_COLORS, IMAGE_STYLES
+from asset_store import save_asset
+from network_diagram import grid_pairs
+from procedural_backgrounds import resolve_size
+
+MOLECULE_DIR = Path(__file__).parent.parent / "catalog" / "molecules"
+DEFAULT_SIZE = "powerpoint_slide"
+BLUE, TEAL, LIGHT = IMAGE_STYLES["molecular_structure"]["colors"]
+
+# symbol -> (covalent radius, van der Waals radius) in angstroms
+ELEMENTS = {
+    "H": (0.31, 1.10), "B": (0.84, 1.92), "C": (0.76, 1.70), "N": (0.71, 1.55), "O": (0.66, 1.52),
+    "F": (0.57, 1.47), "Na": (1.66, 2.27), "Mg": (1.41, 1.73), "Si": (1.11, 2.10), "P": (1.07, 1.80),
+    "S": (1.05, 1.80), "Cl": (1.02, 1.75), "K": (2.03, 2.75), "Ca": (1.76, 2.31), "Fe": (1.32, 2.04),
+    "Cu": (1.32, 1.40), "Zn": (1.22, 1.39), "Se": (1.20, 1.90), "Br": (1.20, 1.85), "I": (1.39, 1.98)
+}
+DEFAULT_ELEMENT = (1.00, 2.00)
+ELEMENT_COLORS = {
+    "H": LIGHT,
+    "C": BRAND_COLORS["secondary_navy"]["hex"],
+    "N": TEAL,
+    "O": BLUE
+}
+OTHER_COLOR = BRAND_COLORS["accent_gold"]["hex"]  # P, S, halogens, metals
+
+BALL_SCALE = 0.3        # sphere radius as a fraction of the van der Waals radius
+BOND_RADIUS = 0.12      # angstroms
+BOND_TOLERANCE = 0.45   # inferred bond: distance < sum of covalent radii + this
+DEFAULT_ROTATION = (15.0, -20.0, 0.0)  # degrees about x, y, z after the principal-axes view
+LIGHT_DIRECTION = np.array([-0.45, -0.55, 0.70])  # screen y points down
+AMBIENT = 0.35
+SPECULAR = 0.45
+SHININESS = 40
+FOG = 0.35              # blend towards the background one molecule-width behind the nearest atom
+DEPTH_BITS = 24         # quantized depth above the 32-bit primitive id in z-buffer keys (float32 exact)
+
+Molecule = namedtuple("Molecule", ["name", "symbols", "coords", "bonds", "orders"])
+
+# ============================================================================
+# INPUT
+# ============================================================================
+
+def _symbol(text):
+    """Element symbol from an XYZ/SDF atom label ("Cl" -> "Cl", "c12" -> "C", "HW1" -> "H")"""
+    letters = "".join(ch for ch in text if ch.isalpha())
+    if not letters:
+        raise ValueError(f"Invalid atom label {text!r}")
+    symbol = letters[:2].capitalize()
+    return symbol if symbol in ELEMENTS else letters[0].upper()
+
+def read_xyz(text, name="molecule"):
+    """Molecule from XYZ text (first frame); bonds are inferred from distances"""
+    lines = text.splitlines()
+    try:
+        count = int(lines[0].split()[0])
+    except (IndexError, ValueError):
+        raise ValueError(f"{name}: XYZ must start with the atom count") from None
+    if len(lines) < count + 2:
+        raise ValueError(f"{name}: expected {count} atoms, file has {max(len(lines) - 2, 0)} atom lines")
+    symbols, coords = [], []
+    for line in lines[2:2 + count]:
+        fields = line.split()
+        symbols.append(_symbol(fields[0]))
+        coords.append([float(value) for value in fields[1:4]])
+    return Molecule(name, symbols, np.array(coords, dtype=float), None, None)
+
+def read_sdf(text, name="molecule"):
+    """Molecule from the first record of an SDF/MOL V2000 file, with its bond table"""
+    lines = text.splitlines()
+    if len(lines) < 4 or "V3000" in lines[3]:
+        raise ValueError(f"{name}: only MOL/SDF V2000 connection tables are supported")
+    atom_count, bond_count = int(lines[3][0:3]), int(lines[3][3:6])
+    symbols, coords = [], []
+    for line in lines[4:4 + atom_count]:
+        coords.append([float(line[0:10]), float(line[10:20]), float(line[20:30])])
+        symbols.append(_symbol(line[31:34]))
+    bonds, orders = [], []
+    for line in lines[4 + atom_count:4 + atom_count + bond_count]:
+        bonds.append((int(line[0:3]) - 1, int(line[3:6]) - 1))
+        order = int(line[6:9])
+        orders.append(order if order in (1, 2, 3) else 1)  # aromatic (4) and query orders: single stick
+    return Molecule(name, symbols, np.array(coords, dtype=float),
+                    np.array(bonds, dtype=np.intp).reshape(-1, 2), np.array(orders, dtype=np.intp))
+
+def load_molecule(path):
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() == ".xyz":
+        return read_xyz(text, path.stem)
+    if path.suffix.lower() in (".sdf", ".mol"):
+        return read_sdf(text, path.stem)
+    raise ValueError(f"{path.name}: expected .xyz, .sdf or .mol")
+
+def infer_bonds(symbols, coords):
+    """(bonds, orders) from covalent radii: pairs closer than r_i + r_j + BOND_TOLERANCE"""
+    covalent = np.array([ELEMENTS.get(symbol, DEFAULT_ELEMENT)[0] for symbol in symbols])
+    if len(coords) < 2:
+        return np.empty((0, 2), dtype=np.intp), np.empty(0, dtype=np.intp)
+    i, j = grid_pairs(coords, 2.0 * covalent.max() + BOND_TOLERANCE)
+    distance = np.sqrt(((coords[i] - coords[j]) ** 2).sum(axis=-1))
+    bonded = (distance > 0.4) & (distance < covalent[i] + covalent[j] + BOND_TOLERANCE)
+    bonds = np.stack([i[bonded], j[bonded]], axis=1)
+    return bonds, np.ones(len(bonds), dtype=np.intp)
+
+# ============================================================================
+# VIEW
+# ============================================================================
+
+def _rotation(degrees):
+    ax, ay, az = np.radians(degrees)
+    rx = np.array([[1, 0, 0], [0, np.cos(ax), -np.sin(ax)], [0, np.sin(ax), np.cos(ax)]])
+    ry = np.array([[np.cos(ay), 0, np.sin(ay)], [0, 1, 0], [-np.sin(ay), 0, np.cos(ay)]])
+    rz = np.array([[np.cos(az), -np.sin(az), 0], [np.sin(az), np.cos(az), 0], [0, 0, 1]])
+    return rz @ ry @ rx
+
+def view_coordinates(coords, width, height, rotation=DEFAULT_ROTATION):
+    """Coordinates in the view frame: longest principal axis along the canvas's longer side, flattest into depth"""
+    centred = coords - coords.mean(axis=0)
+    if len(coords) > 2:
+        _, _, axes = np.linalg.svd(centred, full_matrices=False)
+        if np.linalg.det(axes) < 0:
+            axes[2] *= -1
+        centred = centred @ axes.T
+    if height > width:
+        centred = centred[:, [1, 0, 2]] * np.array([1.0, 1.0, -1.0])  # swap x/y, keep it a rotation
+    return centred @ _rotation(rotation).T
+
+# ============================================================================
+# RASTERIZER
+# ============================================================================
+
+def _hex_rgb(value):
+    value = value.lstrip("#")
+    return np.array([int(value[i:i + 2], 16) for i in (0, 2, 4)], dtype=np.float32)
+
+def _shade(nx, ny, nz):
+    """(diffuse factor, specular term) for unit normals given per component, pointing towards the viewer"""
+    light = LIGHT_DIRECTION / np.linalg.norm(LIGHT_DIRECTION)
+    half = light + np.array([0.0, 0.0, 1.0])
+    half /= np.linalg.norm(half)
+    lx, ly, lz = light.astype(np.float32)
+    hx, hy, hz = half.astype(np.float32)
+    diffuse = AMBIENT + (1.0 - AMBIENT) * np.maximum(nx * lx + ny * ly + nz * lz, 0.0)
+    highlight = nx * hx + ny * hy + nz * hz
+    specular = np.zeros_like(highlight)
+    bright = highlight > 0.8  # below this the highlight is under 1/1000 at SHININESS 40
+    specular[bright] = SPECULAR * highlight[bright] ** SHININESS
+    return diffuse.astype(np.float32), specular
+
+def _expand(count):
+    """(owner, local index) for count[k] items per owner, flattened with repeat/arange"""
+    owner = np.repeat(np.arange(len(count)), count)
+    local = np.arange(len(owner)) - np.repeat(np.cumsum(count) - count, count)
+    return owner, local
+
+def _sphere_fragments(center, depth, radius, width, depth_key):
+    """(pixel index, z-buffer key) blocks for all spheres
+
+    Spheres are grouped by sprite size, and each group is one dense float32
+    broadcast over (sphere, row, column); pixels outside a sphere get key -1,
+    which never wins, so no compaction pass is needed.
+    """
+    sprite_sizes = np.ceil(radius + 1.0).astype(np.intp)
+    for size in np.unique(sprite_sizes):
+        members = np.flatnonzero(sprite_sizes == size)
+        offsets = np.arange(-size, size + 1)
+        base = np.floor(center[members]).astype(np.intp)
+        fraction = (center[members] - base).astype(np.float32)
+        dx = (offsets + 0.5).astype(np.float32) - fraction[:, 0, None]
+        dy = (offsets + 0.5).astype(np.float32) - fraction[:, 1, None]
+        d2 = dx[:, None, :] ** 2 + dy[:, :, None] ** 2
+        r = radius[members, None, None].astype(np.float32)
+        surface = np.sqrt(np.maximum(r * r - d2, 0.0))
+        keys = depth_key(depth[members, None, None].astype(np.float32) + surface, members[:, None, None])
+        keys[d2 >= (r + 0.5) ** 2] = -1
+        pixels = ((base[:, 1] + offsets[:, None, None]) * width + base[:, 0]).T[..., None] + offsets
+        yield pixels.reshape(-1), keys.reshape(-1)
+
+def _stick_frame(x, y, start, end):
+    """(t along the stick 0..1, signed distance s across it) of points x, y"""
+    axis = end - start
+    length2 = np.maximum((axis ** 2).sum(axis=-1), 1e-12)
+    rx, ry = x - start[:, 0], y - start[:, 1]
+    t = (rx * axis[:, 0] + ry * axis[:, 1]) / length2
+    s = (ry * axis[:, 0] - rx * axis[:, 1]) / np.sqrt(length2)
+    return t, s
+
+def _stick_fragments(start, end, start_depth, end_depth, radius, width, height, depth_key):
+    """(pixel index, z-buffer key) of every pixel a stick touches
+
+    Each stick is scanned along its major screen axis: every column gets the
+    same number of candidate rows around the centre line, so all sticks
+    flatten into one array with np.repeat and are then tested exactly at the
+    pixel centres in float32.
+    """
+    if not len(start):
+        return
+    axis = end - start
+    major = (np.abs(axis[:, 1]) > np.abs(axis[:, 0])).astype(np.intp)
+    rows = np.arange(len(start))
+    a_major, a_minor = start[rows, major], start[rows, 1 - major]
+    d_major, d_minor = axis[rows, major], axis[rows, 1 - major]
+    length = np.maximum(np.sqrt(d_major ** 2 + d_minor ** 2), 1e-9)
+    slope = d_minor / np.where(d_major == 0, 1.0, d_major)
+    half = (radius + 0.5) * np.sqrt(1.0 + slope * slope)
+    cap = (radius + 0.5) * np.abs(d_minor) / length + 0.5  # the flat ends reach this far past the end points
+
+    first = np.floor(np.minimum(a_major, a_major + d_major) - cap).astype(np.intp)
+    columns = np.floor(np.maximum(a_major, a_major + d_major) + cap).astype(np.intp) - first + 1
+    span = np.ceil(2.0 * half).astype(np.intp) + 1
+    count = columns * span
+    stick, local = _expand(count)
+
+    def per_fragment(values, dtype=np.float32):
+        return np.repeat(values.astype(dtype), count)
+
+    span_f = per_fragment(span, np.intp)
+    column = per_fragment(first, np.intp) + local // span_f
+    rel_major = (column - per_fragment(a_major, np.float64) + 0.5).astype(np.float32)
+    centre_line = per_fragment(a_minor, np.float64) + rel_major * per_fragment(slope)
+    row = np.floor(centre_line - per_fragment(half)).astype(np.intp) + local % span_f
+    rel_minor = (row - per_fragment(a_minor, np.float64) + 0.5).astype(np.float32)
+    dm, dn = per_fragment(d_major / length ** 2), per_fragment(d_minor / length ** 2)
+    t = rel_major * dm + rel_minor * dn
+    s = (rel_minor * dm - rel_major * dn) * per_fragment(length)
+    r = per_fragment(radius)
+    inside = (t >= 0.0) & (t <= 1.0) & (np.abs(s) < r + 0.5)
+    is_y = per_fragment(major, bool)
+    px, py = np.where(is_y, row, column), np.where(is_y, column, row)
+    inside &= (px >= 0) & (px < width) & (py >= 0) & (py < height)
+
+    stick, t, s, r = stick[inside], t[inside], s[inside], r[inside]
+    bulge = np.sqrt(np.maximum(r * r - s * s, 0.0))
+    z = start_depth[stick] + t * (end_depth[stick] - start_depth[stick]) + bulge
+    yield py[inside] * width + px[inside], depth_key(z, stick)
+
+def render_molecule(molecule, width, height, rotation=DEFAULT_ROTATION, background="#FFFFFF", transparent=False):
+    """Ball-and-stick PIL image (RGB, or RGBA when transparent)"""
+    symbols, coords = molecule.symbols, molecule.coords
+    bonds, orders = molecule.bonds, molecule.orders
+    if bonds is None:
+        bonds, orders = infer_bonds(symbols, coords)
+    elements, element = np.unique(np.asarray(symbols), return_inverse=True)
+    ball = np.array([ELEMENTS.get(symbol, DEFAULT_ELEMENT)[1] for symbol in elements])[element] * BALL_SCALE
+    palette = np.stack([_hex_rgb(ELEMENT_COLORS.get(symbol, OTHER_COLOR)) for symbol in elements])
+
+    # Fit the projected molecule (with its balls) into the canvas; the margin also keeps every sprite on it
+    view = view_coordinates(coords, width, height, rotation)
+    low = (view[:, :2] - ball[:, None]).min(axis=0)
+    high = (view[:, :2] + ball[:, None]).max(axis=0)
+    margin = max(0.06 * min(width, height), 4.0)
+    scale = min((width - 2 * margin) / max(high[0] - low[0], 1e-6), (height - 2 * margin) / max(high[1] - low[1], 1e-6))
+    center = (view[:, :2] - (low + high) / 2.0) * scale + np.array([width, height]) / 2.0
+    depth = view[:, 2] * scale
+    radius = ball * scale
+
+    # Double and triple bonds become thinner parallel sticks, offset across the projected bond
+    stick_radius = BOND_RADIUS * scale
+    bond, slot = _expand(orders)
+    order = orders[bond]
+    a, b = bonds[bond, 0], bonds[bond, 1]
+    offset = (slot - (order - 1) / 2.0) * stick_radius * 1.6
+    direction = center[b] - center[a]
+    direction /= np.maximum(np.sqrt((direction ** 2).sum(axis=-1, keepdims=True)), 1e-9)
+    across = np.stack([-direction[:, 1], direction[:, 0]], axis=1) * offset[:, None]
+    start, end = center[a] + across, center[b] + across
+    sub_radius = np.where(order > 1, 0.6, 1.0) * stick_radius
+
+    # Only the part of a stick between the two ball surfaces can be seen; split keeps the colour change mid-bond
+    length = np.maximum(np.sqrt(((end - start) ** 2).sum(axis=-1) + (depth[b] - depth[a]) ** 2), 1e-9)
+    reach = np.abs(offset) + sub_radius
+    t0 = np.sqrt(np.maximum(radius[a] ** 2 - reach ** 2, 0.0)) / length
+    t1 = 1.0 - np.sqrt(np.maximum(radius[b] ** 2 - reach ** 2, 0.0)) / length
+    sticks = np.flatnonzero(t1 > t0)
+    split = (0.5 - t0) / np.where(t1 > t0, t1 - t0, 1.0)
+    start, end = start + (end - start) * t0[:, None], start + (end - start) * t1[:, None]
+    start_depth, end_depth = depth[a] + (depth[b] - depth[a]) * t0, depth[a] + (depth[b] - depth[a]) * t1
+
+    # Z-buffer keys: quantized depth above the primitive id (spheres, then sticks), so one
+    # maximum.at per fragment block keeps the nearest fragment; shading is deferred to the winners
+    z_low = min(depth.min(), start_depth.min(initial=np.inf), end_depth.min(initial=np.inf))
+    z_high = max((depth + radius).max(), (np.maximum(start_depth, end_depth) + sub_radius).max(initial=-np.inf))
+    z_scale = ((1 << DEPTH_BITS) - 1) / max(z_high - z_low, 1e-9)
+
+    def depth_key(z, primitive):
+        keys = ((z - z_low) * z_scale).astype(np.int64)
+        keys <<= 32
+        keys |= primitive
+        return keys
+
+    zbuffer = np.full(width * height, -1, dtype=np.int64)
+    for pixels, keys in _sphere_fragments(center, depth, radius, width, depth_key):
+        np.maximum.at(zbuffer, pixels, keys)
+    for pixels, keys in _stick_fragments(start[sticks], end[sticks], start_depth[sticks], end_depth[sticks],
+                                         sub_radius[sticks], width, height, depth_key):
+        np.maximum.at(zbuffer, pixels, keys | np.int64(1 << 31))  # high id bit marks sticks
+
+    covered = np.flatnonzero(zbuffer >= 0)
+    winner = zbuffer[covered] & 0xFFFFFFFF
+    cy, cx = np.divmod(covered, width)
+    px, py = cx.astype(np.float32) + 0.5, cy.astype(np.float32) + 0.5
+    n = len(covered)
+    nx, ny, nz = np.empty(n, np.float32), np.empty(n, np.float32), np.empty(n, np.float32)
+    coverage, centre_depth = np.empty(n, np.float32), np.empty(n, np.float32)
+    tone = np.empty(n, dtype=np.intp)  # palette index of the winning atom colour
+
+    on_sphere = winner < (1 << 31)
+    k = winner[on_sphere]
+    r = radius[k].astype(np.float32)
+    dx, dy = px[on_sphere] - center[k, 0].astype(np.float32), py[on_sphere] - center[k, 1].astype(np.float32)
+    d2 = dx * dx + dy * dy
+    nx[on_sphere], ny[on_sphere] = dx / r, dy / r
+    nz[on_sphere] = np.sqrt(np.maximum(1.0 - d2 / (r * r), 0.0))
+    coverage[on_sphere] = r + 0.5 - np.sqrt(d2)
+    tone[on_sphere] = element[k]
+    centre_depth[on_sphere] = depth[k]
+
+    on_stick = ~on_sphere
+    k = sticks[winner[on_stick] - (1 << 31)]
+    t, s = _stick_frame(px[on_stick], py[on_stick], start[k], end[k])
+    across_fraction = np.clip(s / sub_radius[k], -1.0, 1.0)
+    unit = (end[k] - start[k]) / np.maximum(np.sqrt(((end[k] - start[k]) ** 2).sum(axis=-1)), 1e-9)[:, None]
+    nx[on_stick], ny[on_stick] = -unit[:, 1] * across_fraction, unit[:, 0] * across_fraction
+    nz[on_stick] = np.sqrt(1.0 - across_fraction ** 2)
+    coverage[on_stick] = sub_radius[k] + 0.5 - np.abs(s)
+    tone[on_stick] = np.where(t < split[k], element[a[k]], element[b[k]])
+    centre_depth[on_stick] = start_depth[k] + t * (end_depth[k] - start_depth[k])
+
+    # Lit colour, fogged towards the background with depth; silhouettes blend by coverage.
+    # Channels are composed one at a time on flat float32 arrays.
+    diffuse, specular = _shade(nx, ny, nz)
+    np.clip(coverage, 0.0, 1.0, out=coverage)
+    if transparent:
+        keep = np.ones(n, dtype=np.float32)  # no background to fog into; coverage becomes alpha
+    else:
+        # Fog grows over the molecule's largest extent, so flat molecules are not washed out by tiny depth differences
+        extent = max(float(np.ptp(depth)), float(np.ptp(center, axis=0).max()), 1e-9)
+        keep = (1.0 - FOG * (depth.max() - centre_depth) / extent) * coverage
+    diffuse *= keep
+    specular *= 255.0 * keep
+    background_rgb = _hex_rgb(background)
+    channels = 4 if transparent else 3
+    shaded = np.empty((n, channels), dtype=np.uint8)
+    for channel in range(3):
+        value = palette[:, channel][tone] * diffuse
+        value += specular
+        value += (1.0 - keep) * background_rgb[channel] + 0.5
+        shaded[:, channel] = np.minimum(value, 255.0)
+    if transparent:
+        shaded[:, 3] = coverage * 255.0 + 0.5
+        pixels = np.zeros((width * height, 4), dtype=np.uint8)
+    else:
+        pixels = np.tile(background_rgb.astype(np.uint8), (width * height, 1))
+    pixels[covered] = shaded
+    return Image.fromarray(pixels.reshape(height, width, channels), mode="RGBA" if transparent else "RGB")
+
+def render_png(molecule, size=DEFAULT_SIZE, rotation=DEFAULT_ROTATION, transparent=False):
+    width, height = resolve_size(size)
+    image = render_molecule(molecule, width, height, rotation, transparent=transparent)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render ball-and-stick molecules for ModelIt K12 visuals")
+    parser.add_argument("inputs", nargs="*", help="XYZ / SDF / MOL files (default: catalog/molecules/)")
+    parser.add_argument("--size", default=DEFAULT_SIZE, help="ASSET_SIZES key or WIDTHxHEIGHT")
+    parser.add_argument("--rotate", default=",".join(f"{v:g}" for v in DEFAULT_ROTATION),
+                        help="Degrees about x,y,z after the principal-axes view")
+    parser.add_argument("--transparent", action="store_true", help="RGBA output without a background")
+    args = parser.parse_args(argv)
+
+    rotation = tuple(float(value) for value in args.rotate.split(","))
+    if len(rotation) != 3:
+        parser.error("--rotate takes three comma-separated angles")
+    inputs = args.inputs or sorted(p for p in MOLECULE_DIR.glob("*") if p.suffix.lower() in (".xyz", ".sdf", ".mol"))
+    print(f"\n⚛️  Rendering {len(inputs)} molecule(s)...")
+    for path in inputs:
+        molecule = load_molecule(path)
+        started = time.perf_counter()
+        data = render_png(molecule, args.size, rotation, args.transparent)
+        output = save_asset(data, "visuals", f"{molecule.name}.png")
+        print(f"  ├─ {Path(output).name}: {len(molecule.symbols)} atoms ({time.perf_counter() - started:.2f}s)")
+    print(f"  └─ ✅ {len(inputs)} molecules")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,606 @@
+"""
+Network Diagram Renderer for ModelIt K12
+Draws Boolean networks, feedback loops and systems diagrams from a graph spec
+instead of asking the image model for them: labelled, correct and free. Edges
+come from the spec or are derived from Boolean rules (a negated regulator is
+an inhibition, drawn with a bar head). Layout is a vectorized force-directed
+(Fruchterman-Reingold) layout - exact repulsion for small graphs, grid-binned
+repulsion for thousands of nodes - or a layered layout for feed-forward graphs.
+Colours: IMAGE_STYLES["network_diagram"]
+Specs: /catalog/networks/*.json (nodes/edges/rules) or *.txt ("C* = A and not B")
+Output: /assets/visuals/<spec name>.svg and .png
+"""
+
+import io
+import re
+import ast
+import sys
+import json
+import time
+import argparse
+import itertools
+from functools import lru_cache
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import BRAND_COLORS, FONTS, IMAGE_STYLES
+from brand_fonts import load_font
+from asset_store import save_asset
+from procedural_backgrounds import resolve_size
+
+SPEC_DIR = Path(__file__).parent.parent / "catalog" / "networks"
+EDGE_COLOR, NODE_COLOR, INPUT_COLOR = IMAGE_STYLES["network_diagram"]["colors"]
+BACKGROUND = BRAND_COLORS["background_light"]["hex"]
+DEFAULT_SIZE = "powerpoint_slide"
+
+ITERATIONS = 250
+EXACT_LIMIT = 400     # above this many nodes, repulsion is near pairs + particle mesh
+CUTOFF = 2.0          # near/far split of the repulsion, in ideal edge lengths k
+SKIN = 1.0            # extra neighbour-list radius; the list is rebuilt after nodes move SKIN / 2
+MESH_SPACING = 0.5    # finest particle-mesh cell, in k
+MESH_MAX = 128        # mesh cells along the longer side at most
+MESH_STEP = 16        # mesh sizes are rounded up to multiples of this, so kernels can be cached
+GRAVITY = 0.05        # pull towards the centre; keeps disconnected parts together
+LABEL_LIMIT = 80      # larger graphs are drawn without labels
+SUPERSAMPLE = 2       # PNG is drawn at this scale and reduced, for anti-aliasing
+TITLE_BAND = 0.1      # share of the height reserved for a spec title
+
+# ============================================================================
+# SPEC PARSING
+# ============================================================================
+
+_BOOLEAN_WORDS = re.compile(r"\b(AND|OR|NOT)\b")
+
+def rule_regulators(expr):
+    """{variable: +1 activating, -1 inhibiting, 0 both} for a Boolean rule
+
+    Rules use and/or/not (or AND/OR/NOT) and parentheses; a variable's sign is
+    the parity of the nots above it.
+    """
+    try:
+        tree = ast.parse(_BOOLEAN_WORDS.sub(lambda m: m.group(1).lower(), expr.strip()), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid Boolean rule {expr!r}: {e.msg}") from None
+
+    signs = {}
+
+    def visit(node, sign):
+        if isinstance(node, ast.BoolOp):
+            for value in node.values:
+                visit(value, sign)
+        elif isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            visit(node.operand, -sign)
+        elif isinstance(node, ast.Name):
+            signs[node.id] = sign if signs.get(node.id, sign) == sign else 0
+        elif not (isinstance(node, ast.Constant) and isinstance(node.value, bool)):
+            raise ValueError(f"Invalid Boolean rule {expr!r}: only and/or/not, names and True/False are allowed")
+
+    visit(tree.body, 1)
+    return signs
+
+class Network:
+    """Nodes (names, labels, groups), edges as an (E, 2) index array with signs, and Boolean rules"""
+
+    def __init__(self, name, nodes, edges, rules=None, layout="auto", title=None):
+        self.name = name
+        self.title = title
+        self.layout = layout
+        self.rules = rules or {}
+        if not nodes:
+            raise ValueError(f"{name}: no nodes")
+        self.ids = [node["id"] for node in nodes]
+        self.index = {node_id: i for i, node_id in enumerate(self.ids)}
+        if len(self.index) != len(self.ids):
+            raise ValueError(f"{name}: duplicate node ids")
+        self.labels = [node.get("label", node["id"]) for node in nodes]
+        self.groups = [node.get("group") for node in nodes]
+
+        pairs, signs = [], []
+        for edge in edges:
+            for end in (edge["source"], edge["target"]):
+                if end not in self.index:
+                    raise ValueError(f"{name}: edge refers to unknown node {end!r}")
+            pairs.append((self.index[edge["source"]], self.index[edge["target"]]))
+            signs.append(edge.get("sign", 1))
+        self.edges = np.array(pairs, dtype=np.intp).reshape(-1, 2)
+        self.signs = np.array(signs, dtype=np.int8)
+
+    def __len__(self):
+        return len(self.ids)
+
+def _node(value):
+    return {"id": value} if isinstance(value, str) else dict(value)
+
+def _sign(value):
+    return {"+": 1, "-": -1, "±": 0}.get(value, value) if isinstance(value, str) else int(value)
+
+def network_from_rules(name, rules, nodes=(), edges=(), layout="auto", title=None):
+    """Network whose edges are the regulators of each rule (plus any explicit nodes/edges)"""
+    nodes = {node["id"]: node for node in map(_node, nodes)}
+    edges = [dict(edge, sign=_sign(edge.get("sign", 1))) for edge in edges]
+    for target, expr in rules.items():
+        nodes.setdefault(target, {"id": target})
+        if expr.strip() == target:
+            continue  # "X* = X" keeps an input constant; not drawn as a self-loop
+        for regulator, sign in rule_regulators(expr).items():
+            nodes.setdefault(regulator, {"id": regulator})
+            edges.append({"source": regulator, "target": target, "sign": sign})
+    return Network(name, list(nodes.values()), edges, rules, layout, title)
+
+def parse_rules_text(text):
+    """{target: rule} from BooleanNet-style lines ("C* = A and not B"; # comments)"""
+    rules = {}
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        target, equals, expr = line.partition("=")
+        target = target.strip().rstrip("*").strip()
+        if not equals or not target.isidentifier():
+            raise ValueError(f"line {line_number}: expected 'Target* = rule', got {line!r}")
+        rules[target] = expr.strip() or target
+    return rules
+
+def load_spec(path):
+    """Network from a .json spec ({nodes, edges, rules, layout, title}) or a Boolean rules text file"""
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() != ".json":
+        return network_from_rules(path.stem, parse_rules_text(text))
+    spec = json.loads(text)
+    return network_from_rules(path.stem, spec.get("rules", {}), spec.get("nodes", []), spec.get("edges", []),
+                              spec.get("layout", "auto"), spec.get("title"))
+
+# ============================================================================
+# LAYOUT
+# ============================================================================
+# Positions are in units of the ideal edge length k = 1.
+
+def _repulsion_exact(pos):
+    """k^2 / d repulsion between every pair of nodes"""
+    force = np.empty_like(pos)
+    dx = pos[:, None, 0] - pos[None, :, 0]
+    dy = pos[:, None, 1] - pos[None, :, 1]
+    inverse = dx * dx + dy * dy
+    np.maximum(inverse, 1e-4, out=inverse)
+    np.reciprocal(inverse, out=inverse)
+    np.fill_diagonal(inverse, 0.0)
+    force[:, 0] = (dx * inverse).sum(axis=1)
+    force[:, 1] = (dy * inverse).sum(axis=1)
+    return force
+
+def _half_stencil(dimensions):
+    """Neighbour cell offsets whose first non-zero component is positive, plus the cell itself
+
+    With same-cell pairs taken once (i < j), every pair is visited exactly once.
+    """
+    offsets = itertools.product((-1, 0, 1), repeat=dimensions)
+    return [offset for offset in offsets if not any(offset) or next(c for c in offset if c) > 0]
+
+def grid_pairs(pos, radius):
+    """(i, j) index arrays of all point pairs closer than radius, found through a grid of radius-sized cells
+
+    Works in any dimension (2D layouts, 3D atoms). Points are sorted by
+    cell; for every point and stencil offset the member range of that cell
+    is expanded into index pairs with repeat/arange.
+    """
+    cells = np.floor(pos / radius).astype(np.int64)
+    cells -= cells.min(axis=0) - 1
+    dims = cells.max(axis=0) + 2
+    strides = np.concatenate([np.cumprod(dims[::-1])[::-1][1:], [1]])
+    keys = cells @ strides
+    order = np.argsort(keys, kind="stable")
+    unique, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+
+    points = np.arange(len(pos))
+    found_i, found_j = [], []
+    for offset in _half_stencil(pos.shape[1]):
+        wanted = keys + int(np.dot(offset, strides))
+        slot = np.minimum(np.searchsorted(unique, wanted), len(unique) - 1)
+        hit = unique[slot] == wanted
+        slot = slot[hit]
+        count = counts[slot]
+        total = int(count.sum())
+        if not total:
+            continue
+        first = np.repeat(np.cumsum(count) - count, count)
+        j = order[np.repeat(starts[slot], count) + np.arange(total) - first]
+        i = np.repeat(points[hit], count)
+        keep = (i < j) if not any(offset) else np.ones(total, dtype=bool)
+        delta = pos[i[keep]] - pos[j[keep]]
+        near = (delta ** 2).sum(axis=-1) < radius * radius
+        found_i.append(i[keep][near])
+        found_j.append(j[keep][near])
+    if not found_i:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(found_i), np.concatenate(found_j)
+
+def _repulsion_pairs(pos, i, j, cutoff):
+    """k^2 / d repulsion over a neighbour list, for pairs closer than cutoff"""
+    n = len(pos)
+    delta = pos[i] - pos[j]
+    d2 = (delta ** 2).sum(axis=-1)
+    weight = np.where(d2 < cutoff * cutoff, 1.0 / np.maximum(d2, 1e-4), 0.0)
+    force = np.empty_like(pos)
+    for axis in (0, 1):
+        push = delta[:, axis] * weight
+        force[:, axis] = np.bincount(i, weights=push, minlength=n) - np.bincount(j, weights=push, minlength=n)
+    return force
+
+@lru_cache(maxsize=8)
+def _mesh_kernel(gx, gy, spacing, cutoff):
+    """Spectra of the x/y repulsion kernels d / |d|^2 (zero inside cutoff) on a padded gx x gy mesh"""
+    shape = (2 * gx, 2 * gy)
+    # Signed cell offsets in FFT wrap-around order; the padding keeps the convolution from wrapping
+    ox = np.fft.fftfreq(shape[0], 1.0 / shape[0])[:, None] * spacing
+    oy = np.fft.fftfreq(shape[1], 1.0 / shape[1])[None, :] * spacing
+    r2 = ox * ox + oy * oy
+    inverse = np.where(r2 >= cutoff * cutoff, 1.0 / np.maximum(r2, 1e-9), 0.0)
+    return np.fft.rfft2(ox * inverse), np.fft.rfft2(oy * inverse)
+
+def _repulsion_mesh(pos, cutoff):
+    """k^2 / d repulsion from everything beyond cutoff, through a density grid (particle-mesh)
+
+    Node counts are binned onto a grid and convolved by FFT with the
+    repulsion kernel (zero inside cutoff, which the pair list covers); each
+    node reads the force at its cell. Spacing doubles and the mesh grows in
+    steps of MESH_STEP cells, so the kernel spectra are reused across
+    iterations.
+    """
+    low = pos.min(axis=0)
+    extent = float((pos.max(axis=0) - low).max())
+    spacing = MESH_SPACING * 2.0 ** max(0, int(np.ceil(np.log2(extent / (MESH_SPACING * MESH_MAX) + 1e-12))))
+    cell = np.floor((pos - low) / spacing).astype(np.intp)
+    gx, gy = (-(-(cell.max(axis=0) + 1) // MESH_STEP) * MESH_STEP).tolist()
+    density = np.bincount(cell[:, 0] * gy + cell[:, 1], minlength=gx * gy).reshape(gx, gy).astype(float)
+
+    shape = (2 * gx, 2 * gy)
+    spectrum = np.fft.rfft2(density, shape)
+    force = np.empty_like(pos)
+    for axis, kernel in enumerate(_mesh_kernel(gx, gy, spacing, cutoff)):
+        field = np.fft.irfft2(spectrum * kernel, shape)[:gx, :gy]
+        force[:, axis] = field[cell[:, 0], cell[:, 1]]
+    return force
+
+def force_layout(n, edges, seed=0, iterations=ITERATIONS):
+    """Fruchterman-Reingold positions (n, 2) with linear cooling
+
+    Above EXACT_LIMIT nodes, repulsion is split at CUTOFF: near pairs come
+    from a Verlet neighbour list (pairs within CUTOFF + SKIN, found on a grid
+    and reused until some node has moved SKIN / 2), the far field from the
+    particle mesh. Both are O(n) per iteration.
+    """
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-1.0, 1.0, (n, 2)) * np.sqrt(n)
+    if n < 2:
+        return pos
+    links = edges[edges[:, 0] != edges[:, 1]]
+    temperature = np.sqrt(n) / 5.0
+    pairs, moved = None, np.inf
+    for step in range(iterations):
+        if n <= EXACT_LIMIT:
+            displacement = _repulsion_exact(pos)
+        else:
+            if moved > SKIN / 2.0:
+                pairs, moved = grid_pairs(pos, CUTOFF + SKIN), 0.0
+            displacement = _repulsion_pairs(pos, *pairs, CUTOFF) + _repulsion_mesh(pos, CUTOFF)
+        delta = pos[links[:, 0]] - pos[links[:, 1]]
+        distance = np.sqrt((delta ** 2).sum(axis=-1, keepdims=True))
+        pull = delta * distance  # d^2 / k along the unit vector
+        for axis in (0, 1):
+            displacement[:, axis] -= np.bincount(links[:, 0], weights=pull[:, axis], minlength=n)
+            displacement[:, axis] += np.bincount(links[:, 1], weights=pull[:, axis], minlength=n)
+        displacement -= GRAVITY * pos * np.sqrt((pos ** 2).sum(axis=-1, keepdims=True))
+
+        length = np.maximum(np.sqrt((displacement ** 2).sum(axis=-1, keepdims=True)), 1e-9)
+        limit = temperature * (1.0 - step / iterations) + 0.01
+        step_length = np.minimum(length, limit)
+        pos += displacement / length * step_length
+        moved += 2.0 * float(step_length.max())  # two nodes can close in on each other at once
+    return pos
+
+def _feedback_free_order(n, edges):
+    """Node order in which most edges point forward (DFS finish order, reversed)"""
+    successors = [[] for _ in range(n)]
+    for source, target in edges:
+        successors[source].append(target)
+    seen, finished = np.zeros(n, dtype=bool), []
+    for root in range(n):
+        if seen[root]:
+            continue
+        seen[root] = True
+        stack = [(root, iter(successors[root]))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if not seen[child]:
+                    seen[child] = True
+                    stack.append((child, iter(successors[child])))
+                    break
+            else:
+                finished.append(node)
+                stack.pop()
+    return finished[::-1]
+
+def layered_layout(n, edges, sweeps=4):
+    """Left-to-right layers by longest path (feedback edges ignored), ordered by barycentre sweeps"""
+    order = _feedback_free_order(n, edges)
+    rank = np.empty(n, dtype=np.intp)
+    rank[order] = np.arange(n)
+    forward = edges[rank[edges[:, 0]] < rank[edges[:, 1]]]
+    layer = np.zeros(n, dtype=np.intp)
+    by_source = forward[np.argsort(rank[forward[:, 0]], kind="stable")]
+    for source, target in by_source:
+        layer[target] = max(layer[target], layer[source] + 1)
+
+    position = np.zeros(n)
+    for value in range(layer.max() + 1):
+        members = np.flatnonzero(layer == value)
+        position[members] = np.arange(len(members))
+    for _ in range(sweeps):
+        # Each node moves to the mean position of its neighbours in earlier layers
+        for value in range(1, layer.max() + 1):
+            members = np.flatnonzero(layer == value)
+            incoming = forward[layer[forward[:, 1]] == value]
+            total = np.bincount(incoming[:, 1], weights=position[incoming[:, 0]], minlength=n)
+            count = np.bincount(incoming[:, 1], minlength=n)
+            centre = np.where(count[members] > 0, total[members] / np.maximum(count[members], 1), position[members])
+            position[members[np.argsort(centre, kind="stable")]] = np.arange(len(members))
+
+    pos = np.stack([layer.astype(float), position], axis=1)
+    # Centre each layer vertically
+    for value in range(layer.max() + 1):
+        members = layer == value
+        pos[members, 1] -= pos[members, 1].mean()
+    return pos
+
+def layout_network(network, method="auto", seed=0):
+    """Positions (n, 2); auto = layered for acyclic graphs, force-directed otherwise"""
+    method = network.layout if method == "auto" else method
+    n = len(network)
+    if method == "auto":
+        order = _feedback_free_order(n, network.edges)
+        rank = np.empty(n, dtype=np.intp)
+        rank[order] = np.arange(n)
+        acyclic = bool(np.all(rank[network.edges[:, 0]] < rank[network.edges[:, 1]])) if len(network.edges) else False
+        method = "layered" if acyclic and n <= LABEL_LIMIT else "force"
+    if method == "layered":
+        return layered_layout(n, network.edges), method
+    if method != "force":
+        raise ValueError(f"Unknown layout '{method}' (use auto, force or layered)")
+    pos = force_layout(n, network.edges, seed)
+    # Long axis horizontal, to fill landscape slides
+    centred = pos - pos.mean(axis=0)
+    _, _, axes = np.linalg.svd(centred, full_matrices=False)
+    return centred @ axes.T, method
+
+# ============================================================================
+# GEOMETRY
+# ============================================================================
+
+def fit_positions(pos, width, height, margin, max_stretch=2.0):
+    """Scale positions into the canvas; an axis may be stretched up to max_stretch times the other"""
+    low, high = pos.min(axis=0), pos.max(axis=0)
+    span = np.maximum(high - low, 1e-9)
+    scale = np.array([width - 2 * margin, height - 2 * margin]) / span
+    scale = np.minimum(scale, scale.min() * max_stretch)
+    fitted = (pos - low) * scale
+    fitted += (np.array([width, height]) - (high - low) * scale) / 2.0
+    return fitted
+
+def title_size(height):
+    return max(14, round(height * 0.045))
+
+def node_radius(xy, edges, width, height):
+    """Radius from the canvas area per node, shrunk to keep linked nodes apart"""
+    n = len(xy)
+    radius = 0.35 * np.sqrt(width * height / max(n, 1)) / 2.0
+    links = edges[edges[:, 0] != edges[:, 1]]
+    if len(links):
+        lengths = np.sqrt(((xy[links[:, 0]] - xy[links[:, 1]]) ** 2).sum(axis=-1))
+        radius = min(radius, 0.3 * float(np.median(lengths)))
+    return float(np.clip(radius, 2.0, 0.06 * min(width, height)))
+
+def edge_geometry(network, xy, radius):
+    """(start, control, end) points per edge, trimmed to the node rims; reciprocal edges curve apart"""
+    source, target = network.edges[:, 0], network.edges[:, 1]
+    a, b = xy[source], xy[target]
+    delta = b - a
+    length = np.maximum(np.sqrt((delta ** 2).sum(axis=-1, keepdims=True)), 1e-9)
+    unit = delta / length
+    normal = np.stack([-unit[:, 1], unit[:, 0]], axis=1)
+
+    pairs = set(zip(source.tolist(), target.tolist()))
+    reciprocal = np.array([(t, s) in pairs for s, t in zip(source.tolist(), target.tolist())], dtype=bool)
+    bend = np.where(reciprocal, 0.18, 0.0)[:, None] * length
+    control = (a + b) / 2.0 + normal * bend
+
+    # Trim along the start/end tangents (towards the control point)
+    def trim(point, towards, distance):
+        direction = towards - point
+        return point + direction / np.maximum(np.sqrt((direction ** 2).sum(axis=-1, keepdims=True)), 1e-9) * distance
+
+    head = radius * 0.35
+    start = trim(a, control, radius)
+    end = trim(b, control, radius + head * 0.6)
+    return start, control, end, source == target
+
+def _colors(network):
+    """Fill colour per node: by group when the spec has groups, else inputs teal and regulated nodes blue"""
+    palette = [NODE_COLOR, INPUT_COLOR, EDGE_COLOR]
+    if any(group is not None for group in network.groups):
+        names = list(dict.fromkeys(str(group) for group in network.groups))
+        return [palette[names.index(str(group)) % len(palette)] for group in network.groups]
+    regulated = np.zeros(len(network), dtype=bool)
+    regulated[network.edges[network.edges[:, 0] != network.edges[:, 1], 1]] = True
+    return [NODE_COLOR if flag else INPUT_COLOR for flag in regulated]
+
+def label_size(labels, radius):
+    """One font size (px) for all labels: the largest at which most fit inside their nodes"""
+    font_size = max(6, int(radius * 0.7))
+    widest = sorted(labels, key=len)[int(len(labels) * 0.9)] if labels else ""
+    while font_size > max(6, radius * 0.35) and load_font(FONTS["body"], font_size).getlength(widest) > radius * 1.7:
+        font_size -= 1
+    return font_size
+
+# ============================================================================
+# RENDERING
+# ============================================================================
+
+def _hex_rgb(value):
+    value = value.lstrip("#")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+def render_svg(network, xy, radius, width, height):
+    start, control, end, loops = edge_geometry(network, xy, radius)
+    stroke = max(1.0, radius * 0.08)
+    head = radius * 0.35  # arrow length; edges end 0.6 head short of the rim, like the PNG
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">',
+        "<defs>",
+        f'<marker id="activates" viewBox="0 0 10 10" refX="4" refY="5" markerUnits="userSpaceOnUse" '
+        f'markerWidth="{head:.2f}" markerHeight="{head:.2f}" orient="auto">'
+        f'<path d="M0,0 L10,5 L0,10 z" fill="{EDGE_COLOR}"/></marker>',
+        f'<marker id="inhibits" viewBox="0 0 10 16" refX="0" refY="8" markerUnits="userSpaceOnUse" '
+        f'markerWidth="{head:.2f}" markerHeight="{head * 1.6:.2f}" orient="auto">'
+        f'<rect x="6" width="{20 * stroke / head:.2f}" height="16" fill="{EDGE_COLOR}"/></marker>',
+        "</defs>",
+        f'<rect width="100%" height="100%" fill="{BACKGROUND}"/>',
+        f'<g fill="none" stroke="{EDGE_COLOR}" stroke-width="{stroke:.2f}" stroke-opacity="0.8">'
+    ]
+    for k in range(len(network.edges)):
+        marker = "inhibits" if network.signs[k] < 0 else "activates"
+        dash = ' stroke-dasharray="6 4"' if network.signs[k] == 0 else ""
+        if loops[k]:
+            x, y = xy[network.edges[k, 0]]
+            path = (f"M{x + radius * 0.5:.1f},{y - radius * 0.87:.1f} "
+                    f"A{radius * 0.6:.1f},{radius * 0.6:.1f} 0 1 1 {x + radius:.1f},{y - radius * 0.1:.1f}")
+        else:
+            path = (f"M{start[k, 0]:.1f},{start[k, 1]:.1f} Q{control[k, 0]:.1f},{control[k, 1]:.1f} "
+                    f"{end[k, 0]:.1f},{end[k, 1]:.1f}")
+        parts.append(f'<path d="{path}" marker-end="url(#{marker})"{dash}/>')
+    parts.append("</g>")
+
+    colors = _colors(network)
+    labelled = len(network) <= LABEL_LIMIT
+    parts.append(f'<g stroke="{EDGE_COLOR}" stroke-width="{stroke:.2f}">')
+    for i, (x, y) in enumerate(xy):
+        rule = network.rules.get(network.ids[i])
+        tooltip = f"<title>{escape(network.ids[i])}{' = ' + escape(rule) if rule else ''}</title>"
+        parts.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{radius:.1f}" fill="{colors[i]}">{tooltip}</circle>')
+    parts.append("</g>")
+    if labelled:
+        font_size = label_size(network.labels, radius)
+        parts.append(f'<g fill="#FFFFFF" text-anchor="middle" dominant-baseline="central" '
+                     f'font-family="{FONTS["body"]}, {FONTS["primary_fallback"]}, sans-serif">')
+        for i, (x, y) in enumerate(xy):
+            label = network.labels[i]
+            parts.append(f'<text x="{x:.1f}" y="{y:.1f}" font-size="{font_size}">{escape(label)}</text>')
+        parts.append("</g>")
+    if network.title:
+        parts.append(f'<text x="{width / 2:.0f}" y="{height * TITLE_BAND * 0.6:.0f}" text-anchor="middle" '
+                     f'dominant-baseline="central" fill="{EDGE_COLOR}" '
+                     f'font-family="{FONTS["headings"]}, sans-serif" font-size="{title_size(height)}">'
+                     f'{escape(network.title)}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+def _quadratic(start, control, end, steps=12):
+    """Points along each quadratic Bezier; (E, steps + 1, 2)"""
+    t = np.linspace(0.0, 1.0, steps + 1)[None, :, None]
+    return ((1 - t) ** 2) * start[:, None] + 2 * (1 - t) * t * control[:, None] + (t ** 2) * end[:, None]
+
+def render_png(network, xy, radius, width, height):
+    scale = SUPERSAMPLE
+    image = Image.new("RGB", (width * scale, height * scale), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    xy_s, r = xy * scale, radius * scale
+    start, control, end, loops = edge_geometry(network, xy_s, r)
+    line_width = max(1, round(r * 0.08))
+    edge_rgb = _hex_rgb(EDGE_COLOR)
+    head = r * 0.35
+
+    curved = np.abs(control - (start + end) / 2.0).sum(axis=-1) > 1e-6
+    points = _quadratic(start, control, end)
+    tangent = end - np.where(curved[:, None], control, start)
+    tangent /= np.maximum(np.sqrt((tangent ** 2).sum(axis=-1, keepdims=True)), 1e-9)
+    normal = np.stack([-tangent[:, 1], tangent[:, 0]], axis=1)
+    for k in range(len(network.edges)):
+        if loops[k]:
+            x, y = xy_s[network.edges[k, 0]]
+            box = [x + r * 0.1, y - r * 1.5, x + r * 1.3, y - r * 0.3]
+            draw.arc(box, 120, 420, fill=edge_rgb, width=line_width)
+            continue
+        if curved[k]:
+            draw.line([tuple(p) for p in points[k]], fill=edge_rgb, width=line_width, joint="curve")
+        else:
+            draw.line([tuple(start[k]), tuple(end[k])], fill=edge_rgb, width=line_width)
+        tip = end[k] + tangent[k] * head * 0.6
+        if network.signs[k] < 0:
+            bar = [tuple(tip + normal[k] * head * 0.8), tuple(tip - normal[k] * head * 0.8)]
+            draw.line(bar, fill=edge_rgb, width=max(2, line_width * 2))
+        else:
+            base = tip - tangent[k] * head
+            draw.polygon([tuple(tip), tuple(base + normal[k] * head * 0.5), tuple(base - normal[k] * head * 0.5)],
+                         fill=edge_rgb)
+
+    colors = _colors(network)
+    for i, (x, y) in enumerate(xy_s):
+        draw.ellipse([x - r, y - r, x + r, y + r], fill=_hex_rgb(colors[i]), outline=edge_rgb, width=line_width)
+    if len(network) <= LABEL_LIMIT:
+        font = load_font(FONTS["body"], label_size(network.labels, radius) * scale)
+        for i, (x, y) in enumerate(xy_s):
+            draw.text((x, y), network.labels[i], font=font, fill=(255, 255, 255), anchor="mm")
+    if network.title:
+        font = load_font(FONTS["headings"], title_size(height) * scale)
+        draw.text((image.width / 2, image.height * TITLE_BAND * 0.6), network.title, font=font, fill=edge_rgb,
+                  anchor="mm")
+
+    image = image.reduce(scale)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def render_network(network, size=DEFAULT_SIZE, layout="auto", seed=0):
+    """(svg text, png bytes, layout used) for a network at an ASSET_SIZES target or "WxH" """
+    width, height = resolve_size(size)
+    pos, method = layout_network(network, layout, seed)
+    margin = 0.06 * min(width, height) * 2.0
+    # A title gets a band across the top; the graph fits below it
+    band = round(height * TITLE_BAND) if network.title else 0
+    xy = fit_positions(pos, width, height - band, margin)
+    xy[:, 1] += band
+    radius = node_radius(xy, network.edges, width, height)
+    return render_svg(network, xy, radius, width, height), render_png(network, xy, radius, width, height), method
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render ModelIt K12 network diagrams from graph specs")
+    parser.add_argument("specs", nargs="*", help="Graph specs (.json or Boolean rules .txt; default: catalog/networks/)")
+    parser.add_argument("--size", default=DEFAULT_SIZE, help="ASSET_SIZES key or WIDTHxHEIGHT")
+    parser.add_argument("--layout", choices=["auto", "force", "layered"], default="auto")
+    parser.add_argument("--seed", type=int, default=0, help="Force layout seed")
+    args = parser.parse_args(argv)
+
+    specs = args.specs or sorted(p for p in SPEC_DIR.glob("*") if p.suffix.lower() in (".json", ".txt"))
+    print(f"\n🕸️  Rendering {len(specs)} network diagram(s)...")
+    for spec in specs:
+        started = time.perf_counter()
+        network = load_spec(spec)
+        svg, png, method = render_network(network, args.size, args.layout, args.seed)
+        save_asset(svg.encode("utf-8"), "visuals", f"{network.name}.svg")
+        path = save_asset(png, "visuals", f"{network.name}.png")
+        print(f"  ├─ {Path(path).name}: {len(network)} nodes, {len(network.edges)} edges, {method} layout "
+              f"({time.perf_counter() - started:.2f}s)")
+    print(f"  └─ ✅ {len(specs)} diagrams (SVG + PNG)")
+
+if __name__ == "__main__":
+    main()
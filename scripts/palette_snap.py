@@ -0,0 +1,211 @@
+"""
+Palette-Snap Recolouring for ModelIt K12 Generated Images
+Nano Banana returns near-brand colours (#007ACF for #0078D7); this pulls every
+pixel within CUTOFF of a palette colour onto it, with a blend strength and a
+soft falloff so shading and anti-aliasing survive. The mapping is baked once
+into a full 24-bit lookup table (cached on disk), so recolouring an image is
+one masked gather over its packed RGBA words.
+Palettes: "brand" (BRAND_COLORS + white/black) or an IMAGE_STYLES key
+Output: snapped PNGs (in place through the asset store, or into --output-dir)
+"""
+
+import io
+import os
+import sys
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import BRAND_COLORS, IMAGE_STYLES
+from asset_store import ASSETS_DIR, save_asset
+
+LUT_CACHE_DIR = ASSETS_DIR / ".cache" / "lut"
+STRENGTH = 1.0      # 1.0 = pixels inside the core radius land exactly on the palette colour
+CUTOFF = 48.0       # RGB distance beyond which pixels are left untouched
+CORE = 0.5          # fraction of CUTOFF that snaps fully; the rest ramps down linearly
+LUT_CHUNK = 1 << 20 # colours per vectorized build step (bounds memory to ~100 MB)
+SNAP_CHUNK = 1 << 16  # pixels per gather step; keeps indices and output in cache
+_LUT_LOCK = threading.Lock()  # one build at a time; lru_cache alone lets threads race
+
+def _hex_rgb(value):
+    value = value.lstrip("#")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+def palette_colors(name="brand"):
+    """RGB tuples of a named palette: "brand" or an IMAGE_STYLES key"""
+    if name == "brand":
+        colors = [color["rgb"] for color in BRAND_COLORS.values()]
+    elif name in IMAGE_STYLES:
+        colors = [_hex_rgb(value) for value in IMAGE_STYLES[name]["colors"]]
+    else:
+        raise ValueError(f"Unknown palette '{name}' (use 'brand' or one of {', '.join(IMAGE_STYLES)})")
+    # Pure white and black keep backgrounds and outlines clean
+    return list(dict.fromkeys(colors + [(255, 255, 255), (0, 0, 0)]))
+
+# ============================================================================
+# LOOKUP TABLE
+# ============================================================================
+# The table is indexed by the low 24 bits of a little-endian RGBA word
+# (r | g << 8 | b << 16) and holds the snapped colour in the same layout,
+# so an RGBA image viewed as uint32 is recoloured with and / take / or.
+
+def build_lut(colors, strength=STRENGTH, cutoff=CUTOFF):
+    """uint32[2**24] mapping packed RGB to the snapped packed RGB"""
+    palette = np.asarray(colors, dtype=np.float32)
+    core = cutoff * CORE
+    lut = np.empty(1 << 24, dtype="<u4")
+    for start in range(0, 1 << 24, LUT_CHUNK):
+        index = np.arange(start, start + LUT_CHUNK, dtype=np.uint32)
+        rgb = np.stack([index & 0xFF, (index >> 8) & 0xFF, (index >> 16) & 0xFF], axis=1).astype(np.float32)
+
+        squared = ((rgb[:, None, :] - palette[None]) ** 2).sum(axis=-1)
+        nearest = squared.argmin(axis=1)
+        distance = np.sqrt(squared[np.arange(len(rgb)), nearest])
+        weight = strength * np.clip((cutoff - distance) / max(cutoff - core, 1e-6), 0.0, 1.0)
+
+        snapped = np.rint(rgb + weight[:, None] * (palette[nearest] - rgb)).astype(np.uint32)
+        lut[start:start + LUT_CHUNK] = snapped[:, 0] | (snapped[:, 1] << 8) | (snapped[:, 2] << 16)
+    return lut
+
+def load_lut(palette="brand", strength=STRENGTH, cutoff=CUTOFF):
+    """Build once per (palette, strength, cutoff); memory-mapped from the disk cache after that
+
+    Thread-safe: concurrent first callers wait for the one build instead of
+    each spending seconds and ~64 MB on their own.
+    """
+    with _LUT_LOCK:
+        return _load_lut(palette, strength, cutoff)
+
+@lru_cache(maxsize=4)
+def _load_lut(palette, strength, cutoff):
+    colors = palette_colors(palette)
+    key = hashlib.sha256(repr((colors, strength, cutoff, CORE)).encode("ascii")).hexdigest()[:16]
+    path = LUT_CACHE_DIR / f"{palette}-{key}.npy"
+    try:
+        return np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        pass
+    lut = build_lut(colors, strength, cutoff)
+    try:
+        LUT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp.npy")
+        np.save(temp_path, lut)
+        os.replace(temp_path, path)
+    except OSError:
+        pass  # read-only checkout: rebuilt per process
+    return lut
+
+def snap_pixels(rgba, lut, chunk=SNAP_CHUNK):
+    """Recolour a uint8 RGBA array (H, W, 4) through the LUT; alpha is kept
+
+    Works in cache-sized chunks with preallocated intp indices: np.take
+    would otherwise convert every uint32 index itself.
+    """
+    words = np.ascontiguousarray(rgba).view("<u4").reshape(-1)
+    out = np.empty_like(words)
+    index = np.empty(min(chunk, words.size), dtype=np.intp)
+    for start in range(0, words.size, chunk):
+        source = words[start:start + chunk]
+        target = out[start:start + chunk]
+        positions = index[:len(source)]
+        np.bitwise_and(source, 0x00FFFFFF, out=positions, casting="unsafe")
+        np.take(lut, positions, out=target)
+        target |= source & 0xFF000000
+    return out.view(np.uint8).reshape(rgba.shape)
+
+def snap_image(image, palette="brand", strength=STRENGTH, cutoff=CUTOFF):
+    """PIL image -> snapped RGBA (or RGB, when the input had no alpha) PIL image"""
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    rgba = np.asarray(image.convert("RGBA"))
+    result = Image.fromarray(snap_pixels(rgba, load_lut(palette, strength, cutoff)), mode="RGBA")
+    return result if has_alpha else result.convert("RGB")
+
+def snap_png_bytes(data, palette="brand", strength=STRENGTH, cutoff=CUTOFF):
+    """Snap encoded image bytes; returns PNG bytes"""
+    with Image.open(io.BytesIO(data)) as image:
+        result = snap_image(image, palette, strength, cutoff)
+    buffer = io.BytesIO()
+    result.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+# ============================================================================
+# BATCH
+# ============================================================================
+
+def catalog_palette(path):
+    """IMAGE_STYLES type of a visual asset from the catalog, else "brand" """
+    from asset_catalog import load_catalog
+    for entry in load_catalog():
+        if entry["kind"] == "visual" and entry["filename"] == Path(path).name:
+            return entry["type"]
+    return "brand"
+
+def process_image(path, output_dir=None, palette="auto", strength=STRENGTH, cutoff=CUTOFF):
+    """Snap one image; returns (path, status)"""
+    path = Path(path)
+    palette = catalog_palette(path) if palette == "auto" else palette
+    data = snap_png_bytes(path.read_bytes(), palette, strength, cutoff)
+
+    output_name = path.with_suffix(".png").name
+    if output_dir:
+        output_path = Path(output_dir) / output_name
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(data)
+    else:
+        try:
+            rel_dir = path.resolve().parent.relative_to(ASSETS_DIR.resolve())
+        except ValueError:
+            output_path = path.with_name(f"{path.stem}_snapped.png")
+            output_path.write_bytes(data)
+        else:
+            # Through the asset store, so the unsnapped original stays in history
+            output_path = save_asset(data, str(rel_dir), output_name)
+    return str(output_path), f"snapped ({palette})"
+
+def _job(args):
+    try:
+        return process_image(*args)
+    except (OSError, ValueError) as e:
+        return str(args[0]), f"error: {e}"
+
+def snap_images(paths, output_dir=None, palette="auto", strength=STRENGTH, cutoff=CUTOFF, workers=None):
+    """Snap a batch of images across a process pool"""
+    from remove_background import find_images
+    jobs = [(path, output_dir, palette, strength, cutoff) for path in find_images(paths)]
+    if workers == 1 or len(jobs) <= 1:
+        return [_job(job) for job in jobs]
+    # Warm the disk cache once so workers memory-map it instead of each building the table
+    for name in {catalog_palette(job[0]) if palette == "auto" else palette for job in jobs}:
+        load_lut(name, strength, cutoff)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return list(pool.map(_job, jobs))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snap near-brand colours in generated images to the exact palette")
+    parser.add_argument("paths", nargs="*", default=[str(ASSETS_DIR / "visuals")],
+                        help="Images or directories (default: assets/visuals)")
+    parser.add_argument("--output-dir", default=None, help="Write here instead of in place")
+    parser.add_argument("--palette", default="auto",
+                        help="brand, an IMAGE_STYLES key, or auto (the asset's catalog type)")
+    parser.add_argument("--strength", type=float, default=STRENGTH, help="0-1 blend towards the palette colour")
+    parser.add_argument("--cutoff", type=float, default=CUTOFF, help="RGB distance beyond which pixels are kept")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    print("\n🎯 Snapping images to the brand palette...")
+    results = snap_images(args.paths, args.output_dir, args.palette, args.strength, args.cutoff, args.workers)
+    for path, status in results:
+        print(f"  ├─ {Path(path).name}: {status}")
+    snapped = sum(1 for _, status in results if status.startswith("snapped"))
+    print(f"  └─ ✅ {snapped}/{len(results)} images snapped")
+
+if __name__ == "__main__":
+    main()
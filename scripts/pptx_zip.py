@@ -0,0 +1,101 @@
+"""
+PPTX Zip Helpers for ModelIt K12
+Low-level access to PowerPoint packages without the python-pptx object model
+Used by: brand_lint.py, rebrand_pptx.py and other tools that process decks in bulk
+"""
+
+import copy
+import re
+import struct
+import zipfile
+
+# DrawingML / PresentationML namespaces
+NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+NS_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+# XML parts that carry brand-relevant formatting, by kind
+PART_PATTERNS = {
+    "slide": re.compile(r"^ppt/slides/slide\d+\.xml$"),
+    "layout": re.compile(r"^ppt/slideLayouts/slideLayout\d+\.xml$"),
+    "master": re.compile(r"^ppt/slideMasters/slideMaster\d+\.xml$"),
+    "theme": re.compile(r"^ppt/theme/theme\d+\.xml$"),
+}
+
+def part_kind(name):
+    """Return the kind of a zip member ("slide", "layout", ...) or None"""
+    for kind, pattern in PART_PATTERNS.items():
+        if pattern.match(name):
+            return kind
+    return None
+
+def iter_parts(zf, kinds=("slide",)):
+    """Yield (ZipInfo, kind) for XML parts of the requested kinds, in archive order"""
+    for info in zf.infolist():
+        kind = part_kind(info.filename)
+        if kind in kinds:
+            yield info, kind
+
+def tag(ns, name):
+    """Clark-notation tag name as produced by ElementTree"""
+    return f"{{{ns}}}{name}"
+
+def is_pptx(path):
+    """Cheap check that a file is a zip archive with a PowerPoint main part"""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            zf.getinfo("ppt/presentation.xml")
+        return True
+    except (zipfile.BadZipFile, KeyError, OSError):
+        return False
+
+# ============================================================================
+# RAW MEMBER COPY
+# ============================================================================
+# zipfile has no public API for moving compressed bytes between archives, so
+# these helpers write the local header themselves and register the entry the
+# same way ZipFile._open_to_write does. This lets untouched media parts pass
+# through without a decompress/recompress round trip.
+
+_LOCAL_HEADER_SIZE = 30
+_FLAG_DATA_DESCRIPTOR = 0x08
+
+def read_raw_member(fp, info):
+    """Read the still-compressed bytes of a member from an open archive file"""
+    fp.seek(info.header_offset)
+    header = fp.read(_LOCAL_HEADER_SIZE)
+    if header[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    fp.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_len + extra_len)
+    return fp.read(info.compress_size)
+
+def write_raw_member(zf, info, raw):
+    """Append an already-compressed member to a ZipFile opened for writing
+
+    info must carry the final CRC, compress_size, file_size and compress_type.
+    """
+    if zf._writing:
+        raise ValueError("Can't write raw member while another write handle is open")
+
+    info = copy.copy(info)
+    # Sizes and CRC are known up front, so no trailing data descriptor is needed
+    info.flag_bits &= ~_FLAG_DATA_DESCRIPTOR
+    info.extra = b""
+
+    with zf._lock:
+        zf.fp.seek(zf.start_dir)
+        info.header_offset = zf.fp.tell()
+        zf._writecheck(info)
+        zf._didModify = True
+        zf.fp.write(info.FileHeader())
+        zf.fp.write(raw)
+        zf.start_dir = zf.fp.tell()
+        zf.filelist.append(info)
+        zf.NameToInfo[info.filename] = info
+
+    return info
+
+def copy_member_raw(src_fp, zf_out, info):
+    """Copy one member from a source archive into zf_out without recompressing"""
+    return write_raw_member(zf_out, info, read_raw_member(src_fp, info))
@@ -0,0 +1,353 @@
+"""
+Procedural Brand Backgrounds for ModelIt K12
+Renders brand gradients, hex grids and molecule (dot/bond) patterns from
+BRAND_COLORS at any ASSET_SIZES resolution with vectorized NumPy - no image
+API call. Every pixel is a closed-form function of its coordinates (signed
+distances, 1 px anti-aliasing), so a (pattern, size, seed, theme) always gives
+the same image; rendered PNGs are cached under that key.
+Patterns: gradient, radial, hex, molecule
+Output: /assets/backgrounds/<pattern>_<theme>_<size>_s<seed>.png
+Cache: /assets/.cache/backgrounds/*.png
+"""
+
+import io
+import os
+import sys
+import time
+import hashlib
+import argparse
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import BRAND_COLORS, ASSET_SIZES
+from image_check import target_dimensions
+from deck_media import DEFAULT_DPI as SLIDE_DPI
+from asset_store import ASSETS_DIR, save_asset
+
+CACHE_DIR = ASSETS_DIR / ".cache" / "backgrounds"
+PATTERN_VERSION = 1  # bump when a renderer changes, so cached PNGs are not reused
+PATTERNS = ("gradient", "radial", "hex", "molecule")
+
+# Colour roles per theme (BRAND_COLORS keys); opacities are for the pattern layers
+THEMES = {
+    "dark": {
+        "gradient": ("primary_dark_blue", "primary_light_blue"),
+        "base": ("primary_dark_blue", "secondary_navy"),
+        "line": "primary_light_blue",
+        "accents": ("accent_teal", "primary_light_blue", "accent_gold"),
+        "line_opacity": 0.45,
+        "fill_opacity": 0.30
+    },
+    "light": {
+        "gradient": ("background_light", "primary_light_blue"),
+        "base": ("background_light", "background_light"),
+        "line": "primary_light_blue",
+        "accents": ("accent_teal", "primary_light_blue", "accent_gold"),
+        "line_opacity": 0.22,
+        "fill_opacity": 0.18
+    }
+}
+
+HEX_SCALE = 0.06        # hex circumradius as a fraction of the shorter side
+HEX_DENSITY = 0.12      # share of hex cells tinted with an accent
+MOLECULE_SCALE = 0.08   # molecule grid cell as a fraction of the shorter side
+MOLECULE_CELLS = 6      # the molecule tile is CELLS x CELLS grid cells and repeats seamlessly
+
+def rgb(name):
+    return np.array(BRAND_COLORS[name]["rgb"], dtype=np.float32)
+
+def _theme(name):
+    if name not in THEMES:
+        raise ValueError(f"Unknown theme '{name}' (use one of {', '.join(THEMES)})")
+    return THEMES[name]
+
+# ============================================================================
+# SIZES
+# ============================================================================
+
+def background_targets():
+    """Every ASSET_SIZES raster target: social sizes, banner, TPT cover, slide, icon"""
+    return [f"social_media.{name}" for name in ASSET_SIZES["social_media"]] + \
+        ["banner", "tpt_cover", "powerpoint_slide", "icon"]
+
+def resolve_size(target):
+    """(width, height) in pixels for an ASSET_SIZES key or a literal "WIDTHxHEIGHT" """
+    width, _, height = target.partition("x")
+    if width.isdigit() and height.isdigit():
+        return int(width), int(height)
+    width, height = target_dimensions(target)
+    if target == "powerpoint_slide":
+        # Slides are sized in inches; render at the deck media DPI
+        width, height = width * SLIDE_DPI, height * SLIDE_DPI
+    return round(width), round(height)
+
+# ============================================================================
+# RENDERERS
+# ============================================================================
+# Each renderer returns a float32 (height, width, 3) array in 0-255.
+
+def _pixel_grid(width, height):
+    """Pixel-centre coordinates as broadcastable (1, W) and (H, 1) arrays"""
+    x = np.arange(width, dtype=np.float32)[None, :] + 0.5
+    y = np.arange(height, dtype=np.float32)[:, None] + 0.5
+    return x, y
+
+def _cell_hash(a, b, seed, salt):
+    """Deterministic float in [0, 1) per integer cell (a, b): patterns do not depend on the image size"""
+    h = (a.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)) ^ \
+        (b.astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F)) ^ np.uint64((seed * 0x165667B1 + salt) & 0xFFFFFFFF)
+    # splitmix64 finalizer
+    h ^= h >> np.uint64(30)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    h ^= h >> np.uint64(27)
+    h *= np.uint64(0x94D049BB133111EB)
+    h ^= h >> np.uint64(31)
+    return (h >> np.uint64(40)).astype(np.float32) / np.float32(1 << 24)
+
+def linear_gradient(width, height, start, end, angle):
+    """Gradient from start to end colour along angle (degrees, 0 = left to right)"""
+    x, y = _pixel_grid(width, height)
+    dx, dy = np.cos(np.radians(angle)), np.sin(np.radians(angle))
+    t = x * np.float32(dx / width) + y * np.float32(dy / height)
+    t -= t.min()
+    t = (t / max(float(t.max()), 1e-6))[..., None]
+    return rgb(start) * (1.0 - t) + rgb(end) * t
+
+def radial_gradient(width, height, start, end, center):
+    """Gradient from start at center (fractions of the size) to end at the farthest corner"""
+    x, y = _pixel_grid(width, height)
+    cx, cy = center[0] * width, center[1] * height
+    distance = np.sqrt((x - cx) ** 2 + (y - cy) ** 2)
+    t = (distance / max(float(distance.max()), 1e-6))[..., None]
+    return rgb(start) * (1.0 - t) + rgb(end) * t
+
+def _base(width, height, theme, rng):
+    start, end = theme["base"]
+    return linear_gradient(width, height, start, end, rng.uniform(15.0, 75.0))
+
+def render_gradient(width, height, theme, rng, scale=None, seed=0):
+    start, end = theme["gradient"]
+    return linear_gradient(width, height, start, end, rng.uniform(15.0, 75.0))
+
+def render_radial(width, height, theme, rng, scale=None, seed=0):
+    end, start = theme["gradient"]
+    return radial_gradient(width, height, start, end, (rng.uniform(0.2, 0.8), rng.uniform(0.2, 0.8)))
+
+def render_hex(width, height, theme, rng, scale=None, seed=0):
+    """Pointy-top hex grid lines with a few accent-tinted cells"""
+    canvas = _base(width, height, theme, rng)
+    size = max(8.0, min(width, height) * (scale or HEX_SCALE))  # circumradius
+    half_line = max(0.75, size * 0.03)
+    sqrt3 = np.float32(np.sqrt(3.0))
+    x, y = _pixel_grid(width, height)
+
+    # Axial coordinates, cube-rounded to the containing cell
+    q = (x * (sqrt3 / 3.0) - y / 3.0) / size
+    r = np.broadcast_to(y * (2.0 / 3.0) / size, q.shape)
+    s = -q - r
+    rq, rr, rs = np.rint(q), np.rint(r), np.rint(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+
+    # Distance from the cell centre in the hex metric; edges sit at the inradius
+    dx = np.abs(x - size * sqrt3 * (rq + rr / 2.0))
+    dy = np.abs(y - size * 1.5 * rr)
+    to_edge = size * sqrt3 / 2.0 - np.maximum(dx, 0.5 * dx + (sqrt3 / 2.0) * dy)
+    line = np.clip(half_line + 0.5 - to_edge, 0.0, 1.0)
+
+    cells_q, cells_r = rq.astype(np.int64), rr.astype(np.int64)
+    tinted = _cell_hash(cells_q, cells_r, seed, 1) < HEX_DENSITY
+    accent = np.minimum((_cell_hash(cells_q, cells_r, seed, 2) * len(theme["accents"])).astype(np.intp),
+                        len(theme["accents"]) - 1)
+    palette = np.stack([rgb(name) for name in theme["accents"]])
+    fill = (tinted * (1.0 - line) * theme["fill_opacity"])[..., None]
+    canvas = canvas * (1.0 - fill) + palette[accent] * fill
+
+    line_alpha = (line * theme["line_opacity"])[..., None]
+    return canvas * (1.0 - line_alpha) + rgb(theme["line"]) * line_alpha
+
+def _segment_distance(px, py, ax, ay, bx, by):
+    abx, aby = bx - ax, by - ay
+    t = np.clip(((px - ax) * abx + (py - ay) * aby) / np.maximum(abx * abx + aby * aby, 1e-6), 0.0, 1.0)
+    return np.sqrt((px - ax - t * abx) ** 2 + (py - ay - t * aby) ** 2)
+
+def molecule_tile(cell, theme, rng, cells=MOLECULE_CELLS):
+    """One seamless tile of atoms and bonds; returns (bond alpha, atom colour premultiplied, atom alpha)
+
+    Atoms sit jittered in the middle of grid cells and bond only to the
+    right, lower and lower-right neighbours, so every pixel needs just its
+    3x3 cell neighbourhood. The tile is computed as (cells, cell, cells, cell)
+    blocks: per-cell values broadcast against one cell's pixel offsets, and
+    np.roll wraps the neighbours, which makes the tile repeat.
+    """
+    atoms = rng.random((cells, cells)) < 0.85
+    jitter = rng.uniform(0.3, 0.7, (cells, cells, 2)).astype(np.float32) * cell
+    radius = rng.uniform(0.09, 0.16, (cells, cells)).astype(np.float32) * cell
+    kind = rng.integers(0, len(theme["accents"]), (cells, cells))
+    directions = ((1, 0), (0, 1), (1, 1))
+    bonds = rng.random((cells, cells, len(directions))) < 0.5
+    palette = np.stack([rgb(name) for name in theme["accents"]])
+    half_bond = max(0.75, cell * 0.035)
+
+    def neighbour(values, dj, di):
+        """Per-cell values of the cell at offset (dj, di), wrapping around the tile"""
+        return np.roll(values, (-dj, -di), axis=(0, 1))
+
+    def block(values):
+        return values[:, None, :, None]
+
+    local = np.arange(cell, dtype=np.float32) + 0.5
+    x, y = local[None, None, None, :], local[None, :, None, None]
+    shape = (cells, cell, cells, cell)
+    bond_alpha = np.zeros(shape, dtype=np.float32)
+    atom_color = np.zeros(shape + (3,), dtype=np.float32)
+    atom_alpha = np.zeros(shape, dtype=np.float32)
+    for dj in (-1, 0, 1):
+        for di in (-1, 0, 1):
+            present = neighbour(atoms, dj, di)
+            ax = block(di * cell + neighbour(jitter[..., 0], dj, di))
+            ay = block(dj * cell + neighbour(jitter[..., 1], dj, di))
+
+            for k, (ox, oy) in enumerate(directions):
+                linked = present & neighbour(atoms, dj + oy, di + ox) & neighbour(bonds[..., k], dj, di)
+                if not linked.any():
+                    continue
+                bx = block((di + ox) * cell + neighbour(jitter[..., 0], dj + oy, di + ox))
+                by = block((dj + oy) * cell + neighbour(jitter[..., 1], dj + oy, di + ox))
+                coverage = np.clip(half_bond + 0.5 - _segment_distance(x, y, ax, ay, bx, by), 0.0, 1.0)
+                np.maximum(bond_alpha, coverage * block(linked), out=bond_alpha)
+
+            distance = np.sqrt((x - ax) ** 2 + (y - ay) ** 2)
+            coverage = np.clip(block(neighbour(radius, dj, di)) + 0.5 - distance, 0.0, 1.0) * block(present)
+            atom_color += coverage[..., None] * palette[neighbour(kind, dj, di)][:, None, :, None]
+            atom_alpha += coverage
+    size = cells * cell
+    return (bond_alpha.reshape(size, size), atom_color.reshape(size, size, 3),
+            np.minimum(atom_alpha, 1.0).reshape(size, size))
+
+def render_molecule(width, height, theme, rng, scale=None, seed=0):
+    """Ball-and-bond dot pattern: one tile rendered, then repeated over the base gradient"""
+    canvas = _base(width, height, theme, rng)
+    cell = max(12, round(min(width, height) * (scale or MOLECULE_SCALE)))
+    tile = molecule_tile(cell, theme, rng)
+    reps = (-(-height // tile[0].shape[0]), -(-width // tile[0].shape[1]))
+    bond_alpha, atom_color, atom_alpha = (
+        np.tile(layer, reps + (1,) * (layer.ndim - 2))[:height, :width] for layer in tile
+    )
+
+    bond_alpha = (bond_alpha * theme["line_opacity"])[..., None]
+    canvas = canvas * (1.0 - bond_alpha) + rgb(theme["line"]) * bond_alpha
+    opacity = min(1.0, theme["fill_opacity"] * 2.5)
+    return canvas * (1.0 - atom_alpha[..., None] * opacity) + atom_color * opacity
+
+RENDERERS = {
+    "gradient": render_gradient,
+    "radial": render_radial,
+    "hex": render_hex,
+    "molecule": render_molecule
+}
+
+def render_background(pattern, width, height, seed=0, theme="dark", scale=None):
+    """Float32 (height, width, 3) background; the same arguments always give the same pixels"""
+    if pattern not in RENDERERS:
+        raise ValueError(f"Unknown pattern '{pattern}' (use one of {', '.join(PATTERNS)})")
+    return RENDERERS[pattern](width, height, _theme(theme), np.random.default_rng(seed), scale, seed)
+
+# ============================================================================
+# CACHE
+# ============================================================================
+
+def _cache_path(pattern, width, height, seed, theme, scale):
+    # Colours are part of the key: editing BRAND_COLORS re-renders instead of serving stale PNGs
+    colors = {name: BRAND_COLORS[name]["rgb"] for name in BRAND_COLORS}
+    key = repr((PATTERN_VERSION, pattern, width, height, seed, theme, scale, THEMES[theme], colors))
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return CACHE_DIR / f"{pattern}-{width}x{height}-{digest}.png"
+
+def background_png(pattern, width, height, seed=0, theme="dark", scale=None):
+    """PNG bytes of a background, rendered once per key and then read from the cache
+
+    Returns (bytes, True when served from the cache).
+    """
+    _theme(theme)
+    path = _cache_path(pattern, width, height, seed, theme, scale)
+    try:
+        return path.read_bytes(), True
+    except OSError:
+        pass
+    pixels = render_background(pattern, width, height, seed, theme, scale)
+    buffer = io.BytesIO()
+    Image.fromarray(np.clip(np.rint(pixels), 0, 255).astype(np.uint8), mode="RGB").save(buffer, format="PNG")
+    data = buffer.getvalue()
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+    except OSError:
+        pass  # read-only checkout: rendered again next time
+    return data, False
+
+def background_array(pattern, width, height, seed=0, theme="dark", scale=None):
+    """Cached background as a float32 (height, width, 3) array, for compositors"""
+    data, _ = background_png(pattern, width, height, seed, theme, scale)
+    with Image.open(io.BytesIO(data)) as image:
+        return np.asarray(image.convert("RGB"), dtype=np.float32)
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def generate_backgrounds(patterns, targets, seeds, theme="dark", scale=None):
+    """Render (or fetch) every combination and save it; returns [(path, cached, seconds)]"""
+    results = []
+    for pattern in patterns:
+        for target in targets:
+            width, height = resolve_size(target)
+            for seed in seeds:
+                started = time.perf_counter()
+                data, cached = background_png(pattern, width, height, seed, theme, scale)
+                filename = f"{pattern}_{theme}_{target.split('.')[-1]}_s{seed}.png"
+                path = save_asset(data, "backgrounds", filename)
+                results.append((path, cached, time.perf_counter() - started))
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render procedural ModelIt K12 brand backgrounds")
+    parser.add_argument("patterns", nargs="*", default=list(PATTERNS), help=f"Any of {', '.join(PATTERNS)}")
+    parser.add_argument("--size", default="all",
+                        help="ASSET_SIZES key (e.g. social_media.twitter_header), WIDTHxHEIGHT, or all")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--count", type=int, default=1, help="Variants per size (seeds seed..seed+count-1)")
+    parser.add_argument("--theme", choices=list(THEMES), default="dark")
+    parser.add_argument("--scale", type=float, default=None, help="Pattern cell size as a fraction of the shorter side")
+    args = parser.parse_args(argv)
+
+    for pattern in args.patterns:
+        if pattern not in PATTERNS:
+            parser.error(f"unknown pattern '{pattern}' (use one of {', '.join(PATTERNS)})")
+    targets = background_targets() if args.size == "all" else args.size.split(",")
+    for target in targets:
+        try:
+            resolve_size(target)
+        except KeyError:
+            parser.error(f"unknown size '{target}' (use WIDTHxHEIGHT, all, or one of {', '.join(background_targets())})")
+    seeds = range(args.seed, args.seed + max(1, args.count))
+
+    print(f"\n🧪 Rendering {len(args.patterns)} pattern(s) × {len(targets)} size(s) × {len(seeds)} seed(s)...")
+    started = time.perf_counter()
+    results = generate_backgrounds(args.patterns, targets, seeds, args.theme, args.scale)
+    for path, cached, seconds in results:
+        print(f"  ├─ {Path(path).name}: {'cached' if cached else f'rendered in {seconds * 1000:.0f} ms'}")
+    hits = sum(1 for _, cached, _ in results if cached)
+    print(f"  └─ ✅ {len(results)} backgrounds ({hits} from cache) in {time.perf_counter() - started:.2f}s")
+
+if __name__ == "__main__":
+    main()
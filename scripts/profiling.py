@@ -0,0 +1,275 @@
+"""
+Profiling Mode for ModelIt K12 Generators
+`--profile` on any generator (or generate_all_brand_assets.py) records, per stage:
+  • cProfile stats (<run>.<stage>.prof, open with snakeviz / pstats)
+  • tracemalloc peak and the top allocation sites of the stage's peak run
+  • sampled call stacks in collapsed format (<run>.collapsed) for
+    flamegraph.pl / speedscope / inferno
+and prints the hot functions and a time breakdown by library at the end.
+Output: /profiles/<timestamp>/ (or $MODELIT_PROFILE_DIR)
+"""
+
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_ROOT = Path(__file__).parent.parent / "profiles"
+PROFILE_DIR_ENV = "MODELIT_PROFILE_DIR"
+PROFILE_CHILD_ENV = "MODELIT_PROFILE_CHILD"  # set by generate_all_brand_assets.py for its scripts
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+TOP_FUNCTIONS = 15
+
+# Where time goes, by library (first match wins)
+CATEGORIES = [
+    ("python-pptx shapes", ("/pptx/",)),
+    ("lxml serialization", ("lxml",)),
+    ("zip writing", ("zipfile", "zlib")),
+    ("JSON parsing", ("/json/", "_json")),
+    ("base64 decoding", ("base64", "binascii")),
+    ("HTTP", ("/requests/", "/urllib3/", "/http/", "ssl", "socket")),
+    ("image processing", ("/PIL/", "ImagingEncoder", "ImagingDecoder")),
+]
+
+_active = None  # the Profiler of this process, if any
+
+def profile_requested(argv=None):
+    """True when --profile was passed or a parent run asked for profiling"""
+    argv = sys.argv[1:] if argv is None else argv
+    return "--profile" in argv or bool(os.environ.get(PROFILE_DIR_ENV))
+
+def strip_profile_args(argv):
+    """argv without --profile, for scripts with positional arguments"""
+    return [arg for arg in argv if arg != "--profile"]
+
+def profile_dir():
+    """Shared output directory for this run (created once, inherited by child scripts)"""
+    if not os.environ.get(PROFILE_DIR_ENV):
+        os.environ[PROFILE_DIR_ENV] = str(PROFILE_ROOT / datetime.now().strftime("%Y%m%d-%H%M%S"))
+    path = Path(os.environ[PROFILE_DIR_ENV])
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except FileExistsError:
+        raise NotADirectoryError(f"{PROFILE_DIR_ENV} names a file, not a directory: {path}") from None
+    return path
+
+def child_env():
+    """Environment for a script run by a profiled parent: same directory, no summary of its own"""
+    env = dict(os.environ)
+    env[PROFILE_DIR_ENV] = str(profile_dir())
+    env[PROFILE_CHILD_ENV] = "1"
+    return env
+
+def stage(name):
+    """Context manager marking a stage; a no-op unless a Profiler is running
+
+    Only the profiled (main) thread records stages; calls from worker threads
+    run unstaged.
+    """
+    if _active is None or threading.get_ident() != _active.thread_id:
+        return nullcontext()
+    return _active.stage(name)
+
+def categorize(filename, funcname):
+    text = f"{filename} {funcname}"
+    for category, needles in CATEGORIES:
+        if any(needle in text for needle in needles):
+            return category
+    return "other"
+
+# Frames from these files are the profiler's own bookkeeping (stage entry/exit,
+# tracemalloc snapshots); user code never runs beneath them
+_OVERHEAD_FILES = {os.path.abspath(__file__), os.path.abspath(tracemalloc.__file__)}
+
+def _frame_label(code):
+    return f"{Path(code.co_filename).name}:{code.co_name}"
+
+class _StackSampler(threading.Thread):
+    """Samples the profiled thread's stack into collapsed-stack counts"""
+
+    def __init__(self, profiler, thread_id, interval):
+        super().__init__(daemon=True)
+        self.profiler, self.thread_id, self.interval = profiler, thread_id, interval
+        self.counts = Counter()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                if os.path.abspath(frame.f_code.co_filename) in _OVERHEAD_FILES:
+                    stack = []  # a sample of the profiler itself: leave it out
+                    break
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                stages = [record["name"] for record in self.profiler._stack] or ["(no stage)"]
+                self.counts[";".join(stages + stack[::-1])] += 1
+
+class Profiler:
+    """cProfile + tracemalloc + stack sampling, broken down by stage"""
+
+    def __init__(self, run_name, output_dir=None, sample_interval=SAMPLE_INTERVAL):
+        self.run_name = run_name
+        self.output_dir = Path(output_dir) if output_dir else profile_dir()
+        self.sample_interval = sample_interval
+        self.profiles = {}       # stage -> [cProfile.Profile per nesting depth] (re-enabled on every entry)
+        self.stages = {}         # stage -> {"calls", "seconds", "peak", "snapshot"}
+        self._stack = []
+
+    # ------------------------------------------------------------------
+    def start(self):
+        global _active
+        tracemalloc.start(10)
+        self.thread_id = threading.get_ident()
+        self.sampler = _StackSampler(self, self.thread_id, self.sample_interval)
+        self.sampler.start()
+        self.started = time.perf_counter()
+        _active = self
+        return self
+
+    def stop(self):
+        global _active
+        _active = None
+        self.sampler.stopped.set()
+        self.sampler.join()
+        tracemalloc.stop()
+        self.seconds = time.perf_counter() - self.started
+        return self.write()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    # ------------------------------------------------------------------
+    @contextmanager
+    def stage(self, name):
+        """Profile a stage exclusively: an enclosing stage pauses while it runs
+
+        A stage nested in itself (directly or further down) gets its own
+        profiler for that depth, so the running one is never re-enabled;
+        write() merges them. The parent is charged for none of this stage's
+        time, including its bookkeeping (peaks, snapshots) on entry and exit.
+        """
+        entered = time.perf_counter()
+        parent = self._stack[-1] if self._stack else None
+        if parent is not None:
+            parent["profile"].disable()
+            parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+        depth = sum(1 for record in self._stack if record["name"] == name)
+        profiles = self.profiles.setdefault(name, [])
+        if depth == len(profiles):
+            profiles.append(cProfile.Profile())
+        profile = profiles[depth]
+        record = {"name": name, "peak": 0, "nested": 0.0, "profile": profile}
+        self._stack.append(record)
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            self._stack.pop()
+            record["peak"] = max(record["peak"], tracemalloc.get_traced_memory()[1])
+
+            totals = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "peak": 0, "snapshot": None})
+            totals["calls"] += 1
+            totals["seconds"] += elapsed - record["nested"]  # exclusive, like the cProfile stats
+            if record["peak"] > totals["peak"]:
+                totals["peak"] = record["peak"]
+                # Allocations still alive at the end of the stage's heaviest run
+                totals["snapshot"] = tracemalloc.take_snapshot().filter_traces(
+                    [tracemalloc.Filter(False, tracemalloc.__file__)]
+                ).statistics("lineno")[:10]
+
+            tracemalloc.reset_peak()
+            if parent is not None:
+                parent["peak"] = max(parent["peak"], record["peak"])
+                parent["nested"] += time.perf_counter() - entered
+                parent["profile"].enable()
+
+    # ------------------------------------------------------------------
+    def write(self):
+        """Write .prof, .collapsed and memory files; returns the output directory"""
+        for name, profiles in self.profiles.items():
+            pstats.Stats(*profiles).dump_stats(str(self.output_dir / f"{self.run_name}.{name}.prof"))
+
+        with open(self.output_dir / f"{self.run_name}.collapsed", "w", encoding="utf-8") as f:
+            for stack, count in self.sampler.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+        with open(self.output_dir / f"{self.run_name}.memory.txt", "w", encoding="utf-8") as f:
+            for name, totals in self.stages.items():
+                f.write(f"{name}: peak {totals['peak'] / 1024 / 1024:.1f} MB\n")
+                for statistic in totals["snapshot"] or []:
+                    f.write(f"    {statistic}\n")
+        return self.output_dir
+
+    def print_stages(self):
+        print(f"\n⏱️  Stages ({self.run_name}, {self.seconds:.2f}s total):")
+        for name, totals in sorted(self.stages.items(), key=lambda item: -item[1]["seconds"]):
+            print(f"   • {name:.<32} {totals['seconds']:7.2f}s  ×{totals['calls']:<4} "
+                  f"peak {totals['peak'] / 1024 / 1024:6.1f} MB")
+
+def load_stats(output_dir):
+    """Merge every .prof file in a profile directory (all runs and stages)"""
+    paths = sorted(str(p) for p in Path(output_dir).glob("*.prof"))
+    return pstats.Stats(*paths) if paths else None
+
+def print_summary(output_dir, top=TOP_FUNCTIONS):
+    """Hot functions and a per-library time breakdown for a profile directory"""
+    stats = load_stats(output_dir)
+    if stats is None:
+        print("\n🔥 No profiles recorded")
+        return
+
+    by_category = Counter()
+    rows = []
+    for (filename, line, funcname), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        by_category[categorize(filename, funcname)] += tottime
+        rows.append((tottime, cumtime, calls, f"{Path(filename).name}:{line}({funcname})"))
+
+    total = sum(by_category.values()) or 1.0
+    print("\n🔥 Time by library (self time):")
+    for category, seconds in by_category.most_common():
+        print(f"   • {category:.<32} {seconds:7.2f}s  {100 * seconds / total:5.1f}%")
+
+    print(f"\n🔥 Top {top} functions (self time):")
+    for tottime, cumtime, calls, label in sorted(rows, reverse=True)[:top]:
+        print(f"   • {tottime:7.3f}s self {cumtime:7.3f}s cum  {calls:>8}×  {label}")
+    print(f"\n📁 Profiles: {output_dir}  (flamegraph: flamegraph.pl {Path(output_dir).name}/*.collapsed)")
+
+@contextmanager
+def profiled_main(run_name, enabled=None):
+    """Wrap a script's __main__ body: profiles it as one stage when --profile is on
+
+    Nested scripts (run by generate_all_brand_assets.py) leave the summary to the parent.
+    """
+    enabled = profile_requested() if enabled is None else enabled
+    if not enabled:
+        yield
+        return
+    is_child = bool(os.environ.get(PROFILE_CHILD_ENV))
+    profiler = Profiler(run_name).start()
+    try:
+        with profiler.stage(run_name):
+            yield
+    finally:
+        output_dir = profiler.stop()
+        profiler.print_stages()
+        if not is_child:
+            print_summary(output_dir)
@@ -0,0 +1,212 @@
+"""
+Prompt Matrix Expansion for ModelIt K12 Image Generation
+Declarative variant sweeps over IMAGE_STYLES, ICON_TOPICS and mascot poses
+Jobs are expanded lazily (never materializing the full cross product), sampled
+(first-N, random, stratified), de-duplicated and fed straight into generation
+Output: /assets/<asset_type>/<matrix>_<axis values>_<hash>.png
+"""
+
+import re
+import sys
+import json
+import random
+import hashlib
+import argparse
+from itertools import islice, product
+from math import prod
+from pathlib import Path
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import IMAGE_STYLES, ICON_TOPICS, MASCOT_INFO, NANO_BANANA
+
+# ============================================================================
+# MATRIX SPECS
+# ============================================================================
+# axes: ordered {axis name: list of values}; prompt/image_type are format
+# strings over the axis names. kind selects the generator ("visual"/"mascot").
+
+MATRICES = {
+    "topics_by_style": {
+        "kind": "visual",
+        "asset_type": "graphics",
+        "axes": {
+            "topic": ICON_TOPICS,
+            "style": list(IMAGE_STYLES)
+        },
+        "prompt": "Icon-style illustration representing {topic} for middle school science materials",
+        "image_type": "{style}"
+    },
+    "mascot_poses_by_color_and_style": {
+        "kind": "mascot",
+        "asset_type": "mascot",
+        "axes": {
+            "pose": MASCOT_INFO["poses"],
+            "color": MASCOT_INFO["color_scheme"],
+            "style": [style["style"] for style in IMAGE_STYLES.values()]
+        },
+        "prompt": "{pose}, dominant accent color {color}, rendered as a {style}"
+    }
+}
+
+def slugify(value, max_length=32):
+    """Filesystem-safe lowercase slug"""
+    slug = re.sub(r"[^a-z0-9]+", "_", str(value).lower()).strip("_")
+    return slug[:max_length].rstrip("_")
+
+def _normalize_prompt(prompt):
+    return " ".join(prompt.lower().split())
+
+def matrix_size(spec):
+    """Number of combinations in the full cross product"""
+    return prod(len(values) for values in spec["axes"].values())
+
+def _decode_index(spec, index):
+    """Mixed-radix decode of a flat combination index into axis values"""
+    values = []
+    for axis_values in reversed(list(spec["axes"].values())):
+        index, position = divmod(index, len(axis_values))
+        values.append(axis_values[position])
+    return tuple(reversed(values))
+
+def make_job(spec, name, values):
+    """Build one generation job from a tuple of axis values"""
+    params = dict(zip(spec["axes"], values))
+    prompt = spec["prompt"].format(**params)
+    image_type = spec.get("image_type", "molecular_structure").format(**params)
+    digest = hashlib.sha1(f"{image_type}\n{_normalize_prompt(prompt)}".encode("utf-8")).hexdigest()
+    slug = "_".join(slugify(value, 20) for value in values)
+
+    return {
+        "prompt": prompt,
+        "image_type": image_type,
+        "params": params,
+        "filename": f"{name}_{slug}_{digest[:8]}.png",
+        "key": digest
+    }
+
+def _combinations(spec, sample=None, seed=0):
+    """Yield axis-value tuples according to the sampling mode
+
+    sample: None (everything), ("first", n), ("random", n) or ("stratified", n[, axis])
+    """
+    if sample is None:
+        yield from product(*spec["axes"].values())
+        return
+
+    mode, count = sample[0], sample[1]
+    if mode == "first":
+        yield from islice(product(*spec["axes"].values()), count)
+    elif mode == "random":
+        # random.sample over a range only stores the chosen indices
+        total = matrix_size(spec)
+        for index in random.Random(seed).sample(range(total), min(count, total)):
+            yield _decode_index(spec, index)
+    elif mode == "stratified":
+        axis = sample[2] if len(sample) > 2 else next(iter(spec["axes"]))
+        axis_names = list(spec["axes"])
+        position = axis_names.index(axis)
+        rest = {name: values for name, values in spec["axes"].items() if name != axis}
+        rest_total = prod(len(values) for values in rest.values())
+        rng = random.Random(seed)
+        # Same number of draws from every stratum (value of the stratify axis)
+        for value in spec["axes"][axis]:
+            for index in rng.sample(range(rest_total), min(count, rest_total)):
+                values = list(_decode_index({"axes": rest}, index))
+                values.insert(position, value)
+                yield tuple(values)
+    else:
+        raise ValueError(f"Unknown sample mode: {mode}")
+
+def expand_matrix(spec, name="matrix", sample=None, seed=0):
+    """Lazily yield de-duplicated jobs for a matrix spec"""
+    seen = set()
+    for values in _combinations(spec, sample, seed):
+        job = make_job(spec, name, values)
+        # 8-byte keys keep the duplicate filter small for very large sweeps
+        key = bytes.fromhex(job["key"][:16])
+        if key in seen:
+            continue
+        seen.add(key)
+        yield job
+
+def parse_sample(text):
+    """Parse "first:N", "random:N" or "stratified:N[:axis]" """
+    if not text:
+        return None
+    parts = text.split(":")
+    if len(parts) < 2:
+        raise ValueError(f"Sample must look like mode:N, got '{text}'")
+    return (parts[0], int(parts[1])) + tuple(parts[2:])
+
+def load_spec(name_or_path):
+    """Return (name, spec) for a built-in matrix or a JSON spec file"""
+    if name_or_path in MATRICES:
+        return name_or_path, MATRICES[name_or_path]
+    path = Path(name_or_path)
+    with open(path, encoding="utf-8") as f:
+        return path.stem, json.load(f)
+
+def run_matrix(spec, name, sample=None, seed=0, dry_run=False, skip_existing=True):
+    """Feed matrix jobs into image generation as they are produced"""
+    asset_type = spec.get("asset_type", "visuals")
+    output_dir = Path(__file__).parent.parent / "assets" / asset_type
+
+    if not dry_run:
+        # Imported lazily: the generators require OPENROUTER_API_KEY at import time
+        if spec.get("kind") == "mascot":
+            from generate_mascot import generate_mascot_image
+        else:
+            from generate_visual_assets import generate_image_with_nano_banana, save_image
+
+    print(f"\n🧮 Expanding prompt matrix: {name}")
+    print(f"   Full size: {matrix_size(spec):,} combinations")
+
+    generated = skipped = failed = 0
+    for job in expand_matrix(spec, name, sample, seed):
+        if dry_run:
+            print(f"  ├─ {job['filename']}: {job['prompt']}")
+            generated += 1
+            continue
+
+        if skip_existing and (output_dir / job["filename"]).exists():
+            skipped += 1
+            continue
+
+        if spec.get("kind") == "mascot":
+            success = generate_mascot_image(job["prompt"], job["filename"])
+        else:
+            image_bytes = generate_image_with_nano_banana(job["prompt"], job["image_type"])
+            success = bool(image_bytes)
+            if success:
+                save_image(image_bytes, job["filename"], asset_type)
+
+        if success:
+            generated += 1
+        else:
+            failed += 1
+
+    print(f"\n📊 Prompt Matrix Complete!")
+    print(f"   ✅ {'Planned' if dry_run else 'Generated'}: {generated}")
+    if skipped:
+        print(f"   ⏭️  Already present: {skipped}")
+    if failed:
+        print(f"   ❌ Failed: {failed}")
+    if not dry_run:
+        print(f"   💰 Total cost: ${generated * NANO_BANANA['cost_per_image']:.2f}")
+
+    return generated, skipped, failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Expand and generate a prompt matrix")
+    parser.add_argument("matrix", help=f"Built-in matrix ({', '.join(MATRICES)}) or JSON spec file")
+    parser.add_argument("--sample", default=None, help="first:N, random:N or stratified:N[:axis]")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for random/stratified sampling")
+    parser.add_argument("--dry-run", action="store_true", help="List jobs without calling the API")
+    args = parser.parse_args(argv)
+
+    name, spec = load_spec(args.matrix)
+    run_matrix(spec, name, parse_sample(args.sample), args.seed, args.dry_run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Bulk Rebrand Tool for ModelIt K12 PowerPoint Decks
+Rewrites color and font references after brand_constants.py changes
+Works at the zip level: slide, layout, master and theme XML parts are streamed
+through a substitution map; every other part is copied without recompression
+Output: rebranded .pptx files (in place, or into --output-dir)
+"""
+
+import os
+import re
+import sys
+import zipfile
+import argparse
+import importlib.util
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Import shared helpers
+sys.path.append(str(Path(__file__).parent))
+from pptx_zip import copy_member_raw, part_kind
+
+CHUNK_SIZE = 64 * 1024
+REBRAND_KINDS = ("slide", "layout", "master", "theme")
+
+# Attribute-level patterns; both stay inside a single tag, so chunks split on ">" are safe
+COLOR_PATTERN = re.compile(rb'(srgbClr\b[^>]*?\bval=")([0-9A-Fa-f]{6})(")')
+TYPEFACE_PATTERN = re.compile(rb'(\btypeface=")([^"]*)(")')
+
+def load_constants(path):
+    """Load a brand_constants.py file (e.g. an older revision) as a module"""
+    spec = importlib.util.spec_from_file_location(f"brand_constants_{abs(hash(str(path)))}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _hex(value):
+    return value.lstrip("#").upper()
+
+def build_substitution_map(old, new):
+    """Build {"colors": {old_hex: new_hex}, "fonts": {old: new}} from two constants modules"""
+    colors = {}
+
+    pairs = []
+    for key, info in old.BRAND_COLORS.items():
+        if key in new.BRAND_COLORS:
+            pairs.append((key, _hex(info["hex"]), _hex(new.BRAND_COLORS[key]["hex"])))
+    for key, color in old.COLORS_PPT.items():
+        if key in new.COLORS_PPT:
+            pairs.append((key, str(color).upper(), str(new.COLORS_PPT[key]).upper()))
+
+    for key, old_hex, new_hex in pairs:
+        if old_hex == new_hex:
+            continue
+        if colors.get(old_hex, new_hex) != new_hex:
+            raise ValueError(f"Conflicting replacements for #{old_hex}: "
+                             f"#{colors[old_hex]} and #{new_hex} ({key})")
+        colors[old_hex] = new_hex
+
+    fonts = {}
+    for key, typeface in old.FONTS.items():
+        new_typeface = new.FONTS.get(key)
+        if new_typeface and new_typeface != typeface:
+            if fonts.get(typeface, new_typeface) != new_typeface:
+                raise ValueError(f"Conflicting replacements for font '{typeface}' ({key})")
+            fonts[typeface] = new_typeface
+
+    return {"colors": colors, "fonts": fonts}
+
+def _encoded_map(substitutions):
+    """Byte-level lookup tables used by the streaming substitution"""
+    colors = {k.encode("ascii"): v.encode("ascii") for k, v in substitutions["colors"].items()}
+    fonts = {k.encode("utf-8"): v.encode("utf-8") for k, v in substitutions["fonts"].items()}
+    return colors, fonts
+
+def substitute_chunk(data, colors, fonts):
+    """Apply the substitution map to one chunk of XML; returns (data, count)"""
+    count = 0
+
+    def replace_color(match):
+        nonlocal count
+        new = colors.get(match.group(2).upper())
+        if new is None:
+            return match.group(0)
+        count += 1
+        return match.group(1) + new + match.group(3)
+
+    def replace_font(match):
+        nonlocal count
+        new = fonts.get(match.group(2))
+        if new is None:
+            return match.group(0)
+        count += 1
+        return match.group(1) + new + match.group(3)
+
+    if colors:
+        data = COLOR_PATTERN.sub(replace_color, data)
+    if fonts:
+        data = TYPEFACE_PATTERN.sub(replace_font, data)
+    return data, count
+
+def iter_tag_chunks(stream):
+    """Yield decompressed XML in chunks that always end on a tag boundary"""
+    carry = b""
+    while True:
+        block = stream.read(CHUNK_SIZE)
+        if not block:
+            break
+        data = carry + block
+        cut = data.rfind(b">") + 1
+        if cut == 0:
+            carry = data
+            continue
+        carry = data[cut:]
+        yield data[:cut]
+    if carry:
+        yield carry
+
+def part_needs_rewrite(zf, info, colors, fonts):
+    """Scan a part without writing anything"""
+    with zf.open(info) as stream:
+        for chunk in iter_tag_chunks(stream):
+            if substitute_chunk(chunk, colors, fonts)[1]:
+                return True
+    return False
+
+def rebrand_deck(path, substitutions, output_path=None):
+    """Rebrand one deck; returns (path, number of replacements)"""
+    path = Path(path)
+    output_path = Path(output_path) if output_path else path
+    colors, fonts = _encoded_map(substitutions)
+    replacements = 0
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(suffix=".pptx", dir=output_path.parent)
+    os.close(fd)
+
+    try:
+        with open(path, "rb") as src_fp, zipfile.ZipFile(src_fp) as zin, \
+                zipfile.ZipFile(tmp_name, "w") as zout:
+            for info in zin.infolist():
+                if part_kind(info.filename) not in REBRAND_KINDS or \
+                        not part_needs_rewrite(zin, info, colors, fonts):
+                    copy_member_raw(src_fp, zout, info)
+                    continue
+
+                out_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+                out_info.compress_type = info.compress_type
+                out_info.external_attr = info.external_attr
+                with zin.open(info) as stream, zout.open(out_info, "w") as out:
+                    for chunk in iter_tag_chunks(stream):
+                        chunk, count = substitute_chunk(chunk, colors, fonts)
+                        replacements += count
+                        out.write(chunk)
+
+        if replacements or output_path != path:
+            os.replace(tmp_name, output_path)
+        else:
+            os.remove(tmp_name)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+
+    return str(path), replacements
+
+def _rebrand_job(job):
+    path, substitutions, output_path = job
+    try:
+        return rebrand_deck(path, substitutions, output_path) + (None,)
+    except (zipfile.BadZipFile, OSError, ValueError) as e:
+        return str(path), 0, str(e)
+
+def rebrand_decks(paths, substitutions, output_dir=None, workers=None):
+    """Rebrand many decks across a process pool"""
+    jobs = []
+    for path in paths:
+        output_path = Path(output_dir) / Path(path).name if output_dir else None
+        jobs.append((path, substitutions, output_path))
+
+    if workers == 1 or len(jobs) <= 1:
+        return [_rebrand_job(job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_rebrand_job, jobs, chunksize=max(1, len(jobs) // 64)))
+
+def main(argv=None):
+    from brand_lint import find_decks
+
+    parser = argparse.ArgumentParser(description="Rebrand PPTX decks after a brand_constants change")
+    parser.add_argument("paths", nargs="+", help="PPTX files or directories")
+    parser.add_argument("--old", required=True, help="brand_constants.py the decks were built with")
+    parser.add_argument("--new", default=str(Path(__file__).parent / "brand_constants.py"),
+                        help="Current brand_constants.py (default: scripts/brand_constants.py)")
+    parser.add_argument("--output-dir", default=None, help="Write copies here instead of in place")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    substitutions = build_substitution_map(load_constants(args.old), load_constants(args.new))
+
+    print("\n🎨 Rebranding PowerPoint decks...")
+    for old_hex, new_hex in substitutions["colors"].items():
+        print(f"  ├─ #{old_hex} → #{new_hex}")
+    for old_font, new_font in substitutions["fonts"].items():
+        print(f"  ├─ {old_font} → {new_font}")
+
+    if not substitutions["colors"] and not substitutions["fonts"]:
+        print("  └─ Nothing to do: colors and fonts are unchanged")
+        return 0
+
+    decks = find_decks(args.paths)
+    results = rebrand_decks(decks, substitutions, args.output_dir, args.workers)
+
+    failed = 0
+    for path, count, error in results:
+        if error:
+            failed += 1
+            print(f"  ├─ ❌ {path}: {error}")
+        elif count:
+            print(f"  ├─ ✅ {path}: {count} replacements")
+
+    print(f"\n📊 Rebrand Complete!")
+    print(f"   • {len(decks)} decks processed")
+    print(f"   • {sum(1 for r in results if r[1])} decks changed")
+    if failed:
+        print(f"   • {failed} failed")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
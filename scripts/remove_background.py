@@ -0,0 +1,172 @@
+"""
+Batch Background Removal for ModelIt K12 Mascot and Icon Images
+Nano Banana usually returns an opaque white (or background_light) backdrop;
+this keys it out to real alpha so images sit cleanly on coloured slide bands.
+Background = pixels close to white/background_light that are connected to the
+image border (so white eyes and highlights inside the character survive),
+with a soft matte and colour decontamination along the edge.
+Output: RGBA PNGs (in place through the asset store, or into --output-dir)
+"""
+
+import io
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import BRAND_COLORS
+from asset_store import ASSETS_DIR, save_asset
+
+BACKGROUND_COLORS = np.array([BRAND_COLORS["background_light"]["rgb"], (255, 255, 255)], dtype=np.float32)
+TOLERANCE = 40.0    # RGB distance that still counts as background
+SOFT_RANGE = 80.0   # distance over which edge pixels ramp from transparent to opaque
+EDGE_WIDTH = 2      # pixels around the background that receive the soft matte
+
+def background_distance(rgb):
+    """Distance of every pixel to its nearest background colour, and that colour's index"""
+    distances = np.sqrt(((rgb[:, :, None, :] - BACKGROUND_COLORS[None, None]) ** 2).sum(axis=-1))
+    return distances.min(axis=-1), distances.argmin(axis=-1)
+
+def _fill_runs(mask, filled):
+    """Grow filled to every horizontal run of mask pixels that it touches"""
+    previous = np.zeros_like(mask)
+    previous[:, 1:] = mask[:, :-1]
+    run_ids = np.cumsum((mask & ~previous).ravel()) * mask.ravel()
+    seeded = np.zeros(run_ids.max() + 1, dtype=bool)
+    seeded[run_ids[filled.ravel()]] = True
+    seeded[0] = False
+    return seeded[run_ids].reshape(mask.shape)
+
+def border_connected(mask):
+    """Pixels of mask connected (4-neighbourhood) to the image border
+
+    Alternates whole-image row and column run propagation until nothing
+    changes, so the fill is vectorized rather than pixel-by-pixel.
+    """
+    filled = np.zeros_like(mask)
+    filled[0, :], filled[-1, :], filled[:, 0], filled[:, -1] = mask[0, :], mask[-1, :], mask[:, 0], mask[:, -1]
+    count = -1
+    while filled.sum() != count:
+        count = filled.sum()
+        filled = _fill_runs(mask, filled)
+        filled = _fill_runs(mask.T, filled.T).T
+    return filled
+
+def _dilate(mask, iterations):
+    grown = mask.copy()
+    for _ in range(iterations):
+        padded = np.pad(grown, 1)
+        grown = (padded[1:-1, 1:-1] | padded[:-2, 1:-1] | padded[2:, 1:-1]
+                 | padded[1:-1, :-2] | padded[1:-1, 2:])
+    return grown
+
+def extract_alpha(pixels, tolerance=TOLERANCE, soft_range=SOFT_RANGE, edge_width=EDGE_WIDTH):
+    """RGB(A) uint8 array -> RGBA uint8 array with the background keyed out"""
+    rgb = pixels[..., :3].astype(np.float32)
+    distance, nearest = background_distance(rgb)
+
+    background = border_connected(distance <= tolerance)
+    edge = _dilate(background, edge_width) & ~background
+
+    alpha = np.ones(distance.shape, dtype=np.float32)
+    alpha[background] = 0.0
+    alpha[edge] = np.clip((distance[edge] - tolerance) / soft_range, 0.0, 1.0)
+
+    # Decontaminate edge colours: remove the background's share, I = a*F + (1-a)*B
+    out = rgb.copy()
+    a = alpha[edge][:, None]
+    bg = BACKGROUND_COLORS[nearest[edge]]
+    out[edge] = np.where(a > 0, (rgb[edge] - (1.0 - a) * bg) / np.maximum(a, 1e-3), rgb[edge])
+
+    if pixels.shape[-1] == 4:
+        alpha *= pixels[..., 3] / 255.0
+
+    result = np.empty(pixels.shape[:2] + (4,), dtype=np.uint8)
+    result[..., :3] = np.clip(np.rint(out), 0, 255)
+    result[..., 3] = np.clip(np.rint(alpha * 255), 0, 255)
+    return result
+
+def has_transparency(image):
+    if image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info:
+        return image.convert("RGBA").getextrema()[3][0] < 255
+    return False
+
+def process_image(path, output_dir=None, force=False, tolerance=TOLERANCE):
+    """Key out one image; returns (path, status)"""
+    path = Path(path)
+    with Image.open(path) as image:
+        if not force and has_transparency(image):
+            return str(path), "skipped (already transparent)"
+        pixels = np.asarray(image.convert("RGBA"))
+
+    result = Image.fromarray(extract_alpha(pixels, tolerance), mode="RGBA")
+    buffer = io.BytesIO()
+    result.save(buffer, format="PNG", optimize=True)
+    data = buffer.getvalue()
+
+    output_name = path.with_suffix(".png").name
+    if output_dir:
+        output_path = Path(output_dir) / output_name
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(data)
+    else:
+        try:
+            rel_dir = path.resolve().parent.relative_to(ASSETS_DIR.resolve())
+        except ValueError:
+            output_path = path.with_name(f"{path.stem}_rgba.png")
+            output_path.write_bytes(data)
+        else:
+            # Through the asset store, so the opaque original stays in history
+            output_path = save_asset(data, str(rel_dir), output_name)
+
+    return str(output_path), "keyed"
+
+def _job(args):
+    path, output_dir, force, tolerance = args
+    try:
+        return process_image(path, output_dir, force, tolerance)
+    except (OSError, ValueError) as e:
+        return str(path), f"error: {e}"
+
+def find_images(paths):
+    images = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            images.extend(p for p in sorted(path.iterdir()) if p.suffix.lower() in (".png", ".jpg", ".jpeg", ".webp"))
+        else:
+            images.append(path)
+    return images
+
+def remove_backgrounds(paths, output_dir=None, force=False, tolerance=TOLERANCE, workers=None):
+    """Key out a batch of images across a process pool"""
+    jobs = [(path, output_dir, force, tolerance) for path in find_images(paths)]
+    if workers == 1 or len(jobs) <= 1:
+        return [_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return list(pool.map(_job, jobs))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Turn white-background images into real RGBA")
+    parser.add_argument("paths", nargs="*", default=[str(ASSETS_DIR / "mascot")],
+                        help="Images or directories (default: assets/mascot)")
+    parser.add_argument("--output-dir", default=None, help="Write here instead of in place")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="Background colour distance")
+    parser.add_argument("--force", action="store_true", help="Also process images that already have alpha")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    print("\n✂️  Removing backgrounds...")
+    results = remove_backgrounds(args.paths, args.output_dir, args.force, args.tolerance, args.workers)
+    for path, status in results:
+        print(f"  ├─ {Path(path).name}: {status}")
+    keyed = sum(1 for _, status in results if status == "keyed")
+    print(f"  └─ ✅ {keyed}/{len(results)} images now have real alpha")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Reproducible Build Helpers for ModelIt K12 PowerPoint Generators
+Makes two builds from identical inputs byte-identical so decks can be hashed
+for caching, change detection and skipping redundant uploads
+Honors SOURCE_DATE_EPOCH (https://reproducible-builds.org/specs/source-date-epoch/)
+"""
+
+import io
+import os
+import sys
+import hashlib
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import BRAND_INFO
+
+# Used when SOURCE_DATE_EPOCH is not set (2025-11-17, first brand package release)
+DEFAULT_BUILD_EPOCH = 1763337600
+
+# Fixed zip settings; deflate output only depends on the data and zlib level
+ZIP_COMPRESSION = zipfile.ZIP_DEFLATED
+ZIP_COMPRESSLEVEL = 6
+ZIP_EXTERNAL_ATTR = 0o644 << 16
+ZIP_CREATE_SYSTEM = 3  # Unix, regardless of the build host
+
+# OPC readers expect these first; everything else is sorted by name
+LEADING_MEMBERS = ["[Content_Types].xml", "_rels/.rels"]
+
+def reproducible_requested(argv=None):
+    """True when --reproducible was passed or SOURCE_DATE_EPOCH is set"""
+    argv = sys.argv if argv is None else argv
+    return "--reproducible" in argv or "SOURCE_DATE_EPOCH" in os.environ
+
+def build_datetime():
+    """Build timestamp (UTC, naive) from SOURCE_DATE_EPOCH or the fixed default"""
+    epoch = int(os.environ.get("SOURCE_DATE_EPOCH", DEFAULT_BUILD_EPOCH))
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None)
+
+def apply_core_properties(prs, when):
+    """Replace docProps/core.xml metadata with fixed brand values"""
+    props = prs.core_properties
+    props.author = BRAND_INFO["name"]
+    props.last_modified_by = BRAND_INFO["name"]
+    props.comments = BRAND_INFO["tagline"]
+    props.revision = 1
+    props.created = when
+    props.modified = when
+    props.last_printed = when
+
+def _member_order(names):
+    leading = [name for name in LEADING_MEMBERS if name in names]
+    return leading + sorted(name for name in names if name not in LEADING_MEMBERS)
+
+def normalize_package(data, when):
+    """Rewrite a zip package with fixed timestamps, ordering and compression"""
+    date_time = when.timetuple()[:6]
+    out = io.BytesIO()
+
+    with zipfile.ZipFile(io.BytesIO(data)) as zin, zipfile.ZipFile(out, "w") as zout:
+        for name in _member_order(zin.namelist()):
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.compress_type = ZIP_COMPRESSION
+            info.external_attr = ZIP_EXTERNAL_ATTR
+            info.create_system = ZIP_CREATE_SYSTEM
+            zout.writestr(info, zin.read(name), compresslevel=ZIP_COMPRESSLEVEL)
+
+    return out.getvalue()
+
+def save_reproducible(prs, output_path, when=None):
+    """Save a Presentation byte-reproducibly and return its SHA-256"""
+    when = when or build_datetime()
+    apply_core_properties(prs, when)
+
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    data = normalize_package(buffer.getvalue(), when)
+
+    with open(output_path, "wb") as f:
+        f.write(data)
+
+    return hashlib.sha256(data).hexdigest()
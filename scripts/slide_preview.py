@@ -0,0 +1,404 @@
+"""
+Slide Preview Rasterizer for ModelIt K12
+Renders the shape subset our generators emit - solid backgrounds, filled
+rectangles/ellipses, lines, textboxes in the brand fonts and pictures -
+straight from the slide XML into PNG thumbnails and a contact sheet per deck.
+No PowerPoint or LibreOffice needed; slides render in parallel.
+Output: /assets/.cache/previews/<deck>/slide_NN.png, <deck>_contact.png
+"""
+
+import io
+import os
+import sys
+import argparse
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import BRAND_COLORS, FONTS
+from brand_fonts import GlyphCache
+from pptx_zip import NS_A, NS_P, NS_R, tag, is_pptx
+from text_layout import wrap, metrics_for
+
+ASSETS_DIR = Path(__file__).parent.parent / "assets"
+DEFAULT_OUTPUT_DIR = ASSETS_DIR / ".cache" / "previews"
+DEFAULT_WIDTH = 640
+EMU_PER_PT = 12700
+NS_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+def drawingml_tag(name):
+    """Qualified name in the DrawingML (a:) namespace"""
+    return tag(NS_A, name)
+
+def presentationml_tag(name):
+    """Qualified name in the PresentationML (p:) namespace"""
+    return tag(NS_P, name)
+
+# ============================================================================
+# PACKAGE STRUCTURE
+# ============================================================================
+
+def _rels(zf, part_name):
+    """{rId: target part name} for a part's relationships"""
+    folder, name = posixpath.split(part_name)
+    rels_name = posixpath.join(folder, "_rels", f"{name}.rels")
+    try:
+        root = ET.fromstring(zf.read(rels_name))
+    except KeyError:
+        return {}
+    return {
+        rel.get("Id"): posixpath.normpath(posixpath.join(folder, rel.get("Target")))
+        for rel in root.iter(tag(NS_REL, "Relationship"))
+    }
+
+def _version(path):
+    """Cache key that changes when a deck is rebuilt in place (watch mode)"""
+    stat = os.stat(path)
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+def deck_info(path):
+    """(slide size in EMU, [slide part names] in presentation order, theme colours)"""
+    return _deck_info(_version(path))
+
+@lru_cache(maxsize=16)
+def _deck_info(version):
+    with zipfile.ZipFile(version[0]) as zf:
+        presentation = ET.fromstring(zf.read("ppt/presentation.xml"))
+        rels = _rels(zf, "ppt/presentation.xml")
+        size_el = presentation.find(presentationml_tag("sldSz"))
+        size = (int(size_el.get("cx")), int(size_el.get("cy")))
+        slides = [rels[el.get(tag(NS_R, "id"))] for el in presentation.iter(presentationml_tag("sldId"))]
+
+        theme = {}
+        theme_part = next((t for t in rels.values() if "theme/" in t), None)
+        master_part = next((t for t in rels.values() if "slideMasters/" in t), None)
+        if master_part and not theme_part:
+            theme_part = next((t for t in _rels(zf, master_part).values() if "theme/" in t), None)
+        if theme_part:
+            scheme = ET.fromstring(zf.read(theme_part)).find(f".//{drawingml_tag('clrScheme')}")
+            for entry in scheme if scheme is not None else []:
+                color = entry[0]
+                theme[entry.tag.split("}")[1]] = color.get("lastClr") or color.get("val")
+    # Slides refer to the mapped names; the default master maps these onto the scheme
+    theme.update({"tx1": theme.get("dk1"), "bg1": theme.get("lt1"), "tx2": theme.get("dk2"), "bg2": theme.get("lt2")})
+    return size, slides, theme
+
+def _hex_rgb(value):
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+def resolve_color(el, theme):
+    """RGB tuple for a fill-like element (solidFill, fillRef, ...) or None"""
+    if el is None:
+        return None
+    srgb = el.find(drawingml_tag("srgbClr"))
+    if srgb is not None:
+        return _hex_rgb(srgb.get("val"))
+    scheme = el.find(drawingml_tag("schemeClr"))
+    if scheme is not None and theme.get(scheme.get("val")):
+        return _hex_rgb(theme[scheme.get("val")])
+    return None
+
+# ============================================================================
+# RENDERING
+# ============================================================================
+
+class SlideRenderer:
+    """Draws one slide onto a PIL image at a given scale (pixels per EMU)"""
+
+    def __init__(self, zf, part_name, theme, scale, glyphs):
+        self.zf, self.part_name, self.theme, self.scale, self.glyphs = zf, part_name, theme, scale, glyphs
+        self.rels = _rels(zf, part_name)
+
+    def px(self, emu):
+        return int(round(int(emu) * self.scale))
+
+    def box(self, sp_pr, offset=(0, 0, 1.0, 1.0)):
+        """(left, top, width, height) in slide EMU from an spPr/grpSpPr xfrm (offset maps group child space)"""
+        xfrm = sp_pr.find(drawingml_tag("xfrm")) if sp_pr is not None else None
+        if xfrm is None or xfrm.find(drawingml_tag("off")) is None:
+            return None
+        off, ext = xfrm.find(drawingml_tag("off")), xfrm.find(drawingml_tag("ext"))
+        dx, dy, sx, sy = offset
+        return (dx + int(off.get("x")) * sx, dy + int(off.get("y")) * sy,
+                int(ext.get("cx")) * sx, int(ext.get("cy")) * sy)
+
+    def render(self, image):
+        root = ET.fromstring(self.zf.read(self.part_name))
+        background_path = "/".join(presentationml_tag(name) for name in ("cSld", "bg", "bgPr"))
+        background = root.find(f"{background_path}/{drawingml_tag('solidFill')}")
+        color = resolve_color(background, self.theme)
+        if color:
+            image.paste(color, (0, 0, image.width, image.height))
+        self.draw = ImageDraw.Draw(image)
+        self.image = image
+        self.render_tree(root.find(f"{presentationml_tag('cSld')}/{presentationml_tag('spTree')}"))
+
+    def render_tree(self, tree, offset=(0, 0, 1.0, 1.0)):
+        for shape in tree:
+            if shape.tag == presentationml_tag("sp"):
+                self.render_shape(shape, offset)
+            elif shape.tag == presentationml_tag("cxnSp"):
+                self.render_connector(shape, offset)
+            elif shape.tag == presentationml_tag("pic"):
+                self.render_picture(shape, offset)
+            elif shape.tag == presentationml_tag("grpSp"):
+                xfrm = shape.find(f"{presentationml_tag('grpSpPr')}/{drawingml_tag('xfrm')}")
+                child = offset
+                if xfrm is not None and xfrm.find(drawingml_tag("chOff")) is not None:
+                    left, top, width, height = self.box(shape.find(presentationml_tag("grpSpPr")), offset)
+                    ch_off, ch_ext = xfrm.find(drawingml_tag("chOff")), xfrm.find(drawingml_tag("chExt"))
+                    sx = width / max(int(ch_ext.get("cx")), 1)
+                    sy = height / max(int(ch_ext.get("cy")), 1)
+                    child = (left - int(ch_off.get("x")) * sx, top - int(ch_off.get("y")) * sy, sx, sy)
+                self.render_tree(shape, child)
+
+    def _pixel_box(self, box):
+        left, top, width, height = box
+        return (self.px(left), self.px(top), self.px(left + width), self.px(top + height))
+
+    def _line(self, sp_pr, style):
+        """(colour, width px) of a shape outline, or None"""
+        ln = sp_pr.find(drawingml_tag("ln")) if sp_pr is not None else None
+        if ln is not None and ln.find(drawingml_tag("noFill")) is not None:
+            return None
+        color = resolve_color(ln, self.theme) if ln is not None else None
+        if color is None and style is not None:
+            color = resolve_color(style.find(drawingml_tag("lnRef")), self.theme)
+        width = int(ln.get("w", 12700)) if ln is not None else 12700
+        if color is None or width == 0:
+            return None
+        return color, max(1, self.px(width))
+
+    def render_shape(self, shape, offset):
+        sp_pr, style = shape.find(presentationml_tag("spPr")), shape.find(presentationml_tag("style"))
+        box = self.box(sp_pr, offset)
+        if box is None:
+            return
+        rect = self._pixel_box(box)
+        geometry = sp_pr.find(drawingml_tag("prstGeom"))
+        prst = geometry.get("prst") if geometry is not None else "rect"
+
+        if sp_pr.find(drawingml_tag("noFill")) is not None:
+            fill = None
+        else:
+            fill = resolve_color(sp_pr.find(drawingml_tag("solidFill")), self.theme)
+            if fill is None and style is not None:
+                fill = resolve_color(style.find(drawingml_tag("fillRef")), self.theme)
+        line = self._line(sp_pr, style)
+
+        if rect[2] > rect[0] and rect[3] > rect[1] and (fill or line):
+            outline, width = line if line else (None, 0)
+            if prst == "ellipse":
+                self.draw.ellipse(rect, fill=fill, outline=outline, width=width)
+            elif prst == "roundRect":
+                radius = min(rect[2] - rect[0], rect[3] - rect[1]) // 6
+                self.draw.rounded_rectangle(rect, radius, fill=fill, outline=outline, width=width)
+            elif prst == "line":
+                self.draw.line(rect, fill=outline, width=width)
+            else:
+                self.draw.rectangle(rect, fill=fill, outline=outline, width=width)
+
+        body = shape.find(presentationml_tag("txBody"))
+        if body is not None:
+            # Autoshapes default to the style's font colour (lt1 = white); textboxes to dk1
+            default = resolve_color(style.find(drawingml_tag("fontRef")), self.theme) if style is not None else None
+            self.render_text(body, box, default or _hex_rgb(self.theme.get("dk1") or "000000"))
+
+    def render_connector(self, shape, offset):
+        sp_pr = shape.find(presentationml_tag("spPr"))
+        box = self.box(sp_pr, offset)
+        line = self._line(sp_pr, shape.find(presentationml_tag("style")))
+        if box is None or line is None:
+            return
+        x0, y0, x1, y1 = self._pixel_box(box)
+        xfrm = sp_pr.find(drawingml_tag("xfrm"))
+        if xfrm.get("flipH") == "1":
+            x0, x1 = x1, x0
+        if xfrm.get("flipV") == "1":
+            y0, y1 = y1, y0
+        self.draw.line((x0, y0, x1, y1), fill=line[0], width=line[1])
+
+    def render_picture(self, shape, offset):
+        box = self.box(shape.find(presentationml_tag("spPr")), offset)
+        blip = shape.find(f"{presentationml_tag('blipFill')}/{drawingml_tag('blip')}")
+        if box is None or blip is None:
+            return
+        target = self.rels.get(blip.get(tag(NS_R, "embed")))
+        if not target:
+            return
+        left, top, right, bottom = self._pixel_box(box)
+        if right <= left or bottom <= top:
+            return
+        with Image.open(io.BytesIO(self.zf.read(target))) as picture:
+            picture = picture.convert("RGBA").resize((right - left, bottom - top), Image.LANCZOS)
+            self.image.paste(picture, (left, top), picture)
+
+    def render_text(self, body, box, default_color):
+        body_pr = body.find(drawingml_tag("bodyPr"))
+        body_pr = body_pr if body_pr is not None else ET.Element(drawingml_tag("bodyPr"))
+        left = box[0] + int(body_pr.get("lIns", 91440))
+        top = box[1] + int(body_pr.get("tIns", 45720))
+        width = box[2] - int(body_pr.get("lIns", 91440)) - int(body_pr.get("rIns", 91440))
+        height = box[3] - int(body_pr.get("tIns", 45720)) - int(body_pr.get("bIns", 45720))
+        wraps = body_pr.get("wrap", "square") != "none"
+        px_per_pt = EMU_PER_PT * self.scale
+
+        # Lay out every paragraph first so the block can be anchored vertically
+        lines = []
+        for para in body.findall(drawingml_tag("p")):
+            p_pr = para.find(drawingml_tag("pPr"))
+            def_r_pr = p_pr.find(drawingml_tag("defRPr")) if p_pr is not None else None
+            runs = para.findall(drawingml_tag("r"))
+            # <a:br/> is a line break within the paragraph (python-pptx writes "\v" as one)
+            text = "".join(
+                el.findtext(drawingml_tag("t"), "") if el.tag == drawingml_tag("r") else "\n"
+                for el in para if el.tag in (drawingml_tag("r"), drawingml_tag("br"))
+            )
+            r_pr = runs[0].find(drawingml_tag("rPr")) if runs else None
+
+            def prop(name, default=None):
+                for el in (r_pr, def_r_pr):
+                    if el is not None and el.get(name) is not None:
+                        return el.get(name)
+                return default
+
+            def child(name):
+                for el in (r_pr, def_r_pr):
+                    if el is not None and el.find(name) is not None:
+                        return el.find(name)
+                return None
+
+            size_pt = int(prop("sz", 1800)) / 100
+            bold = prop("b") in ("1", "true")
+            latin = child(drawingml_tag("latin"))
+            family = latin.get("typeface") if latin is not None and not latin.get("typeface", "+").startswith("+") else None
+            family = family or (FONTS["headings"] if bold else FONTS["body"])
+            color = resolve_color(child(drawingml_tag("solidFill")), self.theme) or default_color
+            align = p_pr.get("algn", "l") if p_pr is not None else "l"
+
+            size_px = max(1, int(round(size_pt * px_per_pt)))
+            para_lines = []
+            for segment in text.split("\n"):
+                if wraps and segment:
+                    para_lines += wrap(segment, width / EMU_PER_PT, size_pt, metrics_for(family, bold))
+                else:
+                    para_lines.append(segment)
+            line_height = size_pt * 1.2 * EMU_PER_PT
+            lines += [(line, family, size_px, color, align, line_height) for line in para_lines]
+
+        block_height = sum(line[5] for line in lines)
+        anchor = body_pr.get("anchor", "t")
+        y = top + {"ctr": (height - block_height) / 2, "b": height - block_height}.get(anchor, 0)
+
+        for text, family, size_px, color, align, line_height in lines:
+            if text.strip():
+                mask = self.glyphs.render(family, size_px, text)
+                text_width = mask.shape[1] / self.scale
+                x = left + {"ctr": (width - text_width) / 2, "r": width - text_width}.get(align, 0)
+                self.image.paste(color, (self.px(x), self.px(y)), Image.fromarray(mask))
+            y += line_height
+
+# ============================================================================
+# BATCH
+# ============================================================================
+
+_glyphs = None
+
+@lru_cache(maxsize=4)
+def _open_deck(version):
+    """Keep each deck's zip (and its parsed central directory) open per process"""
+    return zipfile.ZipFile(version[0])
+
+def render_slide(deck_path, index, width=DEFAULT_WIDTH):
+    """Render one slide (0-based index) to an RGB PIL image"""
+    global _glyphs
+    _glyphs = _glyphs or GlyphCache()  # one per worker process, reused across slides
+    (cx, cy), slides, theme = deck_info(str(deck_path))
+    scale = width / cx
+    image = Image.new("RGB", (width, max(1, round(cy * scale))), (255, 255, 255))
+    SlideRenderer(_open_deck(_version(deck_path)), slides[index], theme, scale, _glyphs).render(image)
+    return image
+
+def _render_job(args):
+    deck_path, index, width, output_path = args
+    # Thumbnails are throwaway; fast zlib beats a few % smaller files
+    render_slide(deck_path, index, width).save(output_path, compress_level=1)
+    return output_path
+
+def contact_sheet(paths, columns=4, padding=12, label_height=20):
+    """Grid of slide thumbnails on the light brand background"""
+    thumbs = [Image.open(p) for p in paths]
+    if not thumbs:
+        raise ValueError("No slides to place on a contact sheet")
+    w, h = thumbs[0].size
+    rows = -(-len(thumbs) // columns)
+    sheet = Image.new("RGB", (columns * (w + padding) + padding, rows * (h + padding + label_height) + padding),
+                      BRAND_COLORS["background_light"]["rgb"])
+    glyphs = GlyphCache()
+    for i, thumb in enumerate(thumbs):
+        x = padding + (i % columns) * (w + padding)
+        y = padding + (i // columns) * (h + padding + label_height)
+        sheet.paste(thumb, (x, y))
+        mask = glyphs.render(FONTS["body"], 12, str(i + 1))
+        sheet.paste(BRAND_COLORS["secondary_navy"]["rgb"], (x, y + h + 4), Image.fromarray(mask))
+        thumb.close()
+    return sheet
+
+def find_decks(paths):
+    decks = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            decks.extend(p for p in sorted(path.rglob("*.pptx")) if is_pptx(p))
+        elif is_pptx(path):
+            decks.append(path)
+    return decks
+
+def preview_decks(paths, output_dir=DEFAULT_OUTPUT_DIR, width=DEFAULT_WIDTH, columns=4, workers=None):
+    """Render every slide of every deck in parallel; returns {deck: (slide paths, contact sheet)}"""
+    jobs, per_deck = [], {}
+    for deck in find_decks(paths):
+        _, slides, _ = deck_info(str(deck))
+        deck_dir = Path(output_dir) / deck.stem
+        deck_dir.mkdir(parents=True, exist_ok=True)
+        per_deck[deck] = [str(deck_dir / f"slide_{i + 1:02d}.png") for i in range(len(slides))]
+        jobs += [(str(deck), i, width, out) for i, out in enumerate(per_deck[deck])]
+
+    if workers == 1 or len(jobs) <= 2:
+        list(map(_render_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            list(pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count())))))
+
+    results = {}
+    for deck, slide_paths in per_deck.items():
+        sheet_path = Path(output_dir) / f"{deck.stem}_contact.png"
+        if slide_paths:
+            contact_sheet(slide_paths, columns).save(sheet_path)
+        results[deck] = (slide_paths, sheet_path)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render PNG previews of generated decks")
+    parser.add_argument("paths", nargs="*", default=[str(ASSETS_DIR / "colors"), str(ASSETS_DIR / "templates")],
+                        help="Decks or directories (default: assets/colors, assets/templates)")
+    parser.add_argument("--output-dir", default=str(DEFAULT_OUTPUT_DIR))
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH, help="Thumbnail width in pixels")
+    parser.add_argument("--columns", type=int, default=4, help="Contact sheet columns")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    print("\n🖼️  Rendering slide previews...")
+    results = preview_decks(args.paths, args.output_dir, args.width, args.columns, args.workers)
+    for deck, (slides, sheet) in results.items():
+        print(f"  ├─ {deck.name}: {len(slides)} slides → {sheet}")
+    print(f"  └─ ✅ {sum(len(s) for s, _ in results.values())} slides rendered")
+
+if __name__ == "__main__":
+    main()
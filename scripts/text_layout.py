@@ -0,0 +1,179 @@
+"""
+Text Measurement and Auto-Fit Engine for ModelIt K12 Slide Builders
+Measures wrapped text with cached font metrics for the brand FONTS (Helvetica
+widths when no font file is installed), shrinks text down the FONT_SIZES
+hierarchy until it fits its textbox, and splits what still overflows onto
+continuation slides - all at build time, without opening PowerPoint.
+"""
+
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+# Import brand constants
+sys.path.append(str(Path(__file__).parent))
+from brand_constants import FONTS, FONT_SIZES
+from brand_fonts import find_font_file
+
+UNITS_PER_EM = 1000
+LINE_SPACING = 1.2          # PowerPoint single spacing, as a multiple of the font size
+INSET_X = 0.1               # python-pptx default textbox insets (inches)
+INSET_Y = 0.05
+
+# Helvetica advance widths (1000 units/em) for printable ASCII, used when no font file is available
+HELVETICA_WIDTHS = dict(zip(
+    " !\"#$%&'()*+,-./0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`abcdefghijklmnopqrstuvwxyz{|}~",
+    [278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+     556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+     1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+     667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+     333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+     556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584]
+))
+HELVETICA_DEFAULT_WIDTH = 556
+BOLD_WIDTH_FACTOR = 1.06    # Helvetica-Bold runs ~6% wider on average
+
+class FontMetrics:
+    """Advance widths for one font family, cached per character and per word"""
+
+    def __init__(self, family, bold=False):
+        self.family = family
+        path = find_font_file(family)
+        self._font = None
+        if path:
+            from PIL import ImageFont
+            self._font = ImageFont.truetype(path, UNITS_PER_EM)
+        self._scale = BOLD_WIDTH_FACTOR if bold and self._font is None else 1.0
+        self._chars = {}
+        self._words = {}
+
+    def char_units(self, char):
+        units = self._chars.get(char)
+        if units is None:
+            if self._font is not None:
+                units = self._font.getlength(char)
+            else:
+                units = HELVETICA_WIDTHS.get(char, HELVETICA_DEFAULT_WIDTH) * self._scale
+            self._chars[char] = units
+        return units
+
+    def units(self, text):
+        """Width of text in font units (1000/em); words are cached whole"""
+        width = self._words.get(text)
+        if width is None:
+            width = sum(self.char_units(char) for char in text)
+            if len(self._words) < 100_000:
+                self._words[text] = width
+        return width
+
+    def width_pt(self, text, size):
+        return self.units(text) * size / UNITS_PER_EM
+
+@lru_cache(maxsize=None)
+def metrics_for(family=FONTS["body"], bold=False):
+    return FontMetrics(family, bold)
+
+# ============================================================================
+# WRAPPING AND MEASUREMENT
+# ============================================================================
+
+def _break_word(metrics, word, limit_units):
+    """Split a word wider than the line into pieces that fit"""
+    pieces, piece, width = [], "", 0.0
+    for char in word:
+        char_width = metrics.char_units(char)
+        if piece and width + char_width > limit_units:
+            pieces.append(piece)
+            piece, width = "", 0.0
+        piece += char
+        width += char_width
+    return pieces + [piece] if piece else pieces
+
+def wrap(text, width_pt, size, metrics=None):
+    """Greedy word wrap of one paragraph; returns its lines"""
+    metrics = metrics or metrics_for()
+    limit = width_pt * UNITS_PER_EM / size
+    space = metrics.char_units(" ")
+    lines, line, line_width = [], [], 0.0
+    for word in text.split():
+        word_width = metrics.units(word)
+        if word_width > limit:
+            pieces = _break_word(metrics, word, limit)
+            if line:
+                lines.append(" ".join(line))
+            lines.extend(pieces[:-1])
+            line, line_width = [pieces[-1]], metrics.units(pieces[-1])
+            continue
+        needed = word_width + (space if line else 0.0)
+        if line and line_width + needed > limit:
+            lines.append(" ".join(line))
+            line, line_width = [word], word_width
+        else:
+            line.append(word)
+            line_width += needed
+    if line or not lines:
+        lines.append(" ".join(line))
+    return lines
+
+def measure(paragraphs, width_in, size, metrics=None):
+    """(lines per paragraph, text height in inches) inside a textbox of width_in"""
+    width_pt = (width_in - 2 * INSET_X) * 72
+    wrapped = [wrap(text, width_pt, size, metrics) for text in paragraphs]
+    line_count = sum(len(lines) for lines in wrapped)
+    return wrapped, line_count * size * LINE_SPACING / 72
+
+def size_steps(start="body", minimum="caption"):
+    """FONT_SIZES from start down to minimum, largest first"""
+    ordered = sorted(set(FONT_SIZES.values()), reverse=True)
+    return [s for s in ordered if FONT_SIZES[minimum] <= s <= FONT_SIZES[start]]
+
+def fit(paragraphs, width_in, height_in, start="body", minimum="caption", metrics=None):
+    """Largest hierarchy size at which the paragraphs fit the box
+
+    Returns (size, fits); when nothing fits, the minimum size with fits=False.
+    """
+    available = height_in - 2 * INSET_Y
+    steps = size_steps(start, minimum)
+    for size in steps:
+        _, height = measure(paragraphs, width_in, size, metrics)
+        if height <= available:
+            return size, True
+    return steps[-1], False
+
+def paginate(paragraphs, width_in, height_in, size, metrics=None):
+    """Split paragraphs into pages that fit the box at size
+
+    Paragraphs stay whole unless a single one is taller than a page, in which
+    case it is split between lines. The pieces keep the wrapped lines as line
+    breaks ("\v", written as <a:br/> by python-pptx) rather than re-joining
+    them with spaces, which would put spaces inside hard-broken words.
+    """
+    available_lines = max(1, int((height_in - 2 * INSET_Y) * 72 / (size * LINE_SPACING)))
+    width_pt = (width_in - 2 * INSET_X) * 72
+    pages, page, used = [], [], 0
+    for text in paragraphs:
+        lines = wrap(text, width_pt, size, metrics)
+        if used + len(lines) > available_lines and page:
+            pages.append(page)
+            page, used = [], 0
+        split = False
+        while len(lines) > available_lines:
+            # page is empty here: it was flushed above
+            pages.append(["\v".join(lines[:available_lines])])
+            lines = lines[available_lines:]
+            split = True
+        page.append("\v".join(lines) if split else text)
+        used += len(lines)
+    if page or not pages:
+        pages.append(page)
+    return pages
+
+def layout(paragraphs, width_in, height_in, start="body", minimum="caption", metrics=None):
+    """Shrink within the hierarchy, then paginate at the minimum size if needed
+
+    Returns (size, pages) where pages is a list of paragraph lists.
+    """
+    size, fits = fit(paragraphs, width_in, height_in, start, minimum, metrics)
+    if fits:
+        return size, [list(paragraphs)]
+    return size, paginate(paragraphs, width_in, height_in, size, metrics)
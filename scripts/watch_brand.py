@@ -0,0 +1,208 @@
+"""
+Brand Watch Mode for ModelIt K12
+Keeps the deck generators imported and rebuilds only the outputs affected by
+edits to brand_constants.py, the generator sources or an asset catalog
+Usage: python scripts/watch_brand.py [--reproducible] [--preview] [--watch=PATH ...]
+"""
+
+import sys
+import time
+import types
+import argparse
+import importlib
+import traceback
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+sys.path.append(str(SCRIPTS_DIR))
+import brand_constants
+from asset_catalog import CATALOG_PATH
+
+# Deck name -> (generator module, entry point)
+DECKS = {
+    "color_palette": ("generate_color_palette", "generate_color_palette"),
+    "templates": ("generate_ppt_templates", "generate_ppt_templates")
+}
+
+# Shared helpers; an edit here reloads the helper and rebuilds every deck
+HELPER_MODULES = ["pptx_zip", "reproducible_build", "deck_media", "brand_fonts", "text_layout"]
+
+POLL_INTERVAL = 0.1  # seconds
+
+def snapshot_constants(module):
+    """Fingerprint every public UPPER_CASE constant of brand_constants"""
+    return {
+        name: repr(value)
+        for name, value in vars(module).items()
+        if name.isupper() and not name.startswith("_")
+    }
+
+def _function_names(module, func, seen=None):
+    """Global names referenced by func and the module functions it calls"""
+    seen = set() if seen is None else seen
+    if func in seen:
+        return set()
+    seen.add(func)
+
+    names = set()
+    codes = [func.__code__]
+    while codes:
+        code = codes.pop()
+        names.update(code.co_names)
+        codes.extend(const for const in code.co_consts if isinstance(const, types.CodeType))
+
+    for name in list(names):
+        target = getattr(module, name, None)
+        if isinstance(target, types.FunctionType) and target.__module__ == module.__name__:
+            names |= _function_names(module, target, seen)
+    return names
+
+def slide_dependencies(module):
+    """{slide builder name: brand constant names it uses} for a generator module"""
+    constants = set(snapshot_constants(brand_constants))
+    return {
+        name: _function_names(module, func) & constants
+        for name, func in vars(module).items()
+        if name.startswith("create_") and isinstance(func, types.FunctionType)
+    }
+
+class BrandWatcher:
+    """Polls source files and incrementally rebuilds affected decks"""
+
+    def __init__(self, extra_paths=(), reproducible=False, preview=False):
+        self.reproducible = reproducible
+        self.preview = preview
+        self.modules = {}
+        for module_name, _ in DECKS.values():
+            self.modules[module_name] = importlib.import_module(module_name)
+        for module_name in HELPER_MODULES:
+            self.modules[module_name] = importlib.import_module(module_name)
+
+        self.constants = snapshot_constants(brand_constants)
+        # brand_constants derives ICON_TOPICS and the mascot poses from the catalog
+        self.constant_paths = [Path(brand_constants.__file__), CATALOG_PATH] + [Path(p) for p in extra_paths]
+        self.mtimes = {path: self._mtime(path) for path in self._watched_paths()}
+
+    def _watched_paths(self):
+        paths = list(self.constant_paths)
+        paths += [Path(module.__file__) for module in self.modules.values()]
+        return paths
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def poll(self):
+        """Return the watched paths that changed since the last poll"""
+        changed = []
+        for path in self._watched_paths():
+            mtime = self._mtime(path)
+            if mtime != self.mtimes.get(path):
+                self.mtimes[path] = mtime
+                changed.append(path)
+        return changed
+
+    def plan(self, changed_paths):
+        """Work out (decks to rebuild, changed constant names, modules to reload)"""
+        decks, reload_modules, changed_constants = set(), [], set()
+
+        if any(path in self.constant_paths for path in changed_paths):
+            importlib.reload(brand_constants)
+            new_constants = snapshot_constants(brand_constants)
+            changed_constants = {
+                name for name in set(self.constants) | set(new_constants)
+                if self.constants.get(name) != new_constants.get(name)
+            }
+            self.constants = new_constants
+
+            for module_name in HELPER_MODULES:
+                if changed_constants & set(vars(self.modules[module_name])):
+                    reload_modules.append(module_name)
+            for deck, (module_name, _) in DECKS.items():
+                module = self.modules[module_name]
+                if changed_constants & set(vars(module)):
+                    decks.add(deck)
+
+        changed_files = {path.resolve() for path in changed_paths}
+        for module_name in HELPER_MODULES:
+            if Path(self.modules[module_name].__file__).resolve() in changed_files:
+                reload_modules.append(module_name)
+                decks.update(DECKS)
+        for deck, (module_name, _) in DECKS.items():
+            if Path(self.modules[module_name].__file__).resolve() in changed_files:
+                decks.add(deck)
+
+        # Generators bind constants at import time, so they are reloaded before rebuilding
+        reload_modules += [DECKS[deck][0] for deck in sorted(decks)]
+        return sorted(decks), changed_constants, reload_modules
+
+    def rebuild(self, changed_paths):
+        """Reload what changed and rebuild the affected decks"""
+        started = time.perf_counter()
+        decks, changed_constants, reload_modules = self.plan(changed_paths)
+
+        if changed_constants:
+            print(f"\n🔄 Changed constants: {', '.join(sorted(changed_constants))}")
+        if not decks:
+            print("  └─ No deck depends on this change")
+            return []
+
+        for module_name in reload_modules:
+            self.modules[module_name] = importlib.reload(self.modules[module_name])
+
+        for deck in decks:
+            module_name, entry_point = DECKS[deck]
+            module = self.modules[module_name]
+            if changed_constants:
+                slides = [
+                    name for name, names in slide_dependencies(module).items()
+                    if names & changed_constants
+                ]
+                print(f"  ├─ {deck}: affected slides {', '.join(slides) or '(none directly)'}")
+            output_path = getattr(module, entry_point)(reproducible=self.reproducible)
+            if self.preview and output_path:
+                from slide_preview import preview_decks
+                for slides, sheet in preview_decks([output_path]).values():
+                    print(f"  ├─ 🖼️  Preview: {sheet}")
+
+        print(f"\n⚡ Rebuilt {', '.join(decks)} in {time.perf_counter() - started:.2f}s")
+        return decks
+
+    def run(self):
+        print("\n👀 Watching for brand changes (Ctrl+C to stop)...")
+        for path in self._watched_paths():
+            print(f"   • {path}")
+
+        while True:
+            changed = self.poll()
+            if changed:
+                # Let editors finish writing (save-via-rename, multiple files)
+                time.sleep(POLL_INTERVAL)
+                changed += self.poll()
+                try:
+                    self.rebuild(changed)
+                except Exception:
+                    # Half-saved edits are common; keep watching with the last good state
+                    print("  └─ ❌ Rebuild failed:")
+                    traceback.print_exc()
+            time.sleep(POLL_INTERVAL)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild brand decks when brand sources change")
+    parser.add_argument("--watch", action="append", default=[],
+                        help="Extra file (e.g. an asset catalog) that feeds brand_constants")
+    parser.add_argument("--reproducible", action="store_true", help="Build decks reproducibly")
+    parser.add_argument("--preview", action="store_true", help="Render PNG previews after each rebuild")
+    args = parser.parse_args(argv)
+
+    watcher = BrandWatcher(args.watch, args.reproducible, args.preview)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+
+if __name__ == "__main__":
+    main()
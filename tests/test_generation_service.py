@@ -0,0 +1,22 @@
+"""Smoke tests for scripts/generation_service.py"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / "scripts"))
+from generation_service import GenerationService
+
+def test_health_on_fresh_service():
+    service = GenerationService(workers=2)
+    health = service.health()
+    assert health["status"] == "ok"
+    assert health["workers"] == 2
+    assert health["images_enabled"] == (service.visuals is not None)
+    assert health["stats"] == {"images": 0, "mascots": 0, "decks": 0, "failures": 0}
+
+def test_count_only_bumps_the_counter():
+    service = GenerationService()
+    visuals = service.visuals
+    service._count("decks")
+    assert service.stats["decks"] == 1
+    assert service.visuals is visuals